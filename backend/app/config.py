@@ -21,9 +21,60 @@ class Config(BaseSettings):
     llm_model: str = "qwen2.5:14b"
 
     # Vector stores and state
+    vector_store_backend: str = "qdrant"  # qdrant | local | memory
+    local_vector_store_path: str = "generated/vector_store"
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
+    qdrant_path: str = ""  # set to a directory or :memory: for embedded Qdrant instead of host/port
+    qdrant_timeout_seconds: float = 10.0  # HTTP timeout of every Qdrant request, 0 = client default
     collection_name: str = "nexusai_knowledge_base"
+    collection_registry: str = ""  # name=collection[@location], comma-separated; location = host:port, URL or embedded path
+    federated_search_workers: int = 8
+    federated_search_timeout_seconds: float = 5.0  # 0 = wait for every collection
+    qdrant_quantization: str = "none"  # none | scalar | binary
+    qdrant_quantization_quantile: float = 0.99
+    qdrant_quantization_always_ram: bool = True
+    qdrant_quantization_rescore: bool = True
+    qdrant_quantization_oversampling: float = 2.0
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_hnsw_ef: int = 0  # 0 = server default; per-request override via hnsw_ef
+    qdrant_on_disk_vectors: bool = False
+    qdrant_on_disk_payload: bool = False
+    qdrant_upsert_batch_size: int = 256
+    qdrant_upsert_batch_bytes: int = 8 * 1024 * 1024
+    qdrant_upsert_parallelism: int = 1  # in-flight wait=False batches before the final barrier
+    qdrant_write_coalescing: bool = False  # group-commit concurrent ingestions into shared batches
+    qdrant_write_coalesce_max_points: int = 1024
+    qdrant_write_coalesce_max_delay_ms: int = 20
+    memory_index_backend: str = "exact"  # exact | ivf
+    memory_index_ivf_nlist: int = 0  # 0 = sqrt(points)
+    memory_index_ivf_nprobe: int = 8
+    memory_index_ivf_min_points: int = 20000
+    keyword_index_backend: str = "auto"  # auto (qdrant_text with a reachable Qdrant, else bm25) | bm25 | qdrant_text
+    keyword_index_path: str = "generated/keyword_index.json.gz"  # bm25 snapshot; ops are appended to <path>.log
+    keyword_index_refresh_seconds: float = 30.0  # bm25: how often searches check for a replaced snapshot or alias swap
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    sparse_vectors_enabled: bool = True
+    sparse_avg_doc_length: float = 256.0
+    hybrid_search_backend: str = "qdrant"  # qdrant (server-side sparse + dense fusion) | client
+    hybrid_fusion: str = "dbsf"  # dbsf | rrf
+    hybrid_search_workers: int = 16
+    hybrid_leg_timeout_seconds: float = 3.0  # 0 = wait for every leg
+    document_routing_enabled: bool = False  # route to top-N files by summary vector before chunk search
+    document_routing_top_n: int = 20
+    document_routing_min_documents: int = 200  # below this, flat chunk search is already cheap
+    tiering_enabled: bool = False  # move rarely retrieved files to an on-disk, quantized <collection>_cold tier
+    tiering_interval_seconds: int = 3600
+    tiering_cold_max_hits: float = 1.0  # decayed retrievals below this demote a file
+    tiering_hot_min_hits: float = 3.0  # decayed retrievals at or above this promote a cold file
+    tiering_min_age_seconds: int = 86400  # files seen by the job for less than this are never demoted
+    tiering_decay: float = 0.5  # counter multiplier applied after each tiering run
+    tiering_max_moves: int = 100  # files moved per run
+    tiering_cold_min_score: float = 0.5  # search the cold tier when the best hot hit scores below this
+    tiering_cold_quantization: str = "scalar"  # none | scalar | binary
+    tiering_stats_path: str = "generated/access_stats.json"
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_db: int = 0
@@ -33,7 +84,30 @@ class Config(BaseSettings):
     embedding_model: str = "Qwen/Qwen3-VL-Embedding-2B"
     dashscope_api_key: str = ""
     dashscope_embedding_model: str = "qwen3-vl-embedding"
+    dashscope_base_url: str = ""  # override the DashScope HTTP endpoint, e.g. a local fake server in tests
+    dashscope_embedding_batch_size: int = 10  # inputs per request (provider limit)
+    dashscope_embedding_concurrency: int = 4  # requests in flight per process
+    dashscope_embedding_rate_limit: float = 5.0  # requests/second per process, 0 = unlimited
+    dashscope_embedding_burst: int = 5
+    dashscope_embedding_max_retries: int = 5  # on 429/5xx/throttling codes and connection errors
+    dashscope_embedding_backoff_seconds: float = 0.5  # base of jittered exponential backoff
+    dashscope_embedding_backoff_max_seconds: float = 20.0
     vector_dimension: int = 1024
+    embedding_max_batch_size: int = 32  # local model: inputs per forward pass, 0 = unlimited
+    embedding_max_batch_tokens: int = 16384  # local model: padded tokens per forward pass, 0 = unlimited
+    embedding_numpy_path: bool = False  # upload keeps embeddings as one float32 matrix instead of lists of floats
+    cpu_inference_mode: str = "float32"  # float32 | bf16 | int8 (dynamic quantisation); local embedder and reranker on CPU
+    cpu_inference_threads: int = 0  # torch intra-op threads, 0 = torch default
+    cpu_inference_interop_threads: int = 0  # torch inter-op threads, 0 = torch default
+    cpu_inference_warmup: bool = True  # run one tiny forward pass right after loading a local model
+    query_embedding_batching_enabled: bool = False  # coalesce concurrent chat query embeddings into one model call
+    query_embedding_batch_max_size: int = 32
+    query_embedding_batch_max_wait_ms: float = 5.0
+    embedding_cache_enabled: bool = True  # LRU keyed by sha256(content) + model + dimension
+    embedding_cache_size: int = 20000  # vectors held in-process (~4 KiB each at 1024 dims)
+    embedding_cache_backend: str = "none"  # none | redis | disk (second level, survives restarts)
+    embedding_cache_path: str = "generated/embedding_cache.sqlite3"
+    embedding_cache_ttl_seconds: int = 0  # redis only; 0 = no expiry
 
     # Chunking
     chunk_size: int = 1000
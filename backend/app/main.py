@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI
@@ -9,9 +10,11 @@ from .config import config
 from .logging_config import setup_logging
 from .routers import chat, files, upload, workflows
 from .routers.admin import router as admin_router
+from .services.tiering import TieringJob
 
 setup_logging()
 logger = logging.getLogger("nexusai.main")
+tiering_job: Optional[TieringJob] = None
 
 app = FastAPI(title="NexusAI Backend")
 app.add_middleware(
@@ -28,11 +31,18 @@ async def on_startup():
     logger.info("🚀 NexusAI backend starting up on port 8001")
     if not (config.admin_api_key or "").strip():
         logger.warning("⚠️ Admin endpoints are fail-closed because ADMIN_API_KEY is not configured.")
+    if config.tiering_enabled:
+        global tiering_job
+        # Runs in this process because the retrieval counters it reads are recorded here.
+        tiering_job = TieringJob(tracker=chat.rag_service.access_tracker)
+        tiering_job.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown():
     logger.info("🛑 NexusAI backend shutting down")
+    if tiering_job is not None:
+        tiering_job.stop()
 
 
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
@@ -83,6 +83,16 @@ async def export_feedback():
     }
 
 
+@router.get("/embeddings/cache", dependencies=[Depends(require_admin)])
+async def get_embedding_cache_stats():
+    return embedding_service.cache_stats()
+
+
+@router.get("/embeddings/batcher", dependencies=[Depends(require_admin)])
+async def get_embedding_batcher_stats():
+    return embedding_service.batcher_stats()
+
+
 @router.get("/documents/versions/{filename}", dependencies=[Depends(require_admin)])
 async def get_document_versions(filename: str):
     return {"filename": filename, "versions": version_service.get_versions(filename)}
@@ -4,6 +4,7 @@ import uuid
 from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from openai import BadRequestError
 from pydantic import BaseModel
@@ -14,6 +15,7 @@ from ..services.feedback_service import FeedbackService
 from ..services.guardrails_service import GuardrailsService
 from ..services.history_service import HistoryService
 from ..services.rag_service import RAGResponse, RAGService
+from ..services.retrieval_filter import RetrievalFilter
 from ..services.self_rag import SelfRAGController
 
 logger = logging.getLogger("nexusai.chat")
@@ -100,9 +102,19 @@ def _normalize_rag_result(result: Any) -> Tuple[Any, List[Dict[str, Any]], Dict[
     raise TypeError("Unsupported RAG response shape")
 
 
+class ChatFilters(BaseModel):
+    source_files: List[str] = []
+    section_types: List[str] = []
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    version_ids: List[str] = []
+
+
 class ChatRequest(BaseModel):
     message: str
     session_id: str = "default"
+    filters: Optional[ChatFilters] = None
+    collections: List[str] = []
 
 
 class HistoryRequest(BaseModel):
@@ -148,6 +160,11 @@ async def chat_feedback(request: FeedbackRequest):
 @router.post("/chat")
 async def chat(request: ChatRequest):
     logger.info('💬 Chat request: "%s"', request.message[:80] + ("..." if len(request.message) > 80 else ""))
+    try:
+        filters = RetrievalFilter.from_value(request.filters)
+        collections = rag_service.collection_registry.resolve(request.collections) if request.collections else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     feedback_service.capture_implicit_feedback(request.session_id, request.message)
     guardrail = guardrails_service.check_input(request.message)
     if not guardrail.allowed:
@@ -170,14 +187,18 @@ async def chat(request: ChatRequest):
     try:
         history = history_service.get_history(session_id=request.session_id)
         assignment = ab_test_manager.assign_active_variant(request.session_id) or {}
+        # Retrieval blocks; running it off the event loop lets concurrent chats overlap (and share query embeddings).
         response_gen, sources, metadata = _normalize_rag_result(
-            self_rag.generate_response(
+            await run_in_threadpool(
+                self_rag.generate_response,
                 request.message,
                 history=history,
                 session_id=request.session_id,
                 overrides=assignment.get("overrides"),
                 experiment_id=assignment.get("experiment_id"),
                 variant_id=assignment.get("variant_id"),
+                filters=filters,
+                collections=collections,
             )
         )
         trace_id = metadata.get("trace_id") or str(uuid.uuid4())
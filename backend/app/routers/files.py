@@ -1,5 +1,5 @@
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from ..services.vector_store import VectorStore
 
 logger = logging.getLogger("nexusai.files")
@@ -7,11 +7,17 @@ router = APIRouter()
 vector_store = VectorStore()
 
 @router.get("/files")
-async def list_files():
+async def list_files(request: Request, response: Response):
     try:
-        files = vector_store.get_all_files()
-        logger.info(f"📁 List files: {len(files)} file(s) in knowledge base")
-        return [{"filename": f, "status": "Ready"} for f in files]
+        index_etag = vector_store.index_etag()
+        etag = f'W/"{index_etag}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        counts = vector_store.get_file_counts(index_etag)
+        response.headers.update(headers)
+        logger.info(f"📁 List files: {len(counts)} file(s) in knowledge base")
+        return [{"filename": f, "status": "Ready", "chunks_count": counts[f]} for f in sorted(counts)]
     except Exception as e:
         logger.error(f"❌ List files error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
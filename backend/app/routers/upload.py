@@ -2,8 +2,11 @@ import logging
 import time
 from dataclasses import asdict
 
+import numpy as np
 from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
+from ..config import config
 from ..services.document_parser import DocumentParser
 from ..services.document_version_service import DocumentVersionService
 from ..services.embedding_service import EmbeddingService
@@ -24,116 +27,135 @@ version_service = DocumentVersionService()
 graph_store = GraphStore()
 
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    logger.info("📄 Upload started: %s", file.filename)
-    try:
-        content = await file.read()
-        logger.info("   File size: %.1f KB", len(content) / 1024)
-        content_hash = version_service.compute_content_hash(content)
-        if version_service.is_unchanged(file.filename, content_hash):
-            latest = version_service.latest(file.filename) or {}
-            return {
-                "filename": file.filename,
-                "status": "Ready",
-                "skipped": True,
-                "reason": "unchanged_content_hash",
-                "version_id": latest.get("version_id"),
-                "timestamp": time.time(),
-            }
-
-        parsed_doc = parser.parse_structured(content, file.filename)
-        text_chunks = chunker.chunk_document(parsed_doc.sections, parsed_doc.full_text)
-        image_chunks = vision_service.describe_images(parsed_doc.images, source_file=file.filename)
-        chunks = text_chunks + image_chunks
-
-        if not chunks and parsed_doc.full_text:
-            chunks = chunker.chunk_document([], parsed_doc.full_text)
-
-        if not chunks:
-            raise HTTPException(status_code=400, detail="File is empty or could not be parsed.")
-
-        version_id = version_service.generate_version_id()
-
-        prepared_chunks = []
-        chunk_hash_counts = {}
-        for chunk in chunks:
-            if isinstance(chunk, dict):
-                metadata = dict(chunk.get("metadata", {}))
-                chunk_text = str(chunk.get("chunk_text", ""))
-                chunk_hash = version_service.compute_content_hash(chunk_text.encode("utf-8"))
-                chunk_ordinal = chunk_hash_counts.get(chunk_hash, 0)
-                chunk_hash_counts[chunk_hash] = chunk_ordinal + 1
-                metadata.update(
-                    {
+def _embedding_matrix(reused, embedding_indexes, embedding_texts) -> np.ndarray:
+    # One float32 (chunks, dim) matrix: reused rows are copied in, fresh rows arrive as a matrix.
+    fresh = embedding_service.get_embeddings_array(embedding_texts) if embedding_texts else None
+    dimension = fresh.shape[1] if fresh is not None else len(next(vector for vector in reused if vector is not None))
+    matrix = np.empty((len(reused), dimension), dtype=np.float32)
+    filled = np.zeros(len(reused), dtype=bool)
+    for idx, vector in enumerate(reused):
+        if vector is not None:
+            matrix[idx] = vector
+            filled[idx] = True
+    if fresh is not None:
+        if len(fresh) != len(embedding_indexes):
+            raise RuntimeError("embedding generation did not return a vector for every chunk")
+        matrix[embedding_indexes] = fresh
+        filled[embedding_indexes] = True
+    if not filled.all():
+        raise RuntimeError("embedding generation did not return a vector for every chunk")
+    return matrix
+
+
+def _ingest_upload(filename: str, content: bytes):
+    logger.info("   File size: %.1f KB", len(content) / 1024)
+    content_hash = version_service.compute_content_hash(content)
+    if version_service.is_unchanged(filename, content_hash):
+        latest = version_service.latest(filename) or {}
+        return {
+            "filename": filename,
+            "status": "Ready",
+            "skipped": True,
+            "reason": "unchanged_content_hash",
+            "version_id": latest.get("version_id"),
+            "timestamp": time.time(),
+        }
+
+    parsed_doc = parser.parse_structured(content, filename)
+    text_chunks = chunker.chunk_document(parsed_doc.sections, parsed_doc.full_text)
+    image_chunks = vision_service.describe_images(parsed_doc.images, source_file=filename)
+    chunks = text_chunks + image_chunks
+
+    if not chunks and parsed_doc.full_text:
+        chunks = chunker.chunk_document([], parsed_doc.full_text)
+
+    if not chunks:
+        raise HTTPException(status_code=400, detail="File is empty or could not be parsed.")
+
+    version_id = version_service.generate_version_id()
+
+    prepared_chunks = []
+    chunk_hash_counts = {}
+    for chunk in chunks:
+        if isinstance(chunk, dict):
+            metadata = dict(chunk.get("metadata", {}))
+            chunk_text = str(chunk.get("chunk_text", ""))
+            chunk_hash = version_service.compute_content_hash(chunk_text.encode("utf-8"))
+            chunk_ordinal = chunk_hash_counts.get(chunk_hash, 0)
+            chunk_hash_counts[chunk_hash] = chunk_ordinal + 1
+            metadata.update(
+                {
+                    "content_hash": content_hash,
+                    "version_id": version_id,
+                    "chunk_hash": chunk_hash,
+                    "delta_key": f"{chunk_hash}:{chunk_ordinal}",
+                }
+            )
+            prepared_chunks.append({**chunk, "metadata": metadata})
+        else:
+            chunk_text = str(chunk)
+            chunk_hash = version_service.compute_content_hash(chunk_text.encode("utf-8"))
+            chunk_ordinal = chunk_hash_counts.get(chunk_hash, 0)
+            chunk_hash_counts[chunk_hash] = chunk_ordinal + 1
+            prepared_chunks.append(
+                {
+                    "chunk_text": chunk_text,
+                    "metadata": {
                         "content_hash": content_hash,
                         "version_id": version_id,
                         "chunk_hash": chunk_hash,
                         "delta_key": f"{chunk_hash}:{chunk_ordinal}",
-                    }
-                )
-                prepared_chunks.append({**chunk, "metadata": metadata})
-            else:
-                chunk_text = str(chunk)
-                chunk_hash = version_service.compute_content_hash(chunk_text.encode("utf-8"))
-                chunk_ordinal = chunk_hash_counts.get(chunk_hash, 0)
-                chunk_hash_counts[chunk_hash] = chunk_ordinal + 1
-                prepared_chunks.append(
-                    {
-                        "chunk_text": chunk_text,
-                        "metadata": {
-                            "content_hash": content_hash,
-                            "version_id": version_id,
-                            "chunk_hash": chunk_hash,
-                            "delta_key": f"{chunk_hash}:{chunk_ordinal}",
-                        },
-                    }
-                )
-
-        existing_chunks = vector_store.get_file_chunks(file.filename, include_vectors=True)
-        existing_payloads = []
-        existing_vectors = {}
-        existing_hash_counts = {}
-        for row in existing_chunks:
-            payload = row.get("payload", {}) or {}
-            chunk_hash = str(payload.get("chunk_hash", ""))
-            if chunk_hash and not payload.get("delta_key"):
-                chunk_ordinal = existing_hash_counts.get(chunk_hash, 0)
-                existing_hash_counts[chunk_hash] = chunk_ordinal + 1
-                payload = {**payload, "delta_key": f"{chunk_hash}:{chunk_ordinal}"}
-            chunk_key = version_service.chunk_identity(payload, fallback_index=int(payload.get("chunk_index", 0) or 0))
-            vector = row.get("vector")
-            existing_payloads.append(payload)
-            if chunk_key and vector is not None:
-                existing_vectors[str(chunk_key)] = vector
-            if chunk_hash and vector is not None:
-                existing_vectors[chunk_hash] = vector
-
-        diff = version_service.diff_chunks(existing_payloads, prepared_chunks)
-
-        embedding_texts = []
-        embedding_indexes = []
-        embeddings = [None] * len(prepared_chunks)
-        reused_embeddings = 0
-        for idx, chunk in enumerate(prepared_chunks):
-            metadata = chunk.get("metadata", {}) if isinstance(chunk, dict) else {}
-            chunk_key = str(metadata.get("delta_key") or metadata.get("chunk_hash") or "")
-            reused_vector = existing_vectors.get(chunk_key)
-            if reused_vector is not None:
-                embeddings[idx] = reused_vector
-                reused_embeddings += 1
-                continue
-            embedding_texts.append(chunk.get("chunk_text", "") if isinstance(chunk, dict) else str(chunk))
-            embedding_indexes.append(idx)
-
-        logger.info(
-            "   Parsed via %s: %s sections, %s images, %s chunks, generating embeddings (%s reused)...",
-            parsed_doc.backend_used,
-            len(parsed_doc.sections),
-            len(parsed_doc.images),
-            len(prepared_chunks),
-            reused_embeddings,
-        )
+                    },
+                }
+            )
+
+    existing_chunks = vector_store.get_file_chunks(filename, include_vectors=True)
+    existing_payloads = []
+    existing_vectors = {}
+    existing_hash_counts = {}
+    for row in existing_chunks:
+        payload = row.get("payload", {}) or {}
+        chunk_hash = str(payload.get("chunk_hash", ""))
+        if chunk_hash and not payload.get("delta_key"):
+            chunk_ordinal = existing_hash_counts.get(chunk_hash, 0)
+            existing_hash_counts[chunk_hash] = chunk_ordinal + 1
+            payload = {**payload, "delta_key": f"{chunk_hash}:{chunk_ordinal}"}
+        chunk_key = version_service.chunk_identity(payload, fallback_index=int(payload.get("chunk_index", 0) or 0))
+        vector = row.get("vector")
+        existing_payloads.append(payload)
+        if chunk_key and vector is not None:
+            existing_vectors[str(chunk_key)] = vector
+        if chunk_hash and vector is not None:
+            existing_vectors[chunk_hash] = vector
+
+    diff = version_service.diff_chunks(existing_payloads, prepared_chunks)
+
+    embedding_texts = []
+    embedding_indexes = []
+    embeddings = [None] * len(prepared_chunks)
+    reused_embeddings = 0
+    for idx, chunk in enumerate(prepared_chunks):
+        metadata = chunk.get("metadata", {}) if isinstance(chunk, dict) else {}
+        chunk_key = str(metadata.get("delta_key") or metadata.get("chunk_hash") or "")
+        reused_vector = existing_vectors.get(chunk_key)
+        if reused_vector is not None:
+            embeddings[idx] = reused_vector
+            reused_embeddings += 1
+            continue
+        embedding_texts.append(chunk.get("chunk_text", "") if isinstance(chunk, dict) else str(chunk))
+        embedding_indexes.append(idx)
+
+    logger.info(
+        "   Parsed via %s: %s sections, %s images, %s chunks, generating embeddings (%s reused)...",
+        parsed_doc.backend_used,
+        len(parsed_doc.sections),
+        len(parsed_doc.images),
+        len(prepared_chunks),
+        reused_embeddings,
+    )
+    if config.embedding_numpy_path:
+        embeddings = _embedding_matrix(embeddings, embedding_indexes, embedding_texts)
+    else:
         if embedding_texts:
             fresh_embeddings = embedding_service.get_embeddings(embedding_texts)
             for idx, vector in zip(embedding_indexes, fresh_embeddings):
@@ -141,53 +163,63 @@ async def upload_file(file: UploadFile = File(...)):
         if any(vector is None for vector in embeddings):
             raise RuntimeError("embedding generation did not return a vector for every chunk")
         embeddings = list(embeddings)
-        vector_store.sync_file_chunks(
-            file.filename,
-            prepared_chunks,
-            embeddings,
-            deleted_chunk_keys=diff["deleted"],
-        )
-        if hasattr(graph_store, "replace_document"):
-            graph_store.replace_document(file.filename, prepared_chunks)
-        else:
-            graph_store.ingest_document(file.filename, prepared_chunks)
-        version_record = version_service.record_version(
-            filename=file.filename,
-            content_hash=content_hash,
-            chunks=prepared_chunks,
-            raw_content=parsed_doc.full_text,
-            version_id=version_id,
-            embeddings=embeddings,
-            metadata={
-                "parser_backend": parsed_doc.backend_used,
-                "sections": [asdict(section) for section in parsed_doc.sections],
-                "delta": {
-                    "added": len(diff["added"]),
-                    "updated": len(diff.get("updated", [])),
-                    "deleted": len(diff["deleted"]),
-                    "unchanged": len(diff["unchanged"]),
-                },
+    vector_store.sync_file_chunks(
+        filename,
+        prepared_chunks,
+        embeddings,
+        deleted_chunk_keys=diff["deleted"],
+    )
+    if hasattr(graph_store, "replace_document"):
+        graph_store.replace_document(filename, prepared_chunks)
+    else:
+        graph_store.ingest_document(filename, prepared_chunks)
+    version_record = version_service.record_version(
+        filename=filename,
+        content_hash=content_hash,
+        chunks=prepared_chunks,
+        raw_content=parsed_doc.full_text,
+        version_id=version_id,
+        embeddings=embeddings,
+        metadata={
+            "parser_backend": parsed_doc.backend_used,
+            "sections": [asdict(section) for section in parsed_doc.sections],
+            "delta": {
+                "added": len(diff["added"]),
+                "updated": len(diff.get("updated", [])),
+                "deleted": len(diff["deleted"]),
+                "unchanged": len(diff["unchanged"]),
             },
-        )
-        logger.info("✅ Upload complete: %s (%s chunks stored)", file.filename, len(prepared_chunks))
+        },
+    )
+    logger.info("✅ Upload complete: %s (%s chunks stored)", filename, len(prepared_chunks))
+
+    return {
+        "filename": filename,
+        "status": "Ready",
+        "chunks_count": len(prepared_chunks),
+        "text_chunks_count": len(text_chunks),
+        "image_description_chunks_count": len(image_chunks),
+        "sections_count": len(parsed_doc.sections),
+        "images_count": len(parsed_doc.images),
+        "parser_backend": parsed_doc.backend_used,
+        "version_id": version_record["version_id"],
+        "content_hash": content_hash,
+        "reused_embeddings": reused_embeddings,
+        "delta_added": len(diff["added"]),
+        "delta_deleted": len(diff["deleted"]),
+        "delta_unchanged": len(diff["unchanged"]),
+        "timestamp": time.time(),
+    }
 
-        return {
-            "filename": file.filename,
-            "status": "Ready",
-            "chunks_count": len(prepared_chunks),
-            "text_chunks_count": len(text_chunks),
-            "image_description_chunks_count": len(image_chunks),
-            "sections_count": len(parsed_doc.sections),
-            "images_count": len(parsed_doc.images),
-            "parser_backend": parsed_doc.backend_used,
-            "version_id": version_record["version_id"],
-            "content_hash": content_hash,
-            "reused_embeddings": reused_embeddings,
-            "delta_added": len(diff["added"]),
-            "delta_deleted": len(diff["deleted"]),
-            "delta_unchanged": len(diff["unchanged"]),
-            "timestamp": time.time(),
-        }
+
+@router.post("/upload")
+async def upload_file(file: UploadFile = File(...)):
+    logger.info("📄 Upload started: %s", file.filename)
+    try:
+        content = await file.read()
+        # Parsing, embedding and the (group-committed) vector store write all block, so they run
+        # off the event loop; concurrent uploads can then share one coalesced Qdrant commit.
+        return await run_in_threadpool(_ingest_upload, file.filename, content)
     except HTTPException:
         raise
     except ValueError as e:
@@ -0,0 +1,127 @@
+import argparse
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import config
+from ..services.ann_index import IVFVectorIndex
+from ..services.memory_index import MemoryVectorIndex
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(clusters, 1), dimension)).astype(np.float32)
+    labels = rng.integers(0, centers.shape[0], size=count)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((count, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _store_vectors() -> np.ndarray:
+    from ..services.vector_store import VectorStore
+
+    blocks = []
+    for page in VectorStore().iter_point_pages(fields=[], batch_size=1000, with_vectors=True):
+        vectors = [row["vector"] for row in page if row.get("vector") is not None]
+        if vectors:
+            blocks.append(np.asarray(vectors, dtype=np.float32))
+    if not blocks:
+        raise ValueError("the active vector store has no vectors to evaluate")
+    return np.concatenate(blocks)
+
+
+def _timed_search(index: MemoryVectorIndex, queries: np.ndarray, k: int):
+    results: List[List[str]] = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append([hit["id"] for hit in index.search(query, limit=k)])
+    elapsed_ms = (time.perf_counter() - start) * 1000.0 / max(len(queries), 1)
+    return results, elapsed_ms
+
+
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    *,
+    k: int = 10,
+    nprobes: Sequence[int] = (1, 4, 8, 16, 32),
+    nlist: int = 0,
+) -> Dict[str, Any]:
+    ids = [str(idx) for idx in range(vectors.shape[0])]
+    payloads = [{"row": idx} for idx in range(vectors.shape[0])]
+
+    exact = MemoryVectorIndex()
+    exact.upsert(ids, vectors, payloads)
+    expected, exact_latency_ms = _timed_search(exact, queries, k)
+
+    ivf = IVFVectorIndex(nlist=nlist, auto_train=False)
+    ivf.upsert(ids, vectors, payloads)
+    train_start = time.perf_counter()
+    ivf.train()
+    train_seconds = time.perf_counter() - train_start
+
+    rows: List[Dict[str, Any]] = []
+    for nprobe in nprobes:
+        ivf.nprobe = max(int(nprobe), 1)
+        approximate, latency_ms = _timed_search(ivf, queries, k)
+        overlaps = [len(set(got) & set(want)) / max(len(want), 1) for got, want in zip(approximate, expected)]
+        rows.append(
+            {
+                "nprobe": ivf.nprobe,
+                "recall_at_k": round(float(np.mean(overlaps)) if overlaps else 0.0, 4),
+                "latency_ms": round(latency_ms, 3),
+                "speedup": round(exact_latency_ms / latency_ms, 2) if latency_ms else None,
+            }
+        )
+
+    return {
+        "points": int(vectors.shape[0]),
+        "dimension": int(vectors.shape[1]),
+        "queries": int(queries.shape[0]),
+        "k": k,
+        "nlist": int(ivf._centroids.shape[0]) if ivf.is_trained else 0,
+        "train_seconds": round(train_seconds, 3),
+        "exact_latency_ms": round(exact_latency_ms, 3),
+        "results": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Report IVF recall@k and latency against exact in-memory search.")
+    parser.add_argument("--points", type=int, default=100_000, help="Synthetic corpus size.")
+    parser.add_argument("--dimension", type=int, default=config.vector_dimension, help="Synthetic vector dimension.")
+    parser.add_argument("--queries", type=int, default=200, help="Number of query vectors.")
+    parser.add_argument("--k", type=int, default=10, help="Top-k used for recall.")
+    parser.add_argument("--nlist", type=int, default=config.memory_index_ivf_nlist, help="IVF lists (0 = sqrt(points)).")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated nprobe values to sweep.")
+    parser.add_argument("--from-store", action="store_true", help="Use vectors from the active vector store.")
+    args = parser.parse_args(argv)
+
+    if args.from_store:
+        vectors = _store_vectors()
+    else:
+        vectors = synthetic_vectors(args.points, args.dimension)
+    rng = np.random.default_rng(1)
+    query_rows = rng.choice(vectors.shape[0], size=min(args.queries, vectors.shape[0]), replace=False)
+    queries = vectors[query_rows] + 0.05 * rng.standard_normal((len(query_rows), vectors.shape[1])).astype(np.float32)
+
+    report = recall_report(
+        vectors,
+        queries,
+        k=args.k,
+        nprobes=[int(value) for value in args.nprobe.split(",") if value.strip()],
+        nlist=args.nlist,
+    )
+    print(
+        "points={points} dim={dimension} nlist={nlist} k={k} train_s={train_seconds} exact_ms={exact_latency_ms}".format(
+            **report
+        )
+    )
+    for row in report["results"]:
+        print("nprobe={nprobe:<4} recall@k={recall_at_k:<6} latency_ms={latency_ms:<8} speedup={speedup}".format(**row))
+    return report
+
+
+if __name__ == "__main__":
+    main()
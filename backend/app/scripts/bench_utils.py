@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from ..config import config
+
+
+@contextmanager
+def config_overrides(**overrides: Any) -> Iterator[None]:
+    previous = {key: getattr(config, key) for key in overrides}
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            setattr(config, key, value)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples)
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+    }
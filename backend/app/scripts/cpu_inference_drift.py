@@ -0,0 +1,162 @@
+import argparse
+import gc
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import config
+from ..services import cpu_inference
+
+GOLDEN_DATASET = Path(__file__).resolve().parents[1] / "evaluation" / "golden_dataset.json"
+
+
+def golden_texts(path: Optional[str] = None) -> Dict[str, List[str]]:
+    with Path(path or GOLDEN_DATASET).open("r", encoding="utf-8") as handle:
+        items = json.load(handle)
+    return {
+        "questions": [str(item.get("question", "")) for item in items],
+        "answers": [str(item.get("ground_truth", "")) for item in items],
+    }
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosine = np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+    return {
+        "mean_cosine": round(float(cosine.mean()), 6),
+        "min_cosine": round(float(cosine.min()), 6),
+        "max_drift": round(float(1.0 - cosine.min()), 6),
+    }
+
+
+def ranking_agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    # Rows are queries, columns candidates: how often the quantised scores pick the same top-1 and top-3.
+    reference, candidate = np.asarray(reference), np.asarray(candidate)
+    top1 = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+    k = min(3, reference.shape[1])
+    ref_top = np.argsort(-reference, axis=1)[:, :k]
+    cand_top = np.argsort(-candidate, axis=1)[:, :k]
+    overlap = np.mean([len(set(left) & set(right)) / k for left, right in zip(ref_top, cand_top)])
+    return {
+        "top1_agreement": round(top1, 4),
+        f"top{k}_overlap": round(float(overlap), 4),
+        "max_score_delta": round(float(np.max(np.abs(reference - candidate))), 6),
+    }
+
+
+def _timed(run, repeats: int) -> Dict[str, Any]:
+    seconds, result = [], None
+    for _ in range(max(repeats, 1)):
+        started = time.perf_counter()
+        result = run()
+        seconds.append(time.perf_counter() - started)
+    return {"result": result, "seconds": round(min(seconds), 4)}
+
+
+def _embed(mode: str, texts: Sequence[str], model: str, repeats: int) -> Dict[str, Any]:
+    from ..services.embedding_service import EmbeddingService
+    from ..services.scripts.qwen3_vl_embedding import Qwen3VLEmbedder
+
+    embedder = Qwen3VLEmbedder(
+        model_name_or_path=model,
+        dtype=cpu_inference.load_dtype(mode),
+        device_map="cpu",
+        max_batch_size=config.embedding_max_batch_size,
+        max_batch_tokens=config.embedding_max_batch_tokens,
+    )
+    cpu_inference.prepare_model(embedder.model, mode)
+    warmup = cpu_inference.warm_up(f"Embedder ({mode})", lambda: embedder.process([{"text": "warm-up"}]))
+    inputs = [{"text": text} for text in texts]
+    timed = _timed(lambda: EmbeddingService._as_float32(embedder.process(inputs)), repeats)
+    del embedder
+    gc.collect()
+    return {"vectors": timed["result"], "seconds": timed["seconds"], "warmup_seconds": round(warmup, 3)}
+
+
+def _rerank(mode: str, questions: Sequence[str], answers: Sequence[str], model: str, repeats: int) -> Dict[str, Any]:
+    from sentence_transformers import CrossEncoder
+
+    encoder = CrossEncoder(model, device="cpu")
+    cpu_inference.prepare_model(encoder.model, mode)
+    warmup = cpu_inference.warm_up(f"Reranker ({mode})", lambda: encoder.predict([["warm-up", "warm-up"]]))
+    pairs = [[question, answer] for question in questions for answer in answers]
+    timed = _timed(lambda: np.asarray(encoder.predict(pairs), dtype=np.float32), repeats)
+    del encoder
+    gc.collect()
+    scores = timed["result"].reshape(len(questions), len(answers))
+    return {"scores": scores, "seconds": timed["seconds"], "warmup_seconds": round(warmup, 3)}
+
+
+def run_comparison(
+    modes: Sequence[str] = ("bf16", "int8"),
+    dataset: Optional[str] = None,
+    embedding_model: Optional[str] = None,
+    reranker_model: Optional[str] = None,
+    threads: int = 0,
+    repeats: int = 3,
+    skip_reranker: bool = False,
+) -> Dict[str, Any]:
+    texts = golden_texts(dataset)
+    corpus = texts["questions"] + texts["answers"]
+    num_threads = cpu_inference.configure_threads(threads or None)
+    modes = [cpu_inference.cpu_mode(mode) for mode in modes if cpu_inference.cpu_mode(mode) != "float32"]
+    report: Dict[str, Any] = {"texts": len(corpus), "torch_threads": num_threads, "embedding": {}, "reranker": {}}
+
+    baseline = _embed("float32", corpus, embedding_model or config.embedding_model, repeats)
+    report["embedding"]["float32"] = {"seconds": baseline["seconds"], "warmup_seconds": baseline["warmup_seconds"]}
+    for mode in modes:
+        result = _embed(mode, corpus, embedding_model or config.embedding_model, repeats)
+        report["embedding"][mode] = {
+            "seconds": result["seconds"],
+            "warmup_seconds": result["warmup_seconds"],
+            "speedup": round(baseline["seconds"] / max(result["seconds"], 1e-9), 2),
+            **cosine_drift(baseline["vectors"], result["vectors"]),
+        }
+
+    if skip_reranker:
+        return report
+    model = reranker_model or config.reranker_model
+    reference = _rerank("float32", texts["questions"], texts["answers"], model, repeats)
+    report["reranker"]["float32"] = {"seconds": reference["seconds"], "warmup_seconds": reference["warmup_seconds"]}
+    for mode in modes:
+        result = _rerank(mode, texts["questions"], texts["answers"], model, repeats)
+        report["reranker"][mode] = {
+            "seconds": result["seconds"],
+            "warmup_seconds": result["warmup_seconds"],
+            "speedup": round(reference["seconds"] / max(result["seconds"], 1e-9), 2),
+            **ranking_agreement(reference["scores"], result["scores"]),
+        }
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Cosine drift and latency of bf16/int8 CPU inference against float32.")
+    parser.add_argument("--modes", default="bf16,int8", help="Comma separated CPU modes to compare with float32.")
+    parser.add_argument("--dataset", default="", help="Golden dataset JSON (defaults to app/evaluation/golden_dataset.json).")
+    parser.add_argument("--embedding-model", default=None)
+    parser.add_argument("--reranker-model", default=None)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads, 0 = CPU_INFERENCE_THREADS.")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes; the fastest is reported.")
+    parser.add_argument("--skip-reranker", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = run_comparison(
+        modes=[mode for mode in args.modes.split(",") if mode.strip()],
+        dataset=args.dataset or None,
+        embedding_model=args.embedding_model,
+        reranker_model=args.reranker_model,
+        threads=args.threads,
+        repeats=args.repeats,
+        skip_reranker=args.skip_reranker,
+    )
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import config
+from ..services.length_batching import padded_tokens, plan_length_batches
+
+_WORDS = "refund invoice policy warranty shipping account password contract renewal support ticket escalation".split()
+
+
+def synthetic_chunks(count: int, min_words: int = 8, max_words: int = 400, seed: int = 0) -> List[str]:
+    # Skewed lengths like real chunking output: mostly short tails and headings, some full chunks.
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = int(min_words + (max_words - min_words) * rng.random() ** 2)
+        chunks.append(" ".join(rng.choice(_WORDS) for _ in range(words)))
+    return chunks
+
+
+def padding_report(lengths: List[int], max_batch_size: int, max_batch_tokens: int) -> Dict[str, Any]:
+    batches = plan_length_batches(lengths, max_batch_size, max_batch_tokens)
+    useful = sum(lengths)
+    padded = padded_tokens(lengths, batches)
+    return {
+        "batches": len(batches),
+        "largest_batch_tokens": max(max(lengths[i] for i in batch) * len(batch) for batch in batches) if batches else 0,
+        "padded_tokens": padded,
+        "padding_ratio": round(padded / max(useful, 1), 3),
+    }
+
+
+def _embed_throughput(embedder, inputs: List[Dict[str, Any]], repeats: int) -> Dict[str, float]:
+    embedder.process(inputs[: min(len(inputs), 4)])  # warm-up
+    seconds = []
+    for _ in range(max(repeats, 1)):
+        started = time.perf_counter()
+        embedder.process(inputs)
+        seconds.append(time.perf_counter() - started)
+    best = min(seconds)
+    return {"seconds": round(best, 3), "chunks_per_sec": round(len(inputs) / best, 2)}
+
+
+def run_benchmark(
+    chunks: int = 256,
+    max_batch_size: int = 32,
+    max_batch_tokens: int = 16384,
+    threads: int = 0,
+    repeats: int = 1,
+    plan_only: bool = False,
+    compare_single_pass: bool = True,
+    model: Optional[str] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    texts = synthetic_chunks(chunks, seed=seed)
+    # Whitespace tokens approximate the model tokenizer closely enough to compare batching plans.
+    estimated = [len(text.split()) + 16 for text in texts]
+    report: Dict[str, Any] = {
+        "chunks": chunks,
+        "max_batch_size": max_batch_size,
+        "max_batch_tokens": max_batch_tokens,
+        "plan": {
+            "single_pass": padding_report(estimated, 0, 0),
+            "bucketed": padding_report(estimated, max_batch_size, max_batch_tokens),
+        },
+    }
+    if plan_only:
+        return report
+
+    import torch
+
+    from ..services.scripts.qwen3_vl_embedding import Qwen3VLEmbedder
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    embedder = Qwen3VLEmbedder(
+        model_name_or_path=model or config.embedding_model,
+        dtype=torch.float32,
+        device_map="cpu",
+        max_batch_size=max_batch_size,
+        max_batch_tokens=max_batch_tokens,
+    )
+    inputs = [{"text": text} for text in texts]
+    report["torch_threads"] = torch.get_num_threads()
+    report["plan"]["bucketed"] = padding_report(embedder._estimate_lengths(inputs), max_batch_size, max_batch_tokens)
+    report["bucketed"] = _embed_throughput(embedder, inputs, repeats)
+    if compare_single_pass:
+        embedder.max_batch_size, embedder.max_batch_tokens = 0, 0
+        report["single_pass"] = _embed_throughput(embedder, inputs, repeats)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="CPU throughput of the local embedder with length-bucketed micro-batches.")
+    parser.add_argument("--chunks", type=int, default=256)
+    parser.add_argument("--max-batch-size", type=int, default=config.embedding_max_batch_size)
+    parser.add_argument("--max-batch-tokens", type=int, default=config.embedding_max_batch_tokens)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads, 0 = torch default.")
+    parser.add_argument("--repeats", type=int, default=1, help="Timed passes; the fastest is reported.")
+    parser.add_argument("--model", default=None, help="Model path or hub id (defaults to EMBEDDING_MODEL).")
+    parser.add_argument("--plan-only", action="store_true", help="Report batch plans and padding without loading the model.")
+    parser.add_argument("--skip-single-pass", action="store_true", help="Do not time the unbatched baseline (it may not fit in memory).")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        chunks=args.chunks,
+        max_batch_size=args.max_batch_size,
+        max_batch_tokens=args.max_batch_tokens,
+        threads=args.threads,
+        repeats=args.repeats,
+        plan_only=args.plan_only,
+        compare_single_pass=not args.skip_single_pass,
+        model=args.model,
+    )
+    print("chunks={chunks} max_batch_size={max_batch_size} max_batch_tokens={max_batch_tokens}".format(**report))
+    for mode in ("single_pass", "bucketed"):
+        plan = report["plan"][mode]
+        line = "  {mode:<12} batches={batches:<4} largest_batch_tokens={largest_batch_tokens:<7} padding_ratio={padding_ratio}".format(
+            mode=mode, **plan
+        )
+        if mode in report:
+            line += " chunks_per_sec={chunks_per_sec} seconds={seconds}".format(**report[mode])
+        print(line)
+    return report
+
+
+if __name__ == "__main__":
+    main()
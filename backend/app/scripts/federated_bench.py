@@ -0,0 +1,93 @@
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..services.collection_registry import CollectionRegistry, CollectionSpec
+from ..services.vector_store import VectorStore
+from .bench_utils import config_overrides, normalize, percentiles
+from .routing_bench import synthetic_documents
+
+
+def run_benchmark(
+    documents: int = 2_000,
+    chunks_per_document: int = 8,
+    dimension: int = 128,
+    shards: int = 4,
+    queries: int = 200,
+    limit: int = 8,
+    backend: str = "memory",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    doc_vectors, chunk_vectors = synthetic_documents(documents, chunks_per_document, dimension, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    query_docs = rng.integers(0, documents, size=queries)
+    query_vectors = normalize(doc_vectors[query_docs] + rng.standard_normal((queries, dimension)).astype(np.float32) / np.sqrt(dimension))
+
+    overrides: Dict[str, Any] = {"vector_store_backend": backend, "vector_dimension": dimension, "keyword_index_backend": "qdrant_text"}
+    if backend == "qdrant":
+        overrides["qdrant_path"] = ":memory:"
+    with config_overrides(**overrides):
+        shard_names = [f"shard-{idx}" for idx in range(max(shards, 1))]
+        specs = {"single": CollectionSpec("single", "bench_single")}
+        specs.update({name: CollectionSpec(name, f"bench_{name.replace('-', '_')}") for name in shard_names})
+        registry = CollectionRegistry(specs)
+        for doc in range(documents):
+            chunks = [{"chunk_text": ""} for _ in range(chunks_per_document)]
+            registry.get("single").upsert_chunks(f"doc-{doc}.txt", chunks, chunk_vectors[doc])
+            registry.get(shard_names[doc % len(shard_names)]).upsert_chunks(f"doc-{doc}.txt", chunks, chunk_vectors[doc])
+
+        timings: Dict[str, List[float]] = {"single": [], "federated": []}
+        overlaps: List[float] = []
+        for query in query_vectors:
+            results = {}
+            for mode, names in (("single", ["single"]), ("federated", shard_names)):
+                started = time.perf_counter()
+                results[mode] = registry.hybrid_search(names, "", query.tolist(), limit=limit)
+                timings[mode].append((time.perf_counter() - started) * 1000.0)
+            single_keys = {(hit["payload"]["source_file"], hit["payload"]["chunk_index"]) for hit in results["single"]}
+            federated_keys = {(hit["payload"]["source_file"], hit["payload"]["chunk_index"]) for hit in results["federated"]}
+            overlaps.append(len(single_keys & federated_keys) / max(len(single_keys), 1))
+
+        VectorStore._shared_memory_indexes.clear()
+
+    return {
+        "documents": documents,
+        "chunks": documents * chunks_per_document,
+        "shards": len(shard_names),
+        "backend": backend,
+        "single": percentiles(timings["single"]),
+        "federated": percentiles(timings["federated"]),
+        "overlap_vs_single": round(float(np.mean(overlaps)), 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare one collection against the same corpus sharded across collections.")
+    parser.add_argument("--documents", type=int, default=2_000, help="Synthetic source files.")
+    parser.add_argument("--chunks-per-document", type=int, default=8, help="Chunks per synthetic file.")
+    parser.add_argument("--dimension", type=int, default=128, help="Vector dimension.")
+    parser.add_argument("--shards", type=int, default=4, help="Collections the corpus is split across.")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries.")
+    parser.add_argument("--limit", type=int, default=8, help="Top-k chunks per query.")
+    parser.add_argument("--backend", choices=["memory", "qdrant"], default="memory", help="qdrant = embedded :memory: stand-in.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        documents=args.documents,
+        chunks_per_document=args.chunks_per_document,
+        dimension=args.dimension,
+        shards=args.shards,
+        queries=args.queries,
+        limit=args.limit,
+        backend=args.backend,
+    )
+    print("documents={documents} chunks={chunks} shards={shards} backend={backend} overlap_vs_single={overlap_vs_single}".format(**report))
+    for mode in ("single", "federated"):
+        print("  {mode:<10} p50_ms={p50_ms:<9} p95_ms={p95_ms:<9} mean_ms={mean_ms}".format(mode=mode, **report[mode]))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import math
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..services.hit import Hit
+from ..services.query_transformer import QueryTransformer
+from ..services.rag_service import RAGService
+from ..services.reranker_service import RerankerService
+from ..services.vector_store import VectorStore
+
+
+def synthetic_legs(candidates: int, text_chars: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    payloads = [
+        {
+            "source_file": f"doc-{(seed + idx) % 97}.pdf",
+            "chunk_index": idx,
+            "chunk_text": ("policy refund invoice " * (text_chars // 22 + 1))[:text_chars],
+            "chunk_role": "child",
+            "parent_id": f"p{idx // 4}",
+            "parent_text": "parent " * 40,
+            "heading_path": ["Handbook", f"Section {idx // 10}"],
+            "section_type": "text",
+            "page": idx // 5,
+            "version_id": "v1",
+        }
+        for idx in range(candidates)
+    ]
+    dense = [{"id": str(idx), "payload": payload, "score": 1.0 - idx / candidates} for idx, payload in enumerate(payloads)]
+    keyword = [{"id": str(idx), "payload": payloads[idx], "score": 0.5} for idx in range(0, candidates, 3)]
+    return dense, keyword
+
+
+# The dict pipeline below reproduces the per-stage copies the retrieval path made before Hit.
+def _dict_merge(dense: List[Dict[str, Any]], keyword: List[Dict[str, Any]], alpha: float, limit: int):
+    merged: Dict[str, Dict[str, Any]] = {}
+    for hit in dense:
+        payload = hit.get("payload", {}) or {}
+        merged[VectorStore._payload_key(payload)] = {
+            "payload": payload,
+            "vector_score": (float(hit.get("score", 0.0)) + 1.0) / 2.0,
+            "keyword_score": 0.0,
+        }
+    for hit in keyword:
+        payload = hit.get("payload", {}) or {}
+        entry = merged.setdefault(
+            VectorStore._payload_key(payload, fallback=hit.get("id")),
+            {"payload": payload, "vector_score": 0.0, "keyword_score": 0.0},
+        )
+        entry["keyword_score"] = max(entry["keyword_score"], float(hit.get("score", 0.0)))
+    ranked = [
+        {
+            "payload": entry["payload"],
+            "score": alpha * entry["vector_score"] + (1.0 - alpha) * entry["keyword_score"],
+            "vector_score": entry["vector_score"],
+            "keyword_score": entry["keyword_score"],
+        }
+        for entry in merged.values()
+    ]
+    ranked.sort(key=lambda item: item["score"], reverse=True)
+    return ranked[:limit]
+
+
+def _dict_expand(store: VectorStore, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    deduped: Dict[str, Dict[str, Any]] = {}
+    parent_keys = {store._parent_key(hit.get("payload", {}) or {}) for hit in hits}
+    parent_keys.discard(None)
+    parent_texts = store._fetch_parent_texts(parent_keys)
+    for hit in hits:
+        payload = dict(hit.get("payload", {}) or {})
+        parent_text = payload.get("parent_text") or payload.get("parent_chunk_text")
+        if not parent_text and payload.get("chunk_role") == "parent":
+            parent_text = payload.get("chunk_text")
+        if not parent_text and parent_texts:
+            parent_text = parent_texts.get(store._parent_key(payload))
+        if parent_text:
+            payload["chunk_text"] = parent_text
+            payload["chunk_role"] = "parent_context"
+        expanded = {
+            "payload": payload,
+            "score": float(hit.get("score", 0.0)),
+            "vector_score": float(hit.get("vector_score", hit.get("score", 0.0))),
+            "keyword_score": float(hit.get("keyword_score", 0.0)),
+        }
+        key = VectorStore._payload_key(payload, fallback=id(expanded))
+        previous = deduped.get(key)
+        if previous is None or float(expanded.get("score", 0.0)) > float(previous.get("score", 0.0)):
+            deduped[key] = expanded
+    ranked = list(deduped.values())
+    ranked.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+    return ranked
+
+
+def _dict_rrf(rankings: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result_list in rankings:
+        for rank, item in enumerate(result_list, start=1):
+            payload = item.get("payload", {}) or {}
+            key = "{}::{}".format(payload.get("source_file"), payload.get("chunk_index", payload.get("parent_id", rank)))
+            entry = merged.setdefault(
+                key,
+                {
+                    "payload": payload,
+                    "score": 0.0,
+                    "vector_score": item.get("vector_score", 0.0),
+                    "keyword_score": item.get("keyword_score", 0.0),
+                },
+            )
+            entry["score"] += 1.0 / (k + rank)
+            entry["vector_score"] = max(float(entry.get("vector_score", 0.0)), float(item.get("vector_score", 0.0)))
+            entry["keyword_score"] = max(float(entry.get("keyword_score", 0.0)), float(item.get("keyword_score", 0.0)))
+    fused = list(merged.values())
+    fused.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+    return fused
+
+
+def _dict_rerank(query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    reranked = []
+    for item in hits:
+        hit = {"payload": item.get("payload", {}) or {}, "score": float(item.get("score", 0.0))}
+        chunk_text = str(hit["payload"].get("chunk_text", ""))
+        score = RerankerService._token_overlap_score(query, chunk_text, hit["score"])
+        scored = dict(hit)
+        scored["score"] = 1.0 / (1.0 + math.exp(-5.0 * (score - 0.5)))
+        reranked.append(scored)
+    reranked.sort(key=lambda item: item["score"], reverse=True)
+    return reranked
+
+
+def dict_pipeline(legs, query: str, limit: int, top_k: int) -> List[Dict[str, Any]]:
+    store = VectorStore.__new__(VectorStore)
+    rankings = [_dict_expand(store, _dict_merge(dense, keyword, 0.7, limit)) for dense, keyword in legs]
+    hits = _dict_rerank(query, _dict_rrf(rankings)[:limit])[:top_k]
+    return RAGService._source_details_from_hits(hits)
+
+
+def hit_pipeline(legs, query: str, limit: int, top_k: int) -> List[Dict[str, Any]]:
+    store = VectorStore.__new__(VectorStore)
+    reranker = RerankerService()
+    rankings = [store._dedupe_expanded_hits(VectorStore._blend_legs(dense, keyword, 0.7, limit)) for dense, keyword in legs]
+    candidates = QueryTransformer.reciprocal_rank_fusion(rankings)[:limit]
+    hits = reranker._rerank_mock(query, [reranker._as_hit(hit, idx) for idx, hit in enumerate(candidates)])
+    return RAGService._source_details_from_hits(hits[:top_k])
+
+
+def _measure(pipeline: Callable, make_legs: Callable, queries: int, **kwargs: Any) -> Dict[str, float]:
+    peaks: List[int] = []
+    seconds: List[float] = []
+    for seed in range(queries):
+        legs = make_legs(seed)
+        started = time.perf_counter()
+        pipeline(legs, **kwargs)
+        seconds.append(time.perf_counter() - started)
+
+        # Fresh legs for the traced run: the Hit path re-scores leg records in place.
+        legs = make_legs(seed)
+        tracemalloc.start()
+        result = pipeline(legs, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        del result
+    return {
+        "peak_kib": round(sum(peaks) / len(peaks) / 1024.0, 1),
+        "mean_ms": round(sum(seconds) / len(seconds) * 1000.0, 3),
+    }
+
+
+def run_benchmark(
+    candidates: int = 60,
+    query_variants: int = 3,
+    limit: int = 20,
+    top_k: int = 5,
+    text_chars: int = 800,
+    queries: int = 50,
+) -> Dict[str, Any]:
+    def dict_legs(seed: int):
+        return [synthetic_legs(candidates, text_chars, seed=seed + variant) for variant in range(query_variants)]
+
+    def hit_legs(seed: int):
+        return [
+            ([Hit.from_value(hit) for hit in dense], [Hit.from_value(hit) for hit in keyword])
+            for dense, keyword in dict_legs(seed)
+        ]
+
+    options = {"query": "refund policy", "limit": limit, "top_k": top_k}
+    report = {
+        "candidates": candidates,
+        "query_variants": query_variants,
+        "dict": _measure(dict_pipeline, dict_legs, queries, **options),
+        "hit": _measure(hit_pipeline, hit_legs, queries, **options),
+    }
+    report["peak_reduction"] = round(1.0 - report["hit"]["peak_kib"] / max(report["dict"]["peak_kib"], 1e-9), 3)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Per-query allocations of dict hits vs slotted Hit records.")
+    parser.add_argument("--candidates", type=int, default=60, help="Dense candidates per query variant.")
+    parser.add_argument("--query-variants", type=int, default=3, help="Multi-query variants fused with RRF.")
+    parser.add_argument("--limit", type=int, default=20, help="Candidates kept per variant and passed to the reranker.")
+    parser.add_argument("--text-chars", type=int, default=800, help="chunk_text length per payload.")
+    parser.add_argument("--queries", type=int, default=50, help="Measured queries.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        candidates=args.candidates,
+        query_variants=args.query_variants,
+        limit=args.limit,
+        text_chars=args.text_chars,
+        queries=args.queries,
+    )
+    print("candidates={candidates} query_variants={query_variants} peak_reduction={peak_reduction}".format(**report))
+    for mode in ("dict", "hit"):
+        print("  {mode:<5} peak_kib={peak_kib:<8} mean_ms={mean_ms}".format(mode=mode, **report[mode]))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..config import config
+from ..services.document_version_service import DocumentVersionService
+from ..services.embedding_service import EmbeddingService
+from ..services.vector_store import VectorStore
+from .bench_utils import config_overrides
+
+
+class _FakeLocalModel:
+    # Stands in for Qwen3VLEmbedder.process: a float32 matrix, as the local model returns.
+    def __init__(self, dimension: int, seed: int = 0):
+        self.dimension = dimension
+        self.rng = np.random.default_rng(seed)
+
+    def process(self, items: List[Dict[str, Any]]) -> np.ndarray:
+        matrix = self.rng.standard_normal((len(items), self.dimension)).astype(np.float32)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class _StringRedis:
+    # Keeps version snapshots as serialized strings, like the Redis-backed deployment.
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.values[key] = value
+
+
+def _embedding_service(dimension: int) -> EmbeddingService:
+    service = EmbeddingService.__new__(EmbeddingService)
+    service.backend = "local"
+    service.cache = None
+    service.model = _FakeLocalModel(dimension)
+    service._local_model_name = config.embedding_model
+    service.device = "cpu"
+    return service
+
+
+def _ingest(mode: str, chunks: List[Dict[str, Any]], dimension: int) -> Dict[str, Any]:
+    service = _embedding_service(dimension)
+    store = VectorStore(collection_name=f"ingest_bench_{mode}")
+    versions = DocumentVersionService(redis_client=_StringRedis())
+    texts = [chunk["chunk_text"] for chunk in chunks]
+    stages: Dict[str, float] = {}
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    embeddings = service.get_embeddings_array(texts) if mode == "numpy" else service.get_embeddings(texts)
+    stages["embed"] = time.perf_counter() - started
+    mark = time.perf_counter()
+    store.sync_file_chunks("bench.txt", chunks, embeddings)
+    stages["upsert"] = time.perf_counter() - mark
+    mark = time.perf_counter()
+    versions.record_version("bench.txt", "hash", chunks, embeddings=embeddings)
+    stages["version"] = time.perf_counter() - mark
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    snapshot_bytes = len(versions.client.values.get(versions._key("bench.txt"), ""))
+    VectorStore._shared_memory_indexes.clear()
+    return {
+        "seconds": round(elapsed, 3),
+        "stages": {name: round(seconds, 3) for name, seconds in stages.items()},
+        "peak_mib": round(peak / (1024 * 1024), 1),
+        "version_snapshot_mib": round(snapshot_bytes / (1024 * 1024), 1),
+    }
+
+
+def run_benchmark(chunks: int = 10_000, dimension: int = 1024, text_chars: int = 400) -> Dict[str, Any]:
+    corpus = [
+        {"chunk_text": (f"chunk {idx} " + "policy refund invoice " * (text_chars // 22 + 1))[:text_chars], "metadata": {}}
+        for idx in range(chunks)
+    ]
+    overrides = {
+        "vector_store_backend": "memory",
+        "vector_dimension": dimension,
+        "keyword_index_backend": "qdrant_text",
+        "document_routing_enabled": False,
+        "tiering_enabled": False,
+    }
+    report: Dict[str, Any] = {"chunks": chunks, "dimension": dimension}
+    with config_overrides(**overrides):
+        for mode in ("lists", "numpy"):
+            report[mode] = _ingest(mode, corpus, dimension)
+    report["peak_reduction"] = round(1.0 - report["numpy"]["peak_mib"] / max(report["lists"]["peak_mib"], 1e-9), 3)
+    report["speedup"] = round(report["lists"]["seconds"] / max(report["numpy"]["seconds"], 1e-9), 2)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Peak memory and time of one ingest with list vs float32 matrix embeddings.")
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(chunks=args.chunks, dimension=args.dimension)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+    print("chunks={chunks} dimension={dimension} peak_reduction={peak_reduction} speedup={speedup}x".format(**report))
+    for mode in ("lists", "numpy"):
+        result = report[mode]
+        print(
+            "  {mode:<6} seconds={seconds:<7} peak_mib={peak_mib:<8} version_snapshot_mib={version_snapshot_mib:<7} stages={stages}".format(
+                mode=mode, **result
+            )
+        )
+    return report
+
+
+if __name__ == "__main__":
+    main()
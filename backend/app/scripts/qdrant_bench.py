@@ -0,0 +1,126 @@
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from ..config import config
+from ..services.vector_store import VectorStore
+from .ann_recall import synthetic_vectors
+from .bench_utils import config_overrides, percentiles
+
+BENCH_OVERRIDES = {
+    "keyword_index_backend": "qdrant_text",
+    "qdrant_write_coalescing": False,
+}
+
+
+def synthetic_corpus(points: int, files: int, vocabulary: int = 2000, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    words = [f"term{idx}" for idx in range(vocabulary)]
+    corpus = []
+    for idx in range(points):
+        text = " ".join(words[word] for word in rng.integers(0, vocabulary, size=40))
+        corpus.append({"source_file": f"doc-{idx % max(files, 1)}.txt", "chunk_text": text})
+    return corpus
+
+
+def _timed(operation: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return percentiles(samples)
+
+
+def bench_target(
+    client: QdrantClient,
+    corpus: List[Dict[str, Any]],
+    vectors: np.ndarray,
+    *,
+    queries: int,
+    limit: int,
+    collection: str,
+) -> Dict[str, Any]:
+    rng = np.random.default_rng(1)
+    with config_overrides(collection_name=collection, vector_dimension=int(vectors.shape[1]), **BENCH_OVERRIDES):
+        client.delete_collection(collection)
+        store = VectorStore(client=client)
+        load_started = time.perf_counter()
+        by_file: Dict[str, List[int]] = {}
+        for row, chunk in enumerate(corpus):
+            by_file.setdefault(chunk["source_file"], []).append(row)
+        for filename, rows in by_file.items():
+            store.upsert_chunks(filename, [{"chunk_text": corpus[row]["chunk_text"]} for row in rows], vectors[rows].tolist())
+        load_seconds = time.perf_counter() - load_started
+
+        query_rows = rng.choice(len(corpus), size=queries)
+        query_vectors = [vectors[row].tolist() for row in query_rows]
+        query_texts = [" ".join(corpus[row]["chunk_text"].split()[:3]) for row in query_rows]
+        filenames = sorted(by_file)
+        cursor = {"idx": 0}
+
+        def _next() -> int:
+            cursor["idx"] = (cursor["idx"] + 1) % queries
+            return cursor["idx"]
+
+        def _hybrid() -> Any:
+            # Text and vector must come from the same sampled chunk.
+            idx = _next()
+            return store.hybrid_search(query_texts[idx], query_vectors[idx], limit=limit)
+
+        operations = {
+            "dense_search": lambda: store.search(query_vectors[_next()], limit=limit),
+            "keyword_search": lambda: store.keyword_search(query_texts[_next()], limit=limit),
+            "hybrid_search": _hybrid,
+            "get_file_chunks": lambda: store.get_file_chunks(filenames[_next() % len(filenames)]),
+        }
+        results = {name: _timed(operation, queries) for name, operation in operations.items()}
+        client.delete_collection(collection)
+    return {"load_seconds": round(load_seconds, 3), "operations": results}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare embedded and server Qdrant latency for the retrieval query mix.")
+    parser.add_argument("--points", type=int, default=5000, help="Synthetic chunks to load.")
+    parser.add_argument("--files", type=int, default=50, help="Source files the chunks are spread over.")
+    parser.add_argument("--dimension", type=int, default=config.vector_dimension, help="Vector dimension.")
+    parser.add_argument("--queries", type=int, default=200, help="Timed calls per operation.")
+    parser.add_argument("--limit", type=int, default=8, help="Top-k per query.")
+    parser.add_argument("--targets", default="embedded,server", help="Comma-separated: embedded, server.")
+    parser.add_argument("--embedded-path", default=":memory:", help="Embedded storage directory or :memory:.")
+    parser.add_argument("--collection", default="nexusai_bench", help="Scratch collection name.")
+    args = parser.parse_args(argv)
+
+    corpus = synthetic_corpus(args.points, args.files)
+    vectors = synthetic_vectors(args.points, args.dimension)
+    report: Dict[str, Any] = {"points": args.points, "dimension": args.dimension, "targets": {}}
+    for target in [value.strip() for value in args.targets.split(",") if value.strip()]:
+        if target == "embedded":
+            if args.embedded_path == ":memory:":
+                client = QdrantClient(location=":memory:")
+            else:
+                client = QdrantClient(path=args.embedded_path)
+        elif target == "server":
+            client = QdrantClient(host=config.qdrant_host, port=config.qdrant_port, check_compatibility=False)
+            try:
+                client.get_collections()
+            except Exception as exc:
+                print(f"target=server skipped: {exc}")
+                continue
+        else:
+            raise ValueError(f"unknown target: {target}")
+        result = bench_target(
+            client, corpus, vectors, queries=args.queries, limit=args.limit, collection=args.collection
+        )
+        report["targets"][target] = result
+        print(f"target={target} load_s={result['load_seconds']}")
+        for name, timing in result["operations"].items():
+            print("  {name:<16} p50_ms={p50_ms:<9} p95_ms={p95_ms:<9} mean_ms={mean_ms}".format(name=name, **timing))
+    return report
+
+
+if __name__ == "__main__":
+    main()
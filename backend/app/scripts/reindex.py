@@ -24,8 +24,6 @@ METADATA_FIELDS = (
     "page",
     "slide",
     "chunk_role",
-    "parent_text",
-    "parent_chunk_text",
 )
 
 
@@ -180,6 +178,8 @@ def run_reindex(
 
     if source_name != config.collection_name:
         raise ValueError("reindex currently supports the active collection alias only")
+    if vector_store.client is None:
+        raise ValueError("reindex requires the qdrant vector store backend")
 
     if not _collection_exists(vector_store.client, target_name):
         vector_store._create_collection(collection_name=target_name)
@@ -201,7 +201,7 @@ def run_reindex(
             points.append(
                 models.PointStruct(
                     id=VectorStore._point_id_for_payload(filename, payload),
-                    vector=vector,
+                    vector=vector_store._point_vector(vector, chunk["chunk_text"], sparse=config.sparse_vectors_enabled),
                     payload=payload,
                 )
             )
@@ -220,6 +220,14 @@ def run_reindex(
     if not dry_run:
         swap_alias(vector_store.client, config.collection_name, target_name)
         alias_swapped = True
+        vector_store.rebuild_keyword_index()
+        if config.document_routing_enabled:
+            vector_store.rebuild_document_summaries()
+        cold = vector_store._cold_store()
+        if cold is not None:
+            # Cold files were rewritten into the new hot collection too; the next tiering run demotes them again.
+            for filename in cold._scan_file_counts():
+                cold._delete_tier_file(filename)
 
     return {
         "source_collection": source_name,
@@ -228,6 +236,7 @@ def run_reindex(
         "points_written": points_written,
         "alias_swapped": alias_swapped,
         "dry_run": dry_run,
+        "embedding_cache": embedding_service.cache_stats(),
         "files": file_summaries,
     }
 
@@ -0,0 +1,126 @@
+import argparse
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import config
+from ..services.vector_store import VectorStore
+from .bench_utils import config_overrides, normalize, percentiles
+
+
+def synthetic_documents(
+    documents: int,
+    chunks_per_document: int,
+    dimension: int,
+    noise: float = 1.0,
+    topics: int = 256,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(topics, 1), dimension)).astype(np.float32)
+    labels = rng.integers(0, centers.shape[0], size=documents)
+    doc_vectors = normalize(centers[labels] + 0.6 * rng.standard_normal((documents, dimension)).astype(np.float32))
+    # noise is relative to the unit document vector: standard normal rows have norm ~sqrt(dimension).
+    offsets = rng.standard_normal((documents, chunks_per_document, dimension)).astype(np.float32)
+    chunk_vectors = normalize(doc_vectors[:, None, :] + (noise / np.sqrt(dimension)) * offsets)
+    return doc_vectors, chunk_vectors
+
+
+def run_benchmark(
+    documents: int = 10_000,
+    chunks_per_document: int = 8,
+    dimension: int = 128,
+    queries: int = 200,
+    limit: int = 8,
+    top_n: int = 20,
+    noise: float = 1.0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    doc_vectors, chunk_vectors = synthetic_documents(documents, chunks_per_document, dimension, noise=noise, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    query_docs = rng.integers(0, documents, size=queries)
+    query_vectors = normalize(
+        doc_vectors[query_docs] + (noise / np.sqrt(dimension)) * rng.standard_normal((queries, dimension)).astype(np.float32)
+    )
+
+    with config_overrides(
+        vector_store_backend="memory",
+        vector_dimension=dimension,
+        keyword_index_backend="qdrant_text",
+        document_routing_enabled=True,
+        document_routing_top_n=top_n,
+        document_routing_min_documents=1,
+    ):
+        store = VectorStore()
+        load_started = time.perf_counter()
+        for doc in range(documents):
+            chunks = [
+                {"chunk_text": "", "metadata": {"heading_path": [f"doc-{doc}", f"section-{idx}"]}}
+                for idx in range(chunks_per_document)
+            ]
+            store.sync_file_chunks(f"doc-{doc}.txt", chunks, chunk_vectors[doc])
+        load_seconds = time.perf_counter() - load_started
+
+        timings: Dict[str, List[float]] = {"flat": [], "routed": []}
+        recalls: List[float] = []
+        routed_to_source = 0
+        for doc, query in zip(query_docs, query_vectors):
+            results = {}
+            for mode in ("flat", "routed"):
+                started = time.perf_counter()
+                results[mode] = store.hybrid_search("", query.tolist(), limit=limit, document_routing=mode == "routed")
+                timings[mode].append((time.perf_counter() - started) * 1000.0)
+            flat_keys = {(hit["payload"]["source_file"], hit["payload"]["chunk_index"]) for hit in results["flat"]}
+            routed_keys = {(hit["payload"]["source_file"], hit["payload"]["chunk_index"]) for hit in results["routed"]}
+            recalls.append(len(flat_keys & routed_keys) / max(len(flat_keys), 1))
+            routed_to_source += int(any(key[0] == f"doc-{doc}.txt" for key in routed_keys))
+
+        VectorStore._shared_memory_indexes.clear()
+        VectorStore._document_summaries_synced.clear()
+
+    return {
+        "documents": documents,
+        "chunks": documents * chunks_per_document,
+        "dimension": dimension,
+        "top_n": top_n,
+        "noise": noise,
+        "load_seconds": round(load_seconds, 3),
+        "flat": percentiles(timings["flat"]),
+        "routed": percentiles(timings["routed"]),
+        "recall_vs_flat": round(float(np.mean(recalls)), 4),
+        "source_document_hit_rate": round(routed_to_source / max(queries, 1), 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare two-stage document routing against flat chunk search.")
+    parser.add_argument("--documents", type=int, default=10_000, help="Synthetic source files.")
+    parser.add_argument("--chunks-per-document", type=int, default=8, help="Chunks per synthetic file.")
+    parser.add_argument("--dimension", type=int, default=128, help="Vector dimension.")
+    parser.add_argument("--queries", type=int, default=200, help="Timed queries.")
+    parser.add_argument("--limit", type=int, default=8, help="Top-k chunks per query.")
+    parser.add_argument("--top-n", type=int, default=config.document_routing_top_n, help="Documents kept by stage one.")
+    parser.add_argument("--noise", type=float, default=1.0, help="Chunk/query spread around each document vector.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        documents=args.documents,
+        chunks_per_document=args.chunks_per_document,
+        dimension=args.dimension,
+        queries=args.queries,
+        limit=args.limit,
+        top_n=args.top_n,
+        noise=args.noise,
+    )
+    print(
+        "documents={documents} chunks={chunks} top_n={top_n} recall_vs_flat={recall_vs_flat} "
+        "source_document_hit_rate={source_document_hit_rate}".format(**report)
+    )
+    for mode in ("flat", "routed"):
+        print("  {mode:<7} p50_ms={p50_ms:<9} p95_ms={p95_ms:<9} mean_ms={mean_ms}".format(mode=mode, **report[mode]))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+from typing import List, Optional
+
+from ..services.tiering import TieringJob
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Run one hot/cold tiering pass from the persisted access stats (the API runs this on a timer)."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print the promote/demote plan without moving files.")
+    args = parser.parse_args(argv)
+
+    report = TieringJob().run(dry_run=args.dry_run)
+    print(
+        "Tiering: {promoted_count} promoted, {demoted_count} demoted, {points_moved} points moved (dry_run={dry_run})".format(
+            promoted_count=len(report["promoted"]), demoted_count=len(report["demoted"]), **report
+        )
+    )
+    for action in ("promoted", "demoted"):
+        for source_file in report[action]:
+            print(f"  {action}: {source_file}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config import config
+
+logger = logging.getLogger("nexusai.access_tracker")
+
+ChunkKey = Tuple[str, int]
+
+
+class AccessTracker:
+    # One set of counters per process: RAGService records into it, the tiering job reads and decays it.
+    _counts: Dict[ChunkKey, float] = {}
+    _first_seen: Dict[str, float] = {}
+    _lock = threading.Lock()
+    _loaded_paths: Set[str] = set()
+
+    def __init__(self, path: Optional[str] = None):
+        path = config.tiering_stats_path if path is None else path
+        self.path = Path(path) if path else None
+        if self.path is not None and str(self.path) not in self._loaded_paths:
+            self._loaded_paths.add(str(self.path))
+            if self.path.exists():
+                self.load()
+
+    @staticmethod
+    def _chunk_key(hit: Dict[str, Any]) -> Optional[ChunkKey]:
+        payload = hit.get("payload") or {}
+        source_file = payload.get("source_file")
+        if not source_file:
+            return None
+        return str(source_file), int(payload.get("chunk_index", 0) or 0)
+
+    def record(self, hits: Iterable[Dict[str, Any]]) -> int:
+        keys = [key for key in map(self._chunk_key, hits) if key is not None]
+        if keys:
+            with self._lock:
+                for key in keys:
+                    self._counts[key] = self._counts.get(key, 0.0) + 1.0
+        return len(keys)
+
+    def chunk_hits(self) -> Dict[ChunkKey, float]:
+        with self._lock:
+            return dict(self._counts)
+
+    def file_heat(self) -> Dict[str, float]:
+        heat: Dict[str, float] = {}
+        with self._lock:
+            for (source_file, _), count in self._counts.items():
+                heat[source_file] = heat.get(source_file, 0.0) + count
+        return heat
+
+    def observe_files(self, files: Iterable[str], now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        files = set(files)
+        with self._lock:
+            for source_file in list(self._first_seen):
+                if source_file not in files:
+                    del self._first_seen[source_file]
+            for source_file in files:
+                self._first_seen.setdefault(source_file, now)
+            return dict(self._first_seen)
+
+    def decay(self, factor: float, floor: float = 0.01) -> None:
+        with self._lock:
+            for key in list(self._counts):
+                count = self._counts[key] * factor
+                if count < floor:
+                    del self._counts[key]
+                else:
+                    self._counts[key] = count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._first_seen.clear()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            snapshot = {
+                "version": 1,
+                "counts": [[source_file, chunk_index, count] for (source_file, chunk_index), count in self._counts.items()],
+                "first_seen": dict(self._first_seen),
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                snapshot = json.load(handle)
+        except Exception as exc:
+            logger.warning("⚠️ Access stats at %s unreadable, starting empty: %s", self.path, exc)
+            return
+        rows: List[Any] = snapshot.get("counts") or []
+        with self._lock:
+            for source_file, chunk_index, count in rows:
+                key = (str(source_file), int(chunk_index))
+                self._counts[key] = self._counts.get(key, 0.0) + float(count)
+            for source_file, first_seen in (snapshot.get("first_seen") or {}).items():
+                self._first_seen.setdefault(str(source_file), float(first_seen))
+        logger.info("📈 Loaded access stats from %s (%s chunks)", self.path, len(rows))
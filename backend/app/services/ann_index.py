@@ -0,0 +1,192 @@
+import logging
+import math
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .memory_index import MemoryVectorIndex
+
+logger = logging.getLogger("nexusai.ann_index")
+
+ASSIGN_BATCH_SIZE = 65536
+TRAIN_POINTS_PER_CENTROID = 64
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = ASSIGN_BATCH_SIZE) -> np.ndarray:
+    labels = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], batch_size):
+        block = vectors[start : start + batch_size]
+        labels[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, min(int(n_clusters), vectors.shape[0]))
+    centroids = vectors[rng.choice(vectors.shape[0], size=n_clusters, replace=False)].copy()
+    for _ in range(max(int(iterations), 1)):
+        labels = assign_to_centroids(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(vectors.shape[0], size=int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFVectorIndex(MemoryVectorIndex):
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        *,
+        nlist: int = 0,
+        nprobe: int = 8,
+        min_train_points: int = 20000,
+        initial_capacity: int = 1024,
+        seed: int = 0,
+        auto_train: bool = True,
+        background_training: bool = True,
+    ):
+        super().__init__(dimension=dimension, initial_capacity=initial_capacity)
+        self.nlist = max(int(nlist), 0)
+        self.nprobe = max(int(nprobe), 1)
+        self.min_train_points = max(int(min_train_points), 1)
+        self.seed = seed
+        self.auto_train = auto_train
+        self.background_training = background_training
+        self._centroids: Optional[np.ndarray] = None
+        # Inverted lists: per list a growable row array, plus each row's list and slot for O(1) removal.
+        self._assignments = np.full(0, -1, dtype=np.int32)
+        self._slots = np.zeros(0, dtype=np.int64)
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+        self._trained_size = 0
+        self._training: Optional[threading.Thread] = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def _target_nlist(self) -> int:
+        if self.nlist:
+            return self.nlist
+        return max(1, int(math.sqrt(self._size)))
+
+    def _capacity_changed(self, capacity: int) -> None:
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[: self._size] = self._assignments[: self._size]
+        slots = np.zeros(capacity, dtype=np.int64)
+        slots[: self._size] = self._slots[: self._size]
+        self._assignments, self._slots = assignments, slots
+
+    def _list_append(self, list_id: int, row: int) -> None:
+        size = int(self._list_sizes[list_id])
+        rows = self._lists[list_id]
+        if size >= rows.shape[0]:
+            grown = np.empty(max(16, rows.shape[0] * 2), dtype=np.int64)
+            grown[:size] = rows[:size]
+            rows = self._lists[list_id] = grown
+        rows[size] = row
+        self._list_sizes[list_id] = size + 1
+        self._assignments[row] = list_id
+        self._slots[row] = size
+
+    def _list_remove(self, row: int) -> None:
+        list_id = int(self._assignments[row])
+        if list_id < 0:
+            return
+        last = int(self._list_sizes[list_id]) - 1
+        slot = int(self._slots[row])
+        rows = self._lists[list_id]
+        if slot != last:
+            rows[slot] = rows[last]
+            self._slots[rows[slot]] = slot
+        self._list_sizes[list_id] = last
+        self._assignments[row] = -1
+
+    def _rows_written(self, rows: np.ndarray) -> None:
+        if self._centroids is not None and rows.size:
+            labels = assign_to_centroids(self._matrix[rows], self._centroids)
+            for row, label in zip(rows.tolist(), labels.tolist()):
+                if self._assignments[row] == label:
+                    continue
+                self._list_remove(row)
+                self._list_append(label, row)
+        if self.auto_train and self._needs_training():
+            if self.background_training:
+                self._train_in_background()
+            else:
+                self.train()
+
+    def _row_removed(self, row: int) -> None:
+        self._list_remove(row)
+
+    def _row_moved(self, source: int, target: int) -> None:
+        list_id = int(self._assignments[source])
+        self._assignments[target] = list_id
+        self._assignments[source] = -1
+        if list_id >= 0:
+            slot = int(self._slots[source])
+            self._slots[target] = slot
+            self._lists[list_id][slot] = target
+
+    def _needs_training(self) -> bool:
+        if self._size < self.min_train_points:
+            return False
+        return self._centroids is None or self._size >= 2 * self._trained_size
+
+    def _train_in_background(self) -> None:
+        if self._training is not None and self._training.is_alive():
+            return
+        self._training = threading.Thread(target=self.train, name="nexusai-ivf-train", daemon=True)
+        self._training.start()
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> None:
+        training = self._training
+        if training is not None:
+            training.join(timeout)
+
+    def train(self) -> None:
+        # k-means runs on a copied sample outside the lock; only the final assignment pass holds it.
+        with self._lock:
+            if self._size == 0:
+                return
+            n_clusters = self._target_nlist()
+            rng = np.random.default_rng(self.seed)
+            sample_size = min(self._size, n_clusters * TRAIN_POINTS_PER_CENTROID)
+            sample = self._matrix[np.sort(rng.choice(self._size, size=sample_size, replace=False))]
+        centroids = spherical_kmeans(sample, n_clusters, seed=self.seed)
+        with self._lock:
+            self._install_centroids(centroids)
+            logger.info("IVF index trained: %s points, %s lists", self._size, centroids.shape[0])
+
+    def _install_centroids(self, centroids: np.ndarray) -> None:
+        labels = assign_to_centroids(self._matrix[: self._size], centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=centroids.shape[0])
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        self._lists = [order[bounds[idx] : bounds[idx + 1]].astype(np.int64) for idx in range(centroids.shape[0])]
+        self._list_sizes = counts.astype(np.int64)
+        self._assignments[: self._size] = labels
+        for rows in self._lists:
+            self._slots[rows] = np.arange(rows.shape[0])
+        self._centroids = centroids
+        self._trained_size = self._size
+
+    def _candidate_rows(self, query: np.ndarray, limit: int) -> Optional[np.ndarray]:
+        if self._centroids is None:
+            return None
+        nprobe = min(self.nprobe, self._centroids.shape[0])
+        if nprobe >= self._centroids.shape[0]:
+            return None
+        centroid_scores = self._centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self._lists[probe][: self._list_sizes[probe]] for probe in probes])
+        if rows.size < limit:
+            return None
+        return rows
@@ -0,0 +1,320 @@
+import gzip
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("nexusai.bm25")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*|[㐀-䶿一-鿿]+")
+CJK_PATTERN = re.compile(r"[㐀-䶿一-鿿]")
+LOG_COMPACT_MIN_BYTES = 8 * 1024 * 1024
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for match in TOKEN_PATTERN.findall((text or "").lower()):
+        if CJK_PATTERN.match(match):
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[idx : idx + 2] for idx in range(len(match) - 1))
+        elif len(match) >= 2:
+            tokens.append(match)
+    return tokens
+
+
+def _term_id(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def sparse_document_vector(
+    text: str, *, k1: float = 1.2, b: float = 0.75, avg_length: float = 256.0
+) -> Tuple[List[int], List[float]]:
+    tokens = tokenize(text)
+    counts: Dict[int, int] = {}
+    for token in tokens:
+        term_id = _term_id(token)
+        counts[term_id] = counts.get(term_id, 0) + 1
+    norm = k1 * (1.0 - b + b * len(tokens) / max(float(avg_length), 1.0))
+    indices = sorted(counts)
+    return indices, [counts[term_id] * (k1 + 1.0) / (counts[term_id] + norm) for term_id in indices]
+
+
+def sparse_query_vector(text: str) -> Tuple[List[int], List[float]]:
+    indices = sorted({_term_id(token) for token in tokenize(text)})
+    return indices, [1.0] * len(indices)
+
+
+class BM25Index:
+    # Persistence is a gzip snapshot plus an append-only op log next to it. Writes append their
+    # ops; the snapshot is rewritten (and the log truncated) only once the log outgrows it.
+    def __init__(self, path: Optional[str] = None, *, k1: float = 1.2, b: float = 0.75, tag: str = ""):
+        self.path = Path(path) if path else None
+        self.k1 = float(k1)
+        self.b = float(b)
+        # Identifies what the index was built from (e.g. the collection behind an alias).
+        self.tag = tag
+        self.generation = ""
+        self.refreshed_at = 0.0
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_sources: Dict[str, Optional[str]] = {}
+        self._file_docs: Dict[str, Set[str]] = {}
+        self._total_length = 0
+        self._pending: List[list] = []
+        self._needs_snapshot = True
+        self._snapshot_signature: Optional[Tuple[int, int, int]] = None
+        self._snapshot_bytes = 0
+        self._log_offset = 0
+        self._lock = threading.RLock()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    @property
+    def log_path(self) -> Optional[Path]:
+        return None if self.path is None else self.path.with_name(self.path.name + ".log")
+
+    def _add(self, doc_id: str, term_counts: Dict[str, int], source_file: Optional[str]) -> None:
+        self._remove(doc_id)
+        length = sum(term_counts.values())
+        self._doc_terms[doc_id] = term_counts
+        self._doc_lengths[doc_id] = length
+        self._doc_sources[doc_id] = source_file
+        self._total_length += length
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        if source_file is not None:
+            self._file_docs.setdefault(source_file, set()).add(doc_id)
+
+    def _remove(self, doc_id: str) -> bool:
+        term_counts = self._doc_terms.pop(doc_id, None)
+        if term_counts is None:
+            return False
+        self._total_length -= self._doc_lengths.pop(doc_id, 0)
+        for term in term_counts:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                self._postings.pop(term, None)
+        source_file = self._doc_sources.pop(doc_id, None)
+        file_docs = self._file_docs.get(source_file) if source_file is not None else None
+        if file_docs is not None:
+            file_docs.discard(doc_id)
+            if not file_docs:
+                self._file_docs.pop(source_file, None)
+        return True
+
+    def _apply(self, op: list) -> None:
+        if op[0] == "add":
+            _, doc_id, source_file, term_counts = op
+            self._add(str(doc_id), {term: int(count) for term, count in term_counts.items()}, source_file)
+        elif op[0] == "del":
+            self._remove(str(op[1]))
+
+    def add_documents(self, documents: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        with self._lock:
+            for doc_id, text, source_file in documents:
+                term_counts = dict(Counter(tokenize(text)))
+                self._add(str(doc_id), term_counts, source_file)
+                if self.path is not None:
+                    self._pending.append(["add", str(doc_id), source_file, term_counts])
+
+    def remove_documents(self, doc_ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for doc_id in list(doc_ids):
+                if self._remove(str(doc_id)):
+                    removed += 1
+                    if self.path is not None:
+                        self._pending.append(["del", str(doc_id)])
+        return removed
+
+    def remove_file(self, source_file: str) -> int:
+        with self._lock:
+            return self.remove_documents(list(self._file_docs.get(source_file, ())))
+
+    def _reset(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._doc_sources.clear()
+        self._file_docs.clear()
+        self._total_length = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._pending.clear()
+            self._needs_snapshot = True
+
+    def search(
+        self, query_text: str, limit: Optional[int] = 8, source_files: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        # limit=None returns every matching document, best first.
+        query_terms = list(dict.fromkeys(tokenize(query_text)))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not query_terms or doc_count == 0:
+                return []
+            allowed: Optional[Set[str]] = None
+            if source_files is not None:
+                allowed = set()
+                for source_file in source_files:
+                    allowed.update(self._file_docs.get(source_file, ()))
+                if not allowed:
+                    return []
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting.items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return heapq.nlargest(max(int(limit), 0), scores.items(), key=lambda item: item[1])
+
+    def _signature(self) -> Tuple[int, int, int]:
+        stat = self.path.stat()
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._needs_snapshot:
+                # Another process (e.g. scripts/reindex.py) may have replaced the snapshot.
+                self.refresh()
+            if self._needs_snapshot:
+                self._write_snapshot()
+                return
+            if not self._pending:
+                return
+            data = "".join(
+                json.dumps({"g": self.generation, "op": op}, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for op in self._pending
+            ).encode("utf-8")
+            with open(self.log_path, "ab") as handle:
+                start = handle.seek(0, os.SEEK_END)
+                handle.write(data)
+                log_bytes = handle.tell()
+            if start == self._log_offset:
+                self._log_offset = log_bytes
+            self._pending.clear()
+            if log_bytes > max(LOG_COMPACT_MIN_BYTES, 2 * self._snapshot_bytes):
+                self._write_snapshot()
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self._needs_snapshot = True
+            self.save()
+
+    def _write_snapshot(self) -> None:
+        self.generation = uuid.uuid4().hex
+        snapshot = {
+            "version": 2,
+            "generation": self.generation,
+            "tag": self.tag,
+            "docs": {
+                doc_id: [self._doc_sources.get(doc_id), term_counts] for doc_id, term_counts in self._doc_terms.items()
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as handle:
+            json.dump(snapshot, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        # Lines left from the previous generation are ignored on replay, so a crash here is harmless.
+        open(self.log_path, "wb").close()
+        self._pending.clear()
+        self._needs_snapshot = False
+        self._snapshot_signature = self._signature()
+        self._snapshot_bytes = self._snapshot_signature[2]
+        self._log_offset = 0
+
+    def load(self) -> None:
+        try:
+            signature = self._signature()
+            with gzip.open(self.path, "rt", encoding="utf-8") as handle:
+                snapshot = json.load(handle)
+        except Exception as exc:
+            logger.warning("⚠️ Keyword index at %s unreadable, starting empty: %s", self.path, exc)
+            return
+        with self._lock:
+            self._reset()
+            for doc_id, (source_file, term_counts) in (snapshot.get("docs") or {}).items():
+                self._add(doc_id, {term: int(count) for term, count in term_counts.items()}, source_file)
+            self.generation = str(snapshot.get("generation") or "")
+            self.tag = str(snapshot.get("tag") or "")
+            self._snapshot_signature = signature
+            self._snapshot_bytes = signature[2]
+            self._log_offset = 0
+            self._pending.clear()
+            # Version 1 snapshots have no generation for log lines to refer to; rewrite on next save.
+            self._needs_snapshot = not self.generation
+            replayed = self._replay_log()
+        logger.info("🔎 Loaded keyword index from %s (%s documents, %s log ops)", self.path, len(self), replayed)
+
+    def _replay_log(self) -> int:
+        log_path = self.log_path
+        if not self.generation or log_path is None or not log_path.exists():
+            return 0
+        replayed = 0
+        with open(log_path, "rb") as handle:
+            handle.seek(self._log_offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                self._log_offset += len(line)
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    continue
+                if record.get("g") != self.generation:
+                    continue
+                self._apply(record.get("op") or [])
+                replayed += 1
+        return replayed
+
+    def refresh(self) -> bool:
+        # Picks up a snapshot replaced by another process (full reload, then re-applies unsaved ops)
+        # or ops other processes appended to the log. Returns True on a full reload.
+        if self.path is None:
+            return False
+        with self._lock:
+            try:
+                signature = self._signature()
+            except FileNotFoundError:
+                return False
+            if signature == self._snapshot_signature:
+                self._replay_log()
+                return False
+            if self._needs_snapshot and self._snapshot_signature is not None:
+                return False
+            pending = list(self._pending)
+            self.load()
+            for op in pending:
+                self._apply(op)
+            self._pending = pending
+            return True
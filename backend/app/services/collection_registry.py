@@ -0,0 +1,134 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import config
+from .hit import Hit
+from .query_transformer import QueryTransformer
+from .vector_store import VectorStore
+
+logger = logging.getLogger("nexusai.collection_registry")
+
+DEFAULT_COLLECTION = "default"
+ALL_COLLECTIONS = "*"
+
+
+@dataclass(frozen=True)
+class CollectionSpec:
+    name: str
+    collection_name: str
+    location: Optional[str] = None
+
+
+def parse_collection_registry(value: Optional[str]) -> Dict[str, CollectionSpec]:
+    specs = {DEFAULT_COLLECTION: CollectionSpec(DEFAULT_COLLECTION, config.collection_name)}
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, separator, target = entry.partition("=")
+        name = name.strip()
+        collection_name, _, location = (target if separator else name).partition("@")
+        if not name or not collection_name.strip():
+            raise ValueError(f"Invalid collection registry entry: {entry!r}")
+        specs[name] = CollectionSpec(name, collection_name.strip(), location.strip() or None)
+    return specs
+
+
+class CollectionRegistry:
+    _fanout_executor: Optional[ThreadPoolExecutor] = None
+    _fanout_executor_lock = threading.Lock()
+
+    def __init__(
+        self,
+        specs: Optional[Dict[str, CollectionSpec]] = None,
+        default_store: Optional[VectorStore] = None,
+    ):
+        self._specs = specs if specs is not None else parse_collection_registry(config.collection_registry)
+        self._stores: Dict[str, VectorStore] = {}
+        if default_store is not None:
+            self._stores[DEFAULT_COLLECTION] = default_store
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def resolve(self, names: Optional[Iterable[str]]) -> List[str]:
+        selected: List[str] = []
+        for name in names or []:
+            name = str(name).strip()
+            if name == ALL_COLLECTIONS:
+                candidates = self.names()
+            elif name in self._specs:
+                candidates = [name]
+            else:
+                raise ValueError(f"Unknown collection: {name}")
+            selected.extend(candidate for candidate in candidates if candidate not in selected)
+        return selected or [DEFAULT_COLLECTION]
+
+    def get(self, name: str) -> VectorStore:
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                spec = self._specs.get(name)
+                if spec is None:
+                    raise ValueError(f"Unknown collection: {name}")
+                backend = (config.vector_store_backend or "qdrant").strip().lower()
+                # Remote locations only apply to Qdrant; local/memory backends keep one store per collection on this node.
+                client = VectorStore._create_client(spec.location) if spec.location and backend == "qdrant" else None
+                store = VectorStore(client=client, collection_name=spec.collection_name)
+                self._stores[name] = store
+                logger.info("🗂️ Opened collection '%s' -> %s", name, spec.collection_name)
+            return store
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        # Separate from VectorStore's retrieval pool: each fan-out task blocks on legs submitted there.
+        with cls._fanout_executor_lock:
+            if cls._fanout_executor is None:
+                cls._fanout_executor = ThreadPoolExecutor(
+                    max_workers=max(int(config.federated_search_workers), 1),
+                    thread_name_prefix="nexusai-federated",
+                )
+            return cls._fanout_executor
+
+    def _search_one(self, name: str, query_text: str, query_vector: List[float], limit: int, **kwargs: Any):
+        hits = self.get(name).hybrid_search(query_text=query_text, query_vector=query_vector, limit=limit, **kwargs)
+        return [hit.replace(collection=name) for hit in map(Hit.from_value, hits)]
+
+    def hybrid_search(
+        self,
+        names: Optional[Iterable[str]],
+        query_text: str,
+        query_vector: List[float],
+        limit: int = 5,
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        selected = self.resolve(names)
+        if len(selected) == 1:
+            return self._search_one(selected[0], query_text, query_vector, limit, **kwargs)
+
+        timeout = float(config.federated_search_timeout_seconds) or None
+        executor = self._executor()
+        futures = {
+            executor.submit(self._search_one, name, query_text, query_vector, limit, **kwargs): name
+            for name in selected
+        }
+        done, pending = wait(futures, timeout=timeout)
+        for future in pending:
+            future.cancel()
+            logger.warning("⚠️ Collection '%s' exceeded %ss; merging without it", futures[future], timeout)
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        errors: List[Exception] = []
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exc:
+                errors.append(exc)
+                logger.warning("⚠️ Collection '%s' search failed; merging without it: %s", futures[future], exc)
+        if errors and not results:
+            raise errors[0]
+        rankings = [results[name] for name in selected if name in results]
+        return QueryTransformer.reciprocal_rank_fusion(rankings)[:limit]
@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from ..config import config
+
+logger = logging.getLogger("nexusai.cpu_inference")
+
+CPU_MODES = ("float32", "bf16", "int8")
+_MODE_ALIASES = {"fp32": "float32", "bfloat16": "bf16", "qint8": "int8"}
+
+_threads_lock = threading.Lock()
+_threads_configured = False
+
+
+def cpu_mode(mode: Optional[str] = None) -> str:
+    value = str(mode if mode is not None else config.cpu_inference_mode or "float32").strip().lower()
+    value = _MODE_ALIASES.get(value, value)
+    if value not in CPU_MODES:
+        logger.warning("⚠️ Unknown CPU inference mode %r, using float32", value)
+        return "float32"
+    return value
+
+
+def load_dtype(mode: str):
+    # bf16 weights are loaded directly in bf16 so the float32 copy never exists.
+    import torch
+
+    return torch.bfloat16 if cpu_mode(mode) == "bf16" else torch.float32
+
+
+def configure_threads(threads: Optional[int] = None, interop_threads: Optional[int] = None) -> int:
+    global _threads_configured
+    import torch
+
+    with _threads_lock:
+        if not _threads_configured:
+            threads = config.cpu_inference_threads if threads is None else threads
+            interop_threads = config.cpu_inference_interop_threads if interop_threads is None else interop_threads
+            if threads and threads > 0:
+                torch.set_num_threads(int(threads))
+            if interop_threads and interop_threads > 0:
+                try:
+                    torch.set_num_interop_threads(int(interop_threads))
+                except RuntimeError as exc:
+                    # torch only accepts this before the first parallel op in the process.
+                    logger.warning("⚠️ Could not set inter-op threads: %s", exc)
+            _threads_configured = True
+    return torch.get_num_threads()
+
+
+def _float32_logits(module, inputs, output):
+    # Keeps reranker scores float32 so numpy conversion downstream works with bf16 weights.
+    import torch
+
+    logits = getattr(output, "logits", None)
+    if logits is not None and logits.dtype == torch.bfloat16:
+        output.logits = logits.float()
+    return output
+
+
+def prepare_model(model: Any, mode: str) -> Any:
+    # Modifies the module in place (callers may keep their reference) and also returns it.
+    mode = cpu_mode(mode)
+    if model is None or mode == "float32":
+        return model
+    import torch
+
+    if mode == "bf16":
+        model.to(torch.bfloat16)
+        model.register_forward_hook(_float32_logits)
+        return model
+    # Dynamic int8: Linear weights are quantised once, activations per call; in place to avoid a second copy.
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def warm_up(name: str, run: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    try:
+        run()
+    except Exception as exc:
+        logger.warning("⚠️ %s warm-up failed: %s", name, exc)
+        return 0.0
+    elapsed = time.perf_counter() - started
+    logger.info("🔥 %s warm-up finished in %.2fs", name, elapsed)
+    return elapsed
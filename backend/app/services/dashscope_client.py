@@ -0,0 +1,136 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("nexusai.dashscope")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(float(rate), 0.0)
+        self.capacity = max(float(burst), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ThrottledError(RuntimeError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DashScopeEmbeddingClient:
+    def __init__(
+        self,
+        call: Callable[[List[Dict[str, Any]]], Any],
+        parse: Callable[[Any], List[List[float]]],
+        *,
+        batch_size: int = 10,
+        concurrency: int = 4,
+        rate_limit: float = 0.0,
+        burst: int = 1,
+        max_retries: int = 5,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+    ):
+        self._call = call
+        self._parse = parse
+        self.batch_size = max(int(batch_size), 1)
+        self.concurrency = max(int(concurrency), 1)
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff_seconds = max(float(backoff_seconds), 0.0)
+        self.backoff_max_seconds = max(float(backoff_max_seconds), self.backoff_seconds)
+        self._bucket = TokenBucket(rate_limit, burst)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="nexusai-dashscope")
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, float] = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "rate_wait_seconds": 0.0}
+
+    def embed(self, inputs: List[Dict[str, Any]]) -> List[List[float]]:
+        batches = [inputs[start:start + self.batch_size] for start in range(0, len(inputs), self.batch_size)]
+        if len(batches) <= 1:
+            return [vector for batch in batches for vector in self._embed_batch(batch)]
+        # map() yields in submission order, so vectors come back in input order.
+        return [vector for vectors in self._executor.map(self._embed_batch, batches) for vector in vectors]
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["rate_wait_seconds"] = round(stats["rate_wait_seconds"], 3)
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps concurrent workers that were throttled together from retrying in lockstep.
+        delay = random.uniform(0.0, min(self.backoff_max_seconds, self.backoff_seconds * (2 ** attempt)))
+        return max(delay, min(retry_after or 0.0, self.backoff_max_seconds))
+
+    @staticmethod
+    def _retry_after(response: Any) -> Optional[float]:
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After") or headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def _send(self, batch: List[Dict[str, Any]]) -> List[List[float]]:
+        self._count("rate_wait_seconds", self._bucket.acquire())
+        self._count("requests")
+        response = self._call(batch)
+        status_code = getattr(response, "status_code", None)
+        code = str(getattr(response, "code", "") or "")
+        if status_code in RETRYABLE_STATUS or code.startswith("Throttling"):
+            raise ThrottledError(
+                f"DashScope embedding request throttled ({status_code}): {code} {getattr(response, 'message', '')}".strip(),
+                retry_after=self._retry_after(response),
+            )
+        vectors = self._parse(response)
+        if len(vectors) != len(batch):
+            raise RuntimeError(f"DashScope returned {len(vectors)} embeddings, expected {len(batch)}")
+        return vectors
+
+    def _embed_batch(self, batch: List[Dict[str, Any]]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                return self._send(batch)
+            except ThrottledError as exc:
+                self._count("throttled")
+                error, retry_after = exc, exc.retry_after
+            except (ConnectionError, TimeoutError, OSError) as exc:
+                error, retry_after = exc, None
+            if attempt >= self.max_retries:
+                self._count("failures")
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            logger.warning("⚠️ DashScope batch of %s failed (%s); retry %s in %.2fs", len(batch), error, attempt + 1, delay)
+            self._count("retries")
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_SUMMARY_HEADINGS = 64
+
+
+def _heading_text(payload: Dict[str, Any]) -> str:
+    heading_path = payload.get("heading_path")
+    if isinstance(heading_path, (list, tuple)):
+        return " / ".join(str(part) for part in heading_path if part)
+    return str(heading_path or "")
+
+
+class DocumentSummaryBuilder:
+    def __init__(self, source_file: str):
+        self.source_file = source_file
+        self._sum: Optional[np.ndarray] = None
+        self._count = 0
+        self._headings: Dict[str, None] = {}
+
+    def add(self, vectors: Sequence[Sequence[float]], payloads: Iterable[Dict[str, Any]]) -> None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.size:
+            matrix = matrix.reshape(len(matrix), -1)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            total = (matrix / norms).sum(axis=0)
+            self._sum = total if self._sum is None else self._sum + total
+            self._count += len(matrix)
+        for payload in payloads:
+            heading = _heading_text(payload)
+            if heading and len(self._headings) < MAX_SUMMARY_HEADINGS:
+                self._headings.setdefault(heading, None)
+
+    def build(self) -> Optional[Tuple[List[float], Dict[str, Any]]]:
+        if self._sum is None or self._count == 0:
+            return None
+        norm = float(np.linalg.norm(self._sum)) or 1.0
+        summary_text = "\n".join([self.source_file, *self._headings])
+        payload = {"source_file": self.source_file, "summary_text": summary_text, "chunk_count": self._count}
+        return (self._sum / norm).tolist(), payload
+
+
+def summarize_document(
+    source_file: str, chunks: Sequence[Any], embeddings: Sequence[Sequence[float]]
+) -> Optional[Tuple[List[float], Dict[str, Any]]]:
+    builder = DocumentSummaryBuilder(source_file)
+    builder.add(
+        embeddings,
+        ((chunk.get("metadata") or {}) if isinstance(chunk, dict) else {} for chunk in chunks),
+    )
+    return builder.build()
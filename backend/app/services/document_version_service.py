@@ -1,3 +1,4 @@
+import base64
 import json
 import logging
 import os
@@ -6,6 +7,7 @@ import uuid
 from hashlib import sha256
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import redis
 
 from ..config import config
@@ -44,6 +46,25 @@ class DocumentVersionService:
     def generate_version_id() -> str:
         return str(uuid.uuid4())
 
+    @staticmethod
+    def _encode_embeddings(embeddings: Any) -> Any:
+        # Matrices are stored as packed little-endian float32 instead of JSON float lists.
+        if isinstance(embeddings, np.ndarray):
+            matrix = np.ascontiguousarray(embeddings, dtype="<f4")
+            return {
+                "dtype": "float32",
+                "shape": list(matrix.shape),
+                "data": base64.b64encode(matrix.tobytes()).decode("ascii"),
+            }
+        return embeddings or []
+
+    @staticmethod
+    def decode_embeddings(embeddings: Any) -> Any:
+        if isinstance(embeddings, dict) and embeddings.get("dtype") == "float32":
+            raw = base64.b64decode(embeddings.get("data") or "")
+            return np.frombuffer(raw, dtype="<f4").reshape(embeddings.get("shape") or (0, 0))
+        return embeddings or []
+
     def _key(self, filename: str) -> str:
         return f"document:versions:{filename}"
 
@@ -139,7 +160,7 @@ class DocumentVersionService:
         *,
         version_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        embeddings: Optional[List[List[float]]] = None,
+        embeddings: Optional[Any] = None,
     ) -> Dict[str, Any]:
         versions = self.get_versions(filename)
         record = {
@@ -152,7 +173,7 @@ class DocumentVersionService:
             "chunk_ids": chunks,
             "raw_content": raw_content or "",
             "metadata": metadata or {},
-            "embeddings": embeddings or [],
+            "embeddings": self._encode_embeddings(embeddings),
         }
         versions.append(record)
         self._set_versions(filename, versions)
@@ -204,7 +225,7 @@ class DocumentVersionService:
             "filename": filename,
             "version_id": version_id,
             "chunks": version.get("chunks", []),
-            "embeddings": version.get("embeddings", []),
+            "embeddings": self.decode_embeddings(version.get("embeddings")),
             "content_hash": version.get("content_hash"),
             "metadata": version.get("metadata", {}),
         }
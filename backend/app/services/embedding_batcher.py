@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+from .gather_loop import GatherLoop, GatheredItem
+
+logger = logging.getLogger("nexusai.embedding_batcher")
+
+
+class EmbeddingBatcher(GatherLoop):
+    # Same gather loop as the write coalescer: the first waiting request opens a window of
+    # max_wait_seconds, later arrivals join it until max_batch texts are queued.
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[List[float]]],
+        *,
+        max_batch: int = 32,
+        max_wait_seconds: float = 0.005,
+        name: str = "nexusai-embedding-batcher",
+    ):
+        self._embed = embed
+        self._stats_lock = threading.Lock()
+        # Depth counts requests waiting for their batch to finish, including those already gathered.
+        self._stats: Dict[str, float] = {
+            "batches": 0,
+            "requests": 0,
+            "texts": 0,
+            "seconds": 0.0,
+            "queue_wait_seconds": 0.0,
+            "pending": 0,
+            "submitted": 0,
+            "depth_total": 0,
+            "max_queue_depth": 0,
+        }
+        super().__init__(max_weight=max_batch, max_delay_seconds=max_wait_seconds, name=name)
+
+    def submit(self, texts: List[str]) -> Future:
+        with self._stats_lock:
+            depth = self._stats["pending"]
+            self._stats["pending"] += 1
+            self._stats["submitted"] += 1
+            self._stats["depth_total"] += depth
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+        return self._enqueue((list(texts), time.perf_counter()), len(texts))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.submit(texts).result()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            raw = dict(self._stats)
+        requests, submitted = raw["requests"], raw["submitted"]
+        return {
+            "batches": raw["batches"],
+            "requests": requests,
+            "texts": raw["texts"],
+            "seconds": round(raw["seconds"], 4),
+            "requests_per_batch": round(requests / raw["batches"], 2) if raw["batches"] else 0.0,
+            "queue_depth": raw["pending"],
+            "max_queue_depth": raw["max_queue_depth"],
+            "mean_queue_depth": round(raw["depth_total"] / submitted, 2) if submitted else 0.0,
+            "mean_queue_wait_ms": round(raw["queue_wait_seconds"] / requests * 1000.0, 3) if requests else 0.0,
+        }
+
+    def _process_group(self, group: List[GatheredItem], weight: int) -> None:
+        try:
+            self._embed_group(group)
+        finally:
+            with self._stats_lock:
+                self._stats["pending"] -= len(group)
+
+    def _embed_group(self, group: List[GatheredItem]) -> None:
+        flushed_at = time.perf_counter()
+        texts = [text for (request_texts, _), _, _ in group for text in request_texts]
+        try:
+            vectors = self._embed(texts)
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"Embedding backend returned {len(vectors)} vectors, expected {len(texts)}")
+        except Exception as exc:
+            logger.warning("⚠️ Batched embedding of %s requests failed: %s", len(group), exc)
+            for _, _, future in group:
+                future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - flushed_at
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["requests"] += len(group)
+            self._stats["texts"] += len(texts)
+            self._stats["seconds"] += elapsed
+            self._stats["queue_wait_seconds"] += sum(flushed_at - enqueued_at for (_, enqueued_at), _, _ in group)
+        offset = 0
+        for (request_texts, _), _, future in group:
+            future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+
+from ..config import config
+
+logger = logging.getLogger("nexusai.embedding_cache")
+
+VECTOR_DTYPE = np.dtype("<f4")
+_KEY_PREFIX = "emb"
+_SQLITE_BATCH = 500
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(blob: bytes) -> List[float]:
+    return np.frombuffer(blob, dtype=VECTOR_DTYPE).tolist()
+
+
+def unpack_matrix(blobs: List[bytes]) -> np.ndarray:
+    # One join, then a read-only float32 view over it: no per-float Python objects.
+    if not blobs:
+        return np.empty((0, 0), dtype=VECTOR_DTYPE)
+    return np.frombuffer(b"".join(blobs), dtype=VECTOR_DTYPE).reshape(len(blobs), -1)
+
+
+def item_digest(item: Dict[str, Any]) -> str:
+    image = item.get("image")
+    if isinstance(image, str) and os.path.isfile(image):
+        # Local images are keyed by their bytes so a replaced file at the same path is re-embedded.
+        hasher = hashlib.sha256(b"image:")
+        with open(image, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RedisEmbeddingStore:
+    name = "redis"
+
+    def __init__(self, ttl_seconds: int = 0):
+        self.ttl_seconds = int(ttl_seconds or 0)
+        self.client = redis.Redis(host=config.redis_host, port=config.redis_port, db=config.redis_db)
+        self.client.ping()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return list(self.client.mget(keys))
+
+    def put_many(self, entries: Dict[str, bytes]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, blob in entries.items():
+            if self.ttl_seconds > 0:
+                pipeline.setex(key, self.ttl_seconds, blob)
+            else:
+                pipeline.set(key, blob)
+        pipeline.execute()
+
+
+class DiskEmbeddingStore:
+    name = "disk"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_BATCH):
+                batch = keys[start:start + _SQLITE_BATCH]
+                rows = self._conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN ({})".format(",".join("?" * len(batch))),
+                    batch,
+                )
+                found.update(rows)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, entries: Dict[str, bytes]) -> None:
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", entries.items())
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    def __init__(self, capacity: Optional[int] = None, backend: Optional[str] = None, store: Any = None):
+        self.capacity = max(int(config.embedding_cache_size if capacity is None else capacity), 0)
+        self._lru: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "memory_hits": 0, "store_hits": 0, "misses": 0, "store_errors": 0}
+        self.store = store if store is not None else self._open_store(backend)
+
+    @staticmethod
+    def _open_store(backend: Optional[str]):
+        backend = (config.embedding_cache_backend if backend is None else backend) or "none"
+        backend = backend.strip().lower()
+        if backend == "none":
+            return None
+        if backend not in ("redis", "disk"):
+            raise ValueError(f"Unknown embedding cache backend: {backend}")
+        try:
+            if backend == "redis":
+                store = RedisEmbeddingStore(ttl_seconds=config.embedding_cache_ttl_seconds)
+            else:
+                store = DiskEmbeddingStore(config.embedding_cache_path)
+        except Exception as exc:
+            logger.warning("⚠️ Embedding cache %s store unavailable, using in-process LRU only: %s", backend, exc)
+            return None
+        logger.info("🧊 Embedding cache persisting to %s", backend)
+        return store
+
+    @staticmethod
+    def key(model: str, dimension: int, digest: str) -> str:
+        return f"{_KEY_PREFIX}:{model}:{int(dimension)}:{digest}"
+
+    def _lru_get(self, key: str) -> Optional[bytes]:
+        blob = self._lru.get(key)
+        if blob is not None:
+            self._lru.move_to_end(key)
+        return blob
+
+    def _lru_put(self, key: str, blob: bytes) -> None:
+        if self.capacity <= 0:
+            return
+        self._lru[key] = blob
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def get_or_compute(
+        self, keys: List[str], compute: Callable[[List[int]], Any], as_array: bool = False
+    ) -> Any:
+        blobs: Dict[str, bytes] = {}
+        with self._lock:
+            self._stats["lookups"] += len(keys)
+            for key in keys:
+                if key not in blobs:
+                    blob = self._lru_get(key)
+                    if blob is not None:
+                        blobs[key] = blob
+            self._stats["memory_hits"] += sum(1 for key in keys if key in blobs)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in blobs]
+        if pending and self.store is not None:
+            try:
+                stored = dict(zip(pending, self.store.get_many(pending)))
+            except Exception as exc:
+                stored = {}
+                with self._lock:
+                    self._stats["store_errors"] += 1
+                logger.warning("⚠️ Embedding cache read failed: %s", exc)
+            found = {key: blob for key, blob in stored.items() if blob}
+            blobs.update(found)
+            with self._lock:
+                self._stats["store_hits"] += sum(1 for key in keys if key in found)
+                for key, blob in found.items():
+                    self._lru_put(key, blob)
+            pending = [key for key in pending if key not in found]
+
+        if pending:
+            # Duplicates inside one batch are embedded once.
+            first_index = {}
+            for index, key in enumerate(keys):
+                first_index.setdefault(key, index)
+            vectors = compute([first_index[key] for key in pending])
+            if len(vectors) != len(pending):
+                raise RuntimeError(f"Embedding backend returned {len(vectors)} vectors, expected {len(pending)}")
+            computed = {key: pack_vector(vector) for key, vector in zip(pending, vectors)}
+            blobs.update(computed)
+            with self._lock:
+                self._stats["misses"] += sum(1 for key in keys if key in computed)
+                for key, blob in computed.items():
+                    self._lru_put(key, blob)
+            if self.store is not None:
+                try:
+                    self.store.put_many(computed)
+                except Exception as exc:
+                    with self._lock:
+                        self._stats["store_errors"] += 1
+                    logger.warning("⚠️ Embedding cache write failed: %s", exc)
+
+        # Every vector goes through float32, so hits and misses return identical values.
+        if as_array:
+            return unpack_matrix([blobs[key] for key in keys])
+        return [unpack_vector(blobs[key]) for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._lru)
+        lookups = stats["lookups"]
+        stats["capacity"] = self.capacity
+        stats["backend"] = getattr(self.store, "name", "none")
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["store_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            for name in self._stats:
+                self._stats[name] = 0
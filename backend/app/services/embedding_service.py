@@ -1,12 +1,21 @@
 import hashlib
 import math
 import os
+import threading
 from typing import Any, Dict, List, Optional
+
+import numpy as np
+
 from ..config import config
+from . import cpu_inference
+from .embedding_batcher import EmbeddingBatcher
+from .dashscope_client import DashScopeEmbeddingClient
+from .embedding_cache import EmbeddingCache, item_digest
 
 
 class EmbeddingService:
     _instance = None
+    _batcher_lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -21,6 +30,8 @@ class EmbeddingService:
         self.dtype = None
         self.model = None
         self._local_model_name = ""
+        self.cache = EmbeddingCache() if config.embedding_cache_enabled else None
+        self._query_batcher: Optional[EmbeddingBatcher] = None
         if self.backend == "mock":
             self.device = "mock"
             print("🧪 EmbeddingService running in MOCK mode")
@@ -43,12 +54,25 @@ class EmbeddingService:
             raise ValueError("Missing DASHSCOPE_API_KEY for dashscope/aliyun embedding backend")
 
         dashscope.api_key = api_key
+        if config.dashscope_base_url:
+            dashscope.base_http_api_url = config.dashscope_base_url
         self._dashscope = dashscope
         self._dashscope_model = (
             os.getenv("DASHSCOPE_EMBEDDING_MODEL")
             or config.DASHSCOPE_EMBEDDING_MODEL
             or config.EMBEDDING_MODEL
         )
+        self._dashscope_client = DashScopeEmbeddingClient(
+            lambda batch: self._dashscope.MultiModalEmbedding.call(model=self._dashscope_model, input=batch),
+            self._parse_dashscope_embeddings,
+            batch_size=config.dashscope_embedding_batch_size,
+            concurrency=config.dashscope_embedding_concurrency,
+            rate_limit=config.dashscope_embedding_rate_limit,
+            burst=config.dashscope_embedding_burst,
+            max_retries=config.dashscope_embedding_max_retries,
+            backoff_seconds=config.dashscope_embedding_backoff_seconds,
+            backoff_max_seconds=config.dashscope_embedding_backoff_max_seconds,
+        )
         print(f"☁️ EmbeddingService using DashScope model: {self._dashscope_model}")
 
     def _configure_local_backend(self):
@@ -65,7 +89,7 @@ class EmbeddingService:
             self.dtype = torch.float32
         else:
             self.device = "cpu"
-            self.dtype = torch.float32
+            self.dtype = cpu_inference.load_dtype(cpu_inference.cpu_mode())
 
     def _ensure_local_model(self):
         model_name = config.EMBEDDING_MODEL
@@ -75,12 +99,22 @@ class EmbeddingService:
         from .scripts.qwen3_vl_embedding import Qwen3VLEmbedder
 
         self._configure_local_backend()
-        print(f"🚀 Initializing Qwen3-VL-Embedding-2B on {self.device}...")
-        self.model = Qwen3VLEmbedder(
+        mode = cpu_inference.cpu_mode() if self.device == "cpu" else str(self.dtype)
+        print(f"🚀 Initializing Qwen3-VL-Embedding-2B on {self.device} ({mode})...")
+        if self.device == "cpu":
+            cpu_inference.configure_threads()
+        model = Qwen3VLEmbedder(
             model_name_or_path=model_name,
             dtype=self.dtype,
             device_map=self.device,
+            max_batch_size=config.embedding_max_batch_size,
+            max_batch_tokens=config.embedding_max_batch_tokens,
         )
+        if self.device == "cpu":
+            cpu_inference.prepare_model(model.model, mode)
+        if config.cpu_inference_warmup:
+            cpu_inference.warm_up("Embedder", lambda: model.process([{"text": "warm-up"}]))
+        self.model = model
         self._local_model_name = model_name
 
     @staticmethod
@@ -150,11 +184,7 @@ class EmbeddingService:
         return [vec[:dim] for vec in vectors]
 
     def _dashscope_embed(self, inputs: List[Dict[str, Any]]) -> List[List[float]]:
-        response = self._dashscope.MultiModalEmbedding.call(
-            model=self._dashscope_model,
-            input=inputs
-        )
-        vectors = self._parse_dashscope_embeddings(response)
+        vectors = self._dashscope_client.embed(inputs)
         if len(vectors) != len(inputs):
             raise RuntimeError(
                 f"DashScope returned {len(vectors)} embeddings, expected {len(inputs)}"
@@ -184,21 +214,74 @@ class EmbeddingService:
             return vec
         return [v / norm for v in vec]
 
-    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def _cache_model(self) -> str:
         if self.backend == "mock":
-            return [self._mock_embed_text(text) for text in texts]
+            return "mock"
         if self.backend in ("dashscope", "aliyun"):
-            dashscope_inputs = [{"text": text} for text in texts]
-            return self._dashscope_embed(dashscope_inputs)
+            return f"dashscope:{self._dashscope_model}"
+        return f"local:{config.EMBEDDING_MODEL}"
 
-        self._ensure_local_model()
-        inputs = [{"text": text} for text in texts]
-        embeddings = self.model.process(inputs)
-        if embeddings.shape[1] > config.VECTOR_DIMENSION:
-            embeddings = embeddings[:, :config.VECTOR_DIMENSION]
-        return embeddings.tolist()
+    def _cached(self, items: List[dict], compute, as_array: bool = False) -> Any:
+        cache = getattr(self, "cache", None)
+        if cache is None or not items:
+            return compute(items, as_array=as_array)
+        model, dimension = self._cache_model(), config.VECTOR_DIMENSION
+        keys = [cache.key(model, dimension, item_digest(item)) for item in items]
+        return cache.get_or_compute(
+            keys, lambda indexes: compute([items[i] for i in indexes], as_array=as_array), as_array=as_array
+        )
+
+    def cache_stats(self) -> Dict[str, Any]:
+        cache = getattr(self, "cache", None)
+        return cache.stats() if cache is not None else {"enabled": False}
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        # Texts are keyed as {"text": ...} items so both entry points share cache entries.
+        return self._cached([{"text": text} for text in texts], self._embed_items)
 
     def get_multimodal_embeddings(self, items: List[dict]) -> List[List[float]]:
+        return self._cached(items, self._embed_items)
+
+    # Opt-in float32 (n, dim) matrix variants for bulk ingestion: no per-float Python objects.
+    def get_embeddings_array(self, texts: List[str]) -> np.ndarray:
+        return self._cached([{"text": text} for text in texts], self._embed_items, as_array=True)
+
+    def get_multimodal_embeddings_array(self, items: List[dict]) -> np.ndarray:
+        return self._cached(items, self._embed_items, as_array=True)
+
+    def _batcher(self) -> Optional[EmbeddingBatcher]:
+        if not config.query_embedding_batching_enabled:
+            return None
+        with self._batcher_lock:
+            if getattr(self, "_query_batcher", None) is None:
+                self._query_batcher = EmbeddingBatcher(
+                    lambda texts: self.get_embeddings(texts),
+                    max_batch=config.query_embedding_batch_max_size,
+                    max_wait_seconds=config.query_embedding_batch_max_wait_ms / 1000.0,
+                )
+            return self._query_batcher
+
+    def embed_query(self, text: str) -> List[float]:
+        # Concurrent chat requests share one model call instead of one forward pass each.
+        batcher = self._batcher()
+        if batcher is None:
+            return self.get_embeddings([text])[0]
+        return batcher.embed([text])[0]
+
+    def batcher_stats(self) -> Dict[str, Any]:
+        batcher = getattr(self, "_query_batcher", None)
+        return batcher.stats() if batcher is not None else {"enabled": bool(config.query_embedding_batching_enabled)}
+
+    @staticmethod
+    def _as_float32(embeddings: Any) -> np.ndarray:
+        if hasattr(embeddings, "detach"):
+            # torch CPU float32 tensors share memory with the returned array.
+            import torch
+
+            return embeddings.detach().to(device="cpu", dtype=torch.float32).numpy()
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def _embed_items(self, items: List[dict], as_array: bool = False) -> Any:
         if self.backend == "mock":
             vectors = []
             for item in items:
@@ -207,12 +290,13 @@ class EmbeddingService:
                 else:
                     seed_text = f"[image]{item.get('image', '')}"
                 vectors.append(self._mock_embed_text(seed_text))
-            return vectors
+            return self._as_float32(vectors) if as_array else vectors
         if self.backend in ("dashscope", "aliyun"):
-            return self._dashscope_embed(items)
+            vectors = self._dashscope_embed(items)
+            return self._as_float32(vectors) if as_array else vectors
 
         self._ensure_local_model()
         embeddings = self.model.process(items)
         if embeddings.shape[1] > config.VECTOR_DIMENSION:
             embeddings = embeddings[:, :config.VECTOR_DIMENSION]
-        return embeddings.tolist()
+        return self._as_float32(embeddings) if as_array else embeddings.tolist()
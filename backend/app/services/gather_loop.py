@@ -0,0 +1,65 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger("nexusai.gather_loop")
+
+GatheredItem = Tuple[Any, int, Future]
+
+
+class GatherLoop:
+    # One background thread: the first queued request opens a window of max_delay_seconds and later
+    # arrivals join it until max_weight is reached. Each group goes to _process_group, which must
+    # resolve every future in it.
+    def __init__(self, *, max_weight: int, max_delay_seconds: float, name: str):
+        self.max_weight = max(int(max_weight), 1)
+        self.max_delay_seconds = max(float(max_delay_seconds), 0.0)
+        self._queue: "queue.Queue[Optional[GatheredItem]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _enqueue(self, item: Any, weight: int) -> Future:
+        future: Future = Future()
+        self._queue.put((item, max(int(weight), 1), future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _process_group(self, group: List[GatheredItem], weight: int) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            group = [item]
+            weight = item[1]
+            deadline = time.monotonic() + self.max_delay_seconds
+            while weight < self.max_weight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+                weight += item[1]
+            try:
+                self._process_group(group, weight)
+            except Exception as exc:
+                # A bug in the hook must not strand callers or kill the loop.
+                logger.warning("⚠️ %s failed to process a group of %s: %s", self._thread.name, len(group), exc)
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(exc)
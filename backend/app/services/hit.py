@@ -0,0 +1,95 @@
+from types import MappingProxyType
+from typing import Any, Iterator, List, Mapping, Optional
+
+EMPTY_PAYLOAD: Mapping[str, Any] = MappingProxyType({})
+_FIELDS = ("id", "payload", "score", "vector_score", "keyword_score", "collection", "tier")
+
+
+def freeze_payload(payload: Optional[Mapping[str, Any]]) -> Mapping[str, Any]:
+    if not payload:
+        return EMPTY_PAYLOAD
+    if isinstance(payload, MappingProxyType):
+        return payload
+    # A read-only view, not a copy: every stage shares the payload the store returned.
+    return MappingProxyType(payload if isinstance(payload, dict) else dict(payload))
+
+
+class Hit:
+    # Read-only mapping access (hit["payload"], hit.get("score"), {**hit}) keeps dict-shaped
+    # callers working; unset optional fields behave like missing keys.
+    __slots__ = _FIELDS
+
+    def __init__(
+        self,
+        payload: Optional[Mapping[str, Any]] = None,
+        score: float = 0.0,
+        vector_score: Optional[float] = None,
+        keyword_score: Optional[float] = None,
+        id: Any = None,
+        collection: Optional[str] = None,
+        tier: Optional[str] = None,
+    ):
+        self.id = id
+        self.payload = freeze_payload(payload)
+        self.score = float(score)
+        self.vector_score = vector_score
+        self.keyword_score = keyword_score
+        self.collection = collection
+        self.tier = tier
+
+    @classmethod
+    def from_value(cls, value: Any) -> "Hit":
+        if isinstance(value, Hit):
+            return value
+        return cls(**{field: value[field] for field in _FIELDS if value.get(field) is not None})
+
+    def replace(self, **changes: Any) -> "Hit":
+        hit = Hit.__new__(Hit)
+        hit.id = self.id
+        hit.payload = self.payload
+        hit.score = self.score
+        hit.vector_score = self.vector_score
+        hit.keyword_score = self.keyword_score
+        hit.collection = self.collection
+        hit.tier = self.tier
+        for field, value in changes.items():
+            setattr(hit, field, value)
+        if "payload" in changes:
+            hit.payload = freeze_payload(hit.payload)
+        if "score" in changes:
+            hit.score = float(hit.score)
+        return hit
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in _FIELDS if getattr(self, field) is not None}
+        data["payload"] = self.payload.copy()
+        return data
+
+    def keys(self) -> List[str]:
+        return [field for field in _FIELDS if getattr(self, field) is not None]
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, None) if key in _FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in _FIELDS else None
+        return default if value is None else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELDS and getattr(self, key) is not None  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __reduce__(self):
+        # mappingproxy cannot be pickled or deep-copied, so rebuild from a plain payload.
+        return Hit, (self.payload.copy(), self.score, self.vector_score, self.keyword_score, self.id, self.collection, self.tier)
+
+    def __repr__(self) -> str:
+        return "Hit(id={!r}, score={:.4f}, source_file={!r})".format(self.id, self.score, self.payload.get("source_file"))
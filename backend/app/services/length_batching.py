@@ -0,0 +1,26 @@
+from typing import List, Sequence
+
+
+def plan_length_batches(lengths: Sequence[int], max_batch_size: int = 0, max_batch_tokens: int = 0) -> List[List[int]]:
+    # Longest first, so every batch pads to its first item and similar lengths share a batch.
+    # A limit of 0 disables that limit; a single item over the token budget still gets its own batch.
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index], reverse=True)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    width = 0
+    for index in order:
+        full = max_batch_size > 0 and len(current) >= max_batch_size
+        over_budget = max_batch_tokens > 0 and width * (len(current) + 1) > max_batch_tokens
+        if current and (full or over_budget):
+            batches.append(current)
+            current = []
+        if not current:
+            width = max(int(lengths[index]), 1)
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padded_tokens(lengths: Sequence[int], batches: List[List[int]]) -> int:
+    return sum(max(lengths[index] for index in batch) * len(batch) for batch in batches if batch)
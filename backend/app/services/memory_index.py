@@ -0,0 +1,260 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+class MemoryVectorIndex:
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 1024):
+        self.dimension = int(dimension) if dimension else None
+        self._initial_capacity = max(int(initial_capacity), 1)
+        self._matrix = np.zeros((0, self.dimension or 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._sources: List[Optional[str]] = []
+        self._file_ids: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return vectors / norms
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._matrix.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(self._initial_capacity, capacity)
+        while new_capacity < required:
+            new_capacity *= 2
+        grown = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        grown[: self._size] = self._matrix[: self._size]
+        self._matrix = grown
+        self._capacity_changed(new_capacity)
+
+    def _capacity_changed(self, capacity: int) -> None:
+        return None
+
+    def _rows_written(self, rows: np.ndarray) -> None:
+        return None
+
+    def _row_removed(self, row: int) -> None:
+        return None
+
+    def _row_moved(self, source: int, target: int) -> None:
+        return None
+
+    def _candidate_rows(self, query: np.ndarray, limit: int) -> Optional[np.ndarray]:
+        return None
+
+    def _store_payload(self, point_id: str, payload: Dict[str, Any]) -> Any:
+        return payload
+
+    def _load_payload(self, record: Any) -> Dict[str, Any]:
+        return record
+
+    def _persist(self) -> None:
+        return None
+
+    def _index_source(self, point_id: str, source_file: Optional[str]) -> None:
+        if source_file is not None:
+            self._file_ids.setdefault(source_file, set()).add(point_id)
+
+    def _unindex_source(self, point_id: str, source_file: Optional[str]) -> None:
+        if source_file is None:
+            return
+        file_ids = self._file_ids.get(source_file)
+        if file_ids is None:
+            return
+        file_ids.discard(point_id)
+        if not file_ids:
+            self._file_ids.pop(source_file, None)
+
+    def _as_matrix(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if self.dimension is None:
+            self.dimension = int(matrix.shape[1])
+            self._matrix = np.zeros((0, self.dimension), dtype=np.float32)
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"vector dimension mismatch: {matrix.shape[1]} vs {self.dimension}")
+        return self._normalize_rows(matrix)
+
+    def upsert(self, ids: Sequence[Any], vectors: Sequence[Sequence[float]], payloads: Sequence[Dict[str, Any]]) -> None:
+        if not ids:
+            return
+        if not (len(ids) == len(vectors) == len(payloads)):
+            raise ValueError("ids, vectors and payloads must have the same length")
+        with self._lock:
+            matrix = self._as_matrix(vectors)
+            self._ensure_capacity(self._size + len(ids))
+            written: List[int] = []
+            for point_id, row_vector, payload in zip(ids, matrix, payloads):
+                key = str(point_id)
+                record = self._store_payload(key, payload)
+                source_file = payload.get("source_file")
+                source_file = None if source_file is None else str(source_file)
+                row = self._positions.get(key)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._positions[key] = row
+                    self._ids.append(key)
+                    self._payloads.append(record)
+                    self._sources.append(source_file)
+                else:
+                    self._payloads[row] = record
+                    if self._sources[row] != source_file:
+                        self._unindex_source(key, self._sources[row])
+                        self._sources[row] = source_file
+                self._index_source(key, source_file)
+                self._matrix[row] = row_vector
+                written.append(row)
+            self._rows_written(np.asarray(written, dtype=np.int64))
+            self._persist()
+
+    def _remove_row(self, row: int) -> None:
+        last = self._size - 1
+        removed_id = self._ids[row]
+        self._unindex_source(removed_id, self._sources[row])
+        self._row_removed(row)
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._payloads[row] = self._payloads[last]
+            self._sources[row] = self._sources[last]
+            self._positions[moved_id] = row
+            self._row_moved(last, row)
+        self._ids.pop()
+        self._payloads.pop()
+        self._sources.pop()
+        self._positions.pop(removed_id, None)
+        self._size = last
+
+    def delete(self, ids: Sequence[Any]) -> int:
+        removed = 0
+        with self._lock:
+            for point_id in ids:
+                row = self._positions.get(str(point_id))
+                if row is None:
+                    continue
+                self._remove_row(row)
+                removed += 1
+            if removed:
+                self._persist()
+        return removed
+
+    def delete_where(self, predicate, source_file: Optional[str] = None) -> int:
+        with self._lock:
+            candidates = self._ids if source_file is None else sorted(self.ids_for_file(source_file))
+            doomed = [
+                point_id
+                for point_id in candidates
+                if predicate(self._load_payload(self._payloads[self._positions[point_id]]))
+            ]
+            return self.delete(doomed)
+
+    def ids_for_file(self, source_file: str) -> Set[str]:
+        with self._lock:
+            return set(self._file_ids.get(str(source_file), ()))
+
+    def delete_file(self, source_file: str) -> int:
+        with self._lock:
+            return self.delete(sorted(self.ids_for_file(source_file)))
+
+    def file_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {source_file: len(ids) for source_file, ids in self._file_ids.items()}
+
+    def _masked_rows(
+        self, source_files: Optional[Iterable[str]], where: Optional[Callable[[Dict[str, Any]], bool]]
+    ) -> np.ndarray:
+        if source_files is not None:
+            rows: Iterable[int] = sorted(
+                self._positions[point_id]
+                for source_file in set(source_files)
+                for point_id in self._file_ids.get(source_file, ())
+            )
+        else:
+            rows = range(self._size)
+        if where is not None:
+            rows = [row for row in rows if where(self._load_payload(self._payloads[row]))]
+        return np.fromiter(rows, dtype=np.int64)
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        limit: int = 5,
+        *,
+        source_files: Optional[Iterable[str]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._size == 0 or limit <= 0:
+                return []
+            query = self._as_matrix([query_vector])[0]
+            if source_files is not None or where is not None:
+                # A filtered query scores only its slice exactly; ANN candidates could miss it entirely.
+                rows = self._masked_rows(source_files, where)
+            else:
+                rows = self._candidate_rows(query, int(limit))
+            if rows is None:
+                rows = np.arange(self._size)
+                scores = self._matrix[: self._size] @ query
+            else:
+                scores = self._matrix[rows] @ query
+            k = min(int(limit), scores.shape[0])
+            if k <= 0:
+                return []
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(scores.shape[0])
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                {
+                    "id": self._ids[rows[pos]],
+                    "payload": self._load_payload(self._payloads[rows[pos]]),
+                    "score": float(scores[pos]),
+                }
+                for pos in top
+            ]
+
+    def get_vector(self, point_id: Any) -> Optional[List[float]]:
+        with self._lock:
+            row = self._positions.get(str(point_id))
+            return None if row is None else self._matrix[row].tolist()
+
+    def iter_points(
+        self, with_vectors: bool = False, ids: Optional[Iterable[Any]] = None, batch_size: int = 1024
+    ) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            point_ids = list(self._ids[: self._size]) if ids is None else [str(point_id) for point_id in ids]
+        batch_size = max(int(batch_size), 1)
+        for start in range(0, len(point_ids), batch_size):
+            snapshot = []
+            with self._lock:
+                for point_id in point_ids[start : start + batch_size]:
+                    row = self._positions.get(point_id)
+                    if row is None:
+                        continue
+                    snapshot.append(
+                        (
+                            point_id,
+                            self._load_payload(self._payloads[row]),
+                            self._matrix[row].tolist() if with_vectors else None,
+                        )
+                    )
+            for point_id, payload, vector in snapshot:
+                point = {"id": point_id, "payload": payload}
+                if with_vectors:
+                    point["vector"] = vector
+                yield point
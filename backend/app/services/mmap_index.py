@@ -0,0 +1,267 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .memory_index import MemoryVectorIndex
+
+logger = logging.getLogger("nexusai.mmap_index")
+
+VECTORS_FILE = "vectors.f32"
+PAYLOAD_LOG_PATTERN = "payloads-{generation}.jsonl"
+INDEX_FILE = "index.npz"
+COMPACT_MIN_BYTES = 8 * 1024 * 1024
+CHECKPOINT_MIN_BYTES = 4 * 1024 * 1024
+
+
+class MmapVectorIndex(MemoryVectorIndex):
+    def __init__(self, path: str, *, initial_capacity: int = 1024, payload_cache_size: int = 4096):
+        super().__init__(initial_capacity=initial_capacity)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._payload_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._payload_cache_size = max(int(payload_cache_size), 0)
+        self._log_generation = 0
+        self._log_writer = None
+        self._log_reader = None
+        self._checkpoint_offset: Optional[int] = None
+        self._load()
+        if self._log_writer is None:
+            self._open_log()
+
+    def _log_path(self, generation: int) -> Path:
+        return self.path / PAYLOAD_LOG_PATTERN.format(generation=generation)
+
+    def _open_log(self) -> None:
+        log_path = self._log_path(self._log_generation)
+        self._log_writer = open(log_path, "ab")
+        self._log_reader = open(log_path, "rb")
+
+    def _load(self) -> None:
+        index_path = self.path / INDEX_FILE
+        if not index_path.exists():
+            return
+        with np.load(index_path, allow_pickle=False) as data:
+            self._log_generation = int(data["log_generation"])
+            dimension = int(data["dimension"])
+            size = int(data["size"])
+            ids = [str(value) for value in data["ids"].tolist()]
+            offsets = data["offsets"].tolist()
+            lengths = data["lengths"].tolist()
+            sources = [str(value) if value else None for value in data["sources"].tolist()] if "sources" in data.files else None
+            # Indexes written before the append-only log recorded the state at the end of the log.
+            log_offset = int(data["log_offset"]) if "log_offset" in data.files else None
+        self._open_log()
+        if log_offset is None:
+            log_offset = self._log_writer.seek(0, os.SEEK_END)
+        self._checkpoint_offset = log_offset
+        if dimension <= 0:
+            return
+        self.dimension = dimension
+        self._size = size
+        self._ids = ids
+        self._payloads = list(zip(offsets, lengths))
+        self._positions = {point_id: row for row, point_id in enumerate(ids)}
+        if sources is None:
+            sources = []
+            for record in self._payloads:
+                source_file = self._load_payload(record).get("source_file")
+                sources.append(None if source_file is None else str(source_file))
+        self._sources = sources
+        for point_id, source_file in zip(ids, sources):
+            self._index_source(point_id, source_file)
+        replayed = self._replay_log(log_offset)
+
+        vectors_path = self.path / VECTORS_FILE
+        capacity = vectors_path.stat().st_size // (dimension * 4) if vectors_path.exists() else 0
+        if capacity < self._size:
+            raise RuntimeError(f"vector segment {vectors_path} is shorter than its index ({capacity} < {self._size} rows)")
+        if capacity:
+            self._map_vectors(capacity)
+        else:
+            self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        logger.info(
+            "📦 Mapped local vector store at %s (%s points, dim=%s, %s log records replayed)",
+            self.path,
+            self._size,
+            dimension,
+            replayed,
+        )
+
+    def _replay_log(self, offset: int) -> int:
+        # Re-applies the id changes logged after the last checkpoint. Vectors were written in
+        # place when the change happened, so only ids, payload records and sources move here.
+        replayed = 0
+        self._log_reader.seek(offset)
+        for line in self._log_reader:
+            if not line.endswith(b"\n"):
+                logger.warning("⚠️ Ignoring torn record at the end of %s", self._log_path(self._log_generation))
+                break
+            record = json.loads(line.decode("utf-8"))
+            key = str(record["id"])
+            row = self._positions.get(key)
+            if record.get("deleted"):
+                if row is not None:
+                    self._forget_row(row)
+            else:
+                source_file = record["payload"].get("source_file")
+                source_file = None if source_file is None else str(source_file)
+                if row is None:
+                    self._positions[key] = self._size
+                    self._size += 1
+                    self._ids.append(key)
+                    self._payloads.append((offset, len(line)))
+                    self._sources.append(source_file)
+                else:
+                    self._payloads[row] = (offset, len(line))
+                    self._unindex_source(key, self._sources[row])
+                    self._sources[row] = source_file
+                self._index_source(key, source_file)
+            offset += len(line)
+            replayed += 1
+        return replayed
+
+    def _forget_row(self, row: int) -> None:
+        # Same swap-remove as _remove_row, minus the vector copy (already on disk).
+        last = self._size - 1
+        removed_id = self._ids[row]
+        self._unindex_source(removed_id, self._sources[row])
+        if row != last:
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._payloads[row] = self._payloads[last]
+            self._sources[row] = self._sources[last]
+            self._positions[moved_id] = row
+        self._ids.pop()
+        self._payloads.pop()
+        self._sources.pop()
+        self._positions.pop(removed_id, None)
+        self._size = last
+
+    def _map_vectors(self, capacity: int) -> None:
+        vectors_path = self.path / VECTORS_FILE
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        with open(vectors_path, "ab") as handle:
+            if handle.tell() < capacity * self.dimension * 4:
+                handle.truncate(capacity * self.dimension * 4)
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._matrix.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(self._initial_capacity, capacity)
+        while new_capacity < required:
+            new_capacity *= 2
+        self._map_vectors(new_capacity)
+        self._capacity_changed(new_capacity)
+
+    def _cache_payload(self, offset: int, payload: Dict[str, Any]) -> None:
+        if not self._payload_cache_size:
+            return
+        self._payload_cache[offset] = payload
+        self._payload_cache.move_to_end(offset)
+        while len(self._payload_cache) > self._payload_cache_size:
+            self._payload_cache.popitem(last=False)
+
+    def _store_payload(self, point_id: str, payload: Dict[str, Any]) -> Tuple[int, int]:
+        line = (json.dumps({"id": point_id, "payload": payload}, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self._log_writer.seek(0, os.SEEK_END)
+        self._log_writer.write(line)
+        self._cache_payload(offset, payload)
+        return offset, len(line)
+
+    def _row_removed(self, row: int) -> None:
+        line = (json.dumps({"id": self._ids[row], "deleted": True}) + "\n").encode("utf-8")
+        self._log_writer.seek(0, os.SEEK_END)
+        self._log_writer.write(line)
+
+    def _load_payload(self, record: Tuple[int, int]) -> Dict[str, Any]:
+        offset, length = record
+        cached = self._payload_cache.get(offset)
+        if cached is not None:
+            self._payload_cache.move_to_end(offset)
+            return cached
+        self._log_writer.flush()
+        self._log_reader.seek(offset)
+        payload = json.loads(self._log_reader.read(length).decode("utf-8"))["payload"]
+        self._cache_payload(offset, payload)
+        return payload
+
+    def _write_index(self) -> None:
+        index_path = self.path / INDEX_FILE
+        tmp_path = self.path / (INDEX_FILE + ".tmp")
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                log_generation=np.int64(self._log_generation),
+                dimension=np.int64(self.dimension or 0),
+                size=np.int64(self._size),
+                log_offset=np.int64(self._log_writer.tell()),
+                ids=np.asarray(self._ids[: self._size], dtype=str),
+                offsets=np.asarray([record[0] for record in self._payloads], dtype=np.int64),
+                lengths=np.asarray([record[1] for record in self._payloads], dtype=np.int64),
+                sources=np.asarray([source_file or "" for source_file in self._sources], dtype=str),
+            )
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, index_path)
+        # An index without a dimension cannot be replayed onto, so the next write checkpoints again.
+        self._checkpoint_offset = self._log_writer.tell() if self.dimension else None
+
+    def _persist(self) -> None:
+        self._log_writer.flush()
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        # Writes only append to the log; the O(N) index is rewritten once the log has grown by
+        # a fraction of its checkpointed size, so checkpoint cost stays amortised per write.
+        if self._checkpoint_offset is not None:
+            grown = self._log_writer.tell() - self._checkpoint_offset
+            if grown < max(CHECKPOINT_MIN_BYTES, self._checkpoint_offset // 2):
+                return
+        self.checkpoint()
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self._log_writer.flush()
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            log_bytes = self._log_writer.tell()
+            live_bytes = sum(record[1] for record in self._payloads)
+            if log_bytes > COMPACT_MIN_BYTES and log_bytes > 2 * live_bytes:
+                self._compact_log()
+                return
+            self._write_index()
+
+    def _compact_log(self) -> None:
+        previous_path = self._log_path(self._log_generation)
+        next_path = self._log_path(self._log_generation + 1)
+        records = []
+        with open(next_path, "wb") as handle:
+            for record in self._payloads:
+                self._log_reader.seek(record[0])
+                line = self._log_reader.read(record[1])
+                records.append((handle.tell(), len(line)))
+                handle.write(line)
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._log_writer.close()
+        self._log_reader.close()
+        self._log_generation += 1
+        self._payloads = records
+        self._payload_cache.clear()
+        self._open_log()
+        self._write_index()
+        previous_path.unlink()
+        logger.info("🧹 Compacted local payload log: %s live points", len(records))
+
+    def close(self) -> None:
+        with self._lock:
+            self.checkpoint()
+            self._log_writer.close()
+            self._log_reader.close()
@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
 from ..config import config
+from .hit import Hit
 from .llm_utils import complete_text
 
 
@@ -127,27 +128,26 @@ class QueryTransformer:
         }
 
     @staticmethod
-    def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], k: int = 60) -> List[Dict[str, Any]]:
-        merged: Dict[str, Dict[str, Any]] = {}
+    def reciprocal_rank_fusion(rankings: List[List[Any]], k: int = 60) -> List[Hit]:
+        merged: Dict[str, Hit] = {}
         for result_list in rankings:
             for rank, item in enumerate(result_list, start=1):
-                payload = item.get("payload", {}) or {}
+                hit = Hit.from_value(item)
+                payload = hit.payload
                 key = "{}::{}".format(payload.get("source_file"), payload.get("chunk_index", payload.get("parent_id", rank)))
-                entry = merged.setdefault(
-                    key,
-                    {
-                        "payload": payload,
-                        "score": 0.0,
-                        "vector_score": item.get("vector_score", 0.0),
-                        "keyword_score": item.get("keyword_score", 0.0),
-                    },
-                )
-                entry["score"] += 1.0 / (k + rank)
-                entry["vector_score"] = max(float(entry.get("vector_score", 0.0)), float(item.get("vector_score", 0.0)))
-                entry["keyword_score"] = max(float(entry.get("keyword_score", 0.0)), float(item.get("keyword_score", 0.0)))
+                if hit.collection:
+                    key = "{}::{}".format(hit.collection, key)
+                vector_score = float(hit.vector_score or 0.0)
+                keyword_score = float(hit.keyword_score or 0.0)
+                entry = merged.get(key)
+                if entry is None:
+                    entry = merged[key] = hit.replace(score=0.0, vector_score=vector_score, keyword_score=keyword_score)
+                entry.score += 1.0 / (k + rank)
+                entry.vector_score = max(entry.vector_score, vector_score)
+                entry.keyword_score = max(entry.keyword_score, keyword_score)
 
         fused = list(merged.values())
-        fused.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+        fused.sort(key=lambda item: item.score, reverse=True)
         return fused
 
     def merge_results(self, ranked_lists: List[List[Dict[str, Any]]], limit: int = 5) -> List[Dict[str, Any]]:
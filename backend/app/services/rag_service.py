@@ -8,12 +8,16 @@ from openai import OpenAI
 
 from ..config import config
 from ..observability.tracer import create_tracer
+from .access_tracker import AccessTracker
+from .collection_registry import DEFAULT_COLLECTION, CollectionRegistry
 from .confidence_service import LowConfidenceService
 from .embedding_service import EmbeddingService
 from .graph_store import GraphStore
+from .hit import Hit
 from .llm_utils import create_llm_client, is_mock_backend
 from .query_transformer import QueryTransformer
 from .reranker_service import RerankerService
+from .retrieval_filter import RetrievalFilter
 from .self_rag import SelfRAGController
 from .vector_store import VectorStore
 
@@ -50,6 +54,8 @@ class RAGService:
     def __init__(self):
         self.embedding_service = EmbeddingService()
         self.vector_store = VectorStore()
+        self.collection_registry = CollectionRegistry(default_store=self.vector_store)
+        self.access_tracker = AccessTracker() if config.tiering_enabled else None
         self.reranker = RerankerService()
         self.query_transformer = QueryTransformer()
         self.confidence_service = LowConfidenceService()
@@ -167,6 +173,8 @@ class RAGService:
         transformed_query,
         tracer: Any,
         overrides: Optional[Dict[str, Any]] = None,
+        filters: Optional[RetrievalFilter] = None,
+        collections: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         reranker_enabled = bool(self._setting(overrides, "reranker_enabled", config.reranker_enabled))
         search_limit = (
@@ -176,6 +184,8 @@ class RAGService:
         )
         alpha = float(self._setting(overrides, "workflow_hybrid_alpha", config.workflow_hybrid_alpha))
         expand_to_parent = self._setting(overrides, "chunking_strategy", config.chunking_strategy) == "parent_child"
+        hnsw_ef = int(self._setting(overrides, "qdrant_hnsw_ef", config.qdrant_hnsw_ef)) or None
+        document_routing = bool(self._setting(overrides, "document_routing_enabled", config.document_routing_enabled))
 
         rankings: List[List[Dict[str, Any]]] = []
         search_queries = transformed_query.search_queries or [query]
@@ -186,7 +196,7 @@ class RAGService:
                 input_size=len(embedding_query),
                 input_tokens=self._estimate_tokens(embedding_query),
             ):
-                query_vector = self.embedding_service.get_embeddings([embedding_query])[0]
+                query_vector = self.embedding_service.embed_query(embedding_query)
 
             with tracer.step(
                 "retrieve",
@@ -194,13 +204,20 @@ class RAGService:
                 top_n=search_limit,
                 input_tokens=self._estimate_tokens(search_query),
             ):
-                hits = self.vector_store.hybrid_search(
+                search_kwargs = dict(
                     query_text=search_query,
                     query_vector=query_vector,
                     limit=search_limit,
                     alpha=alpha,
                     expand_to_parent=expand_to_parent,
+                    hnsw_ef=hnsw_ef,
+                    filters=filters,
+                    document_routing=document_routing,
                 )
+                if collections:
+                    hits = self.collection_registry.hybrid_search(collections, **search_kwargs)
+                else:
+                    hits = self.vector_store.hybrid_search(**search_kwargs)
             rankings.append(hits)
 
         if transformed_query.strategy in ("decompose", "multi_query") and len(rankings) > 1:
@@ -208,13 +225,21 @@ class RAGService:
         else:
             merged = rankings[0] if rankings else []
 
-        graph_context = self.graph_store.query_context(query)
+        # Graph facts are corpus-wide and carry no file/page metadata, so scoped queries leave them out.
+        # The graph is built from the default collection only.
+        graph_scoped = filters is None and (not collections or DEFAULT_COLLECTION in collections)
+        graph_context = self.graph_store.query_context(query) if graph_scoped else []
         for graph_hit in graph_context:
             if isinstance(graph_hit, dict):
-                merged.append(graph_hit)
+                merged.append(Hit.from_value(graph_hit))
 
         merged.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
-        return merged[:search_limit]
+        merged = merged[:search_limit]
+        tracker = getattr(self, "access_tracker", None)
+        if tracker is not None:
+            # Only the default collection is tiered; federated hits from other collections are not counted.
+            tracker.record(hit for hit in merged if hit.get("collection", DEFAULT_COLLECTION) == DEFAULT_COLLECTION)
+        return merged
 
     def _rerank_candidates(
         self,
@@ -251,15 +276,15 @@ class RAGService:
         return reranked[:top_k]
 
     @staticmethod
-    def _source_details_from_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _source_details_from_hits(hits: List[Any]) -> List[Dict[str, Any]]:
         source_details = []
-        for hit in hits:
-            payload = hit.get("payload", {}) or {}
+        for hit in map(Hit.from_value, hits):
+            payload = hit.payload
             source_details.append(
                 {
                     "source_file": payload.get("source_file"),
                     "content": payload.get("chunk_text", ""),
-                    "score": float(hit.get("score", 0.0)),
+                    "score": hit.score,
                     "parent_id": payload.get("parent_id"),
                     "children_ids": payload.get("children_ids", []),
                 }
@@ -267,8 +292,8 @@ class RAGService:
         return source_details
 
     @staticmethod
-    def _build_context(hits: List[Dict[str, Any]]) -> str:
-        return "\n\n---\n\n".join(str(hit.get("payload", {}).get("chunk_text", "")) for hit in hits if hit.get("payload"))
+    def _build_context(hits: List[Any]) -> str:
+        return "\n\n---\n\n".join(str(hit["payload"].get("chunk_text", "")) for hit in hits if hit.get("payload"))
 
     def _build_messages(self, query: str, history: List[Dict[str, Any]], context_text: str) -> List[Dict[str, str]]:
         system_prompt = (
@@ -333,8 +358,12 @@ class RAGService:
         overrides: Optional[Dict[str, Any]] = None,
         experiment_id: Optional[str] = None,
         variant_id: Optional[str] = None,
+        filters: Optional[Any] = None,
+        collections: Optional[List[str]] = None,
     ) -> RAGResponse:
         history = self._coerce_history(history)
+        filters = RetrievalFilter.from_value(filters)
+        collections = self.collection_registry.resolve(collections) if collections else None
         tracer = create_tracer(
             enabled=config.observability_enabled,
             metadata={
@@ -342,6 +371,8 @@ class RAGService:
                 "session_id": session_id,
                 "experiment_id": experiment_id,
                 "variant_id": variant_id,
+                "filters": filters.to_dict() if filters else None,
+                "collections": collections,
             },
         )
 
@@ -364,7 +395,9 @@ class RAGService:
 
         hits = []
         for attempt in range(max(config.self_rag_max_retries, 0) + 1):
-            hits = self._retrieve_candidates(query, transformed_query, tracer, overrides=overrides)
+            hits = self._retrieve_candidates(
+                query, transformed_query, tracer, overrides=overrides, filters=filters, collections=collections
+            )
             confidence_score = self.confidence_service.score_hits(hits)
             if not config.self_rag_enabled:
                 break
@@ -5,6 +5,8 @@ from typing import Any, Dict, Iterable, List, Sequence, Tuple
 import requests
 
 from ..config import config
+from . import cpu_inference
+from .hit import Hit
 
 logger = logging.getLogger("nexusai.reranker")
 
@@ -26,19 +28,31 @@ class RerankerService:
     def _ensure_local_model(self, model_name: str):
         if self.model is not None and self.model_name == model_name:
             return
+        import torch
         from sentence_transformers import CrossEncoder  # pragma: no cover - optional heavy dependency
 
-        self.model = CrossEncoder(model_name)
+        if torch.cuda.is_available():
+            model = CrossEncoder(model_name)
+        else:
+            mode = cpu_inference.cpu_mode()
+            cpu_inference.configure_threads()
+            model = CrossEncoder(model_name, device="cpu")
+            cpu_inference.prepare_model(model.model, mode)
+            logger.info("🧮 Local reranker %s on cpu (%s, %s threads)", model_name, mode, torch.get_num_threads())
+        if config.cpu_inference_warmup:
+            cpu_inference.warm_up("Reranker", lambda: model.predict([["warm-up", "warm-up"]]))
+        self.model = model
         self.model_name = model_name
 
     @staticmethod
-    def _as_hit(item: Any, index: int) -> Dict[str, Any]:
-        if isinstance(item, dict):
-            payload = item.get("payload", {}) or {}
-            payload.setdefault("chunk_index", index)
-            return {"payload": payload, "score": float(item.get("score", 0.0))}
+    def _as_hit(item: Any, index: int) -> Hit:
+        if isinstance(item, (dict, Hit)):
+            hit = Hit.from_value(item)
+            if "chunk_index" in hit.payload:
+                return hit
+            return hit.replace(payload={**hit.payload, "chunk_index": index})
         text, score = item
-        return {"payload": {"chunk_text": str(text), "chunk_index": index}, "score": float(score)}
+        return Hit({"chunk_text": str(text), "chunk_index": index}, float(score))
 
     @staticmethod
     def _token_overlap_score(query: str, chunk_text: str, base_score: float) -> float:
@@ -115,12 +129,8 @@ class RerankerService:
             scores = self.model.predict(
                 [[query, str(hit.get("payload", {}).get("chunk_text", ""))] for hit in hits]
             )
-            reranked = []
-            for hit, score in zip(hits, scores):
-                item = dict(hit)
-                item["score"] = float(score)
-                reranked.append(item)
-            reranked.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+            reranked = [hit.replace(score=float(score)) for hit, score in zip(hits, scores)]
+            reranked.sort(key=lambda item: item.score, reverse=True)
             return reranked
         except Exception as exc:
             logger.warning("⚠️ Local reranker unavailable, falling back to mock scoring: %s", exc)
@@ -152,13 +162,11 @@ class RerankerService:
             response.raise_for_status()
             data = response.json()
             results = data.get("results", [])
-            scored: List[Dict[str, Any]] = []
-            for row in results:
-                index = int(row.get("index", 0))
-                hit = dict(hits[index])
-                hit["score"] = float(row.get("relevance_score", row.get("score", 0.0)))
-                scored.append(hit)
-            scored.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+            scored = [
+                hits[int(row.get("index", 0))].replace(score=float(row.get("relevance_score", row.get("score", 0.0))))
+                for row in results
+            ]
+            scored.sort(key=lambda item: item.score, reverse=True)
             return scored
         except Exception as exc:
             logger.warning("⚠️ API reranker unavailable, falling back to mock scoring: %s", exc)
@@ -167,10 +175,7 @@ class RerankerService:
     def _rerank_mock(self, query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         reranked = []
         for hit in hits:
-            chunk_text = str(hit.get("payload", {}).get("chunk_text", ""))
-            score = self._token_overlap_score(query, chunk_text, float(hit.get("score", 0.0)))
-            item = dict(hit)
-            item["score"] = 1.0 / (1.0 + math.exp(-5.0 * (score - 0.5)))
-            reranked.append(item)
-        reranked.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+            score = self._token_overlap_score(query, str(hit.payload.get("chunk_text", "")), hit.score)
+            reranked.append(hit.replace(score=1.0 / (1.0 + math.exp(-5.0 * (score - 0.5)))))
+        reranked.sort(key=lambda item: item.score, reverse=True)
         return reranked
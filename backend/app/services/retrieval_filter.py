@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.http import models
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value if item is not None and item != ""]
+    return [str(value)]
+
+
+def _as_page(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+@dataclass
+class RetrievalFilter:
+    source_files: List[str] = field(default_factory=list)
+    section_types: List[str] = field(default_factory=list)
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+    version_ids: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_value(cls, value: Any) -> Optional["RetrievalFilter"]:
+        if value is None:
+            return None
+        if isinstance(value, RetrievalFilter):
+            return None if value.is_empty() else value
+        if hasattr(value, "model_dump"):
+            value = value.model_dump()
+        if not isinstance(value, dict):
+            raise ValueError(f"unsupported retrieval filter: {value!r}")
+        parsed = cls(
+            source_files=_as_list(value.get("source_files", value.get("source_file"))),
+            section_types=_as_list(value.get("section_types", value.get("section_type"))),
+            page_from=_as_page(value.get("page_from")),
+            page_to=_as_page(value.get("page_to")),
+            version_ids=_as_list(value.get("version_ids", value.get("version_id"))),
+        )
+        if parsed.page_from is not None and parsed.page_to is not None and parsed.page_from > parsed.page_to:
+            raise ValueError(f"page_from ({parsed.page_from}) is after page_to ({parsed.page_to})")
+        return None if parsed.is_empty() else parsed
+
+    def is_empty(self) -> bool:
+        has_pages = self.page_from is not None or self.page_to is not None
+        return not (self.source_files or self.section_types or self.version_ids or has_pages)
+
+    def only_source_files(self) -> bool:
+        return bool(self.source_files) and not (
+            self.section_types or self.version_ids or self.page_from is not None or self.page_to is not None
+        )
+
+    def to_qdrant(self) -> Optional[models.Filter]:
+        must: List[models.FieldCondition] = []
+        for key, values in (
+            ("source_file", self.source_files),
+            ("section_type", self.section_types),
+            ("version_id", self.version_ids),
+        ):
+            if values:
+                must.append(models.FieldCondition(key=key, match=models.MatchAny(any=list(values))))
+        if self.page_from is not None or self.page_to is not None:
+            must.append(models.FieldCondition(key="page", range=models.Range(gte=self.page_from, lte=self.page_to)))
+        return models.Filter(must=must) if must else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source_files": list(self.source_files),
+            "section_types": list(self.section_types),
+            "page_from": self.page_from,
+            "page_to": self.page_to,
+            "version_ids": list(self.version_ids),
+        }
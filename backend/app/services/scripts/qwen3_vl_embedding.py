@@ -16,6 +16,8 @@ from transformers.cache_utils import Cache
 from transformers.utils.generic import check_model_inputs
 from qwen_vl_utils.vision_process import process_vision_info
 
+from ..length_batching import plan_length_batches
+
 logger = logging.getLogger(__name__)
 
 # Constants for configuration
@@ -29,6 +31,9 @@ MAX_FRAMES = 64
 FRAME_MAX_PIXELS = 768 * IMAGE_FACTOR * IMAGE_FACTOR
 MAX_TOTAL_PIXELS = 10 * FRAME_MAX_PIXELS
 PAD_TOKEN = "<|endoftext|>"
+MAX_BATCH_SIZE = 32
+MAX_BATCH_TOKENS = 16384
+CHAT_TEMPLATE_TOKENS = 16
 
 # Define output structure for embeddings
 @dataclass
@@ -145,6 +150,8 @@ class Qwen3VLEmbedder():
         num_frames: int = MAX_FRAMES,
         max_frames: int = MAX_FRAMES,
         default_instruction: str = "Represent the user's input.",
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
         **kwargs
     ):
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -158,6 +165,8 @@ class Qwen3VLEmbedder():
         self.max_frames = max_frames
 
         self.default_instruction = default_instruction
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
 
         self.model = Qwen3VLForEmbedding.from_pretrained(
             model_name_or_path, trust_remote_code=True, **kwargs
@@ -167,7 +176,7 @@ class Qwen3VLEmbedder():
         )
         self.model.eval()
 
-    @torch.no_grad()
+    @torch.inference_mode()
     def forward(self, inputs: Dict[str, Any]) -> Dict[str, torch.Tensor]:
         outputs = self.model(**inputs)
         return {
@@ -313,8 +322,25 @@ class Qwen3VLEmbedder():
         row = torch.arange(hidden_state.shape[0], device=hidden_state.device)
         return hidden_state[row, col]
 
-    # Process inputs to generate normalized embeddings
-    def process(self, inputs: List[Dict[str, Any]], normalize: bool = True) -> tuple:
+    # Estimate padded sequence length per input without running the processor
+    def _estimate_lengths(self, inputs: List[Dict[str, Any]]) -> List[int]:
+        texts = [
+            "{} {}".format(ele.get('instruction') or self.default_instruction, ele.get('text') or '')
+            for ele in inputs
+        ]
+        token_ids = self.processor.tokenizer(texts, add_special_tokens=False)['input_ids']
+        lengths = []
+        for ele, ids in zip(inputs, token_ids):
+            length = len(ids) + CHAT_TEMPLATE_TOKENS
+            if ele.get('video'):
+                length += self.max_length
+            elif ele.get('image'):
+                # Upper bound: one merged token per IMAGE_FACTOR x IMAGE_FACTOR patch
+                length += self.max_pixels // (IMAGE_FACTOR * IMAGE_FACTOR)
+            lengths.append(min(length, self.max_length))
+        return lengths
+
+    def _embed_batch(self, inputs: List[Dict[str, Any]], normalize: bool) -> torch.Tensor:
         conversations = [self.format_model_input(
             text=ele.get('text'),
             image=ele.get('image'),
@@ -334,4 +360,22 @@ class Qwen3VLEmbedder():
         if normalize:
             embeddings = F.normalize(embeddings, p=2, dim=-1)
 
-        return embeddings
\ No newline at end of file
+        return embeddings
+
+    # Process inputs to generate normalized embeddings
+    @torch.inference_mode()
+    def process(self, inputs: List[Dict[str, Any]], normalize: bool = True) -> torch.Tensor:
+        if not inputs:
+            return torch.empty((0, self.model.config.text_config.hidden_size))
+
+        # Length-sorted micro-batches bound peak memory and padding; rows are written back in input order
+        batches = plan_length_batches(
+            self._estimate_lengths(inputs), self.max_batch_size, self.max_batch_tokens
+        )
+        embeddings = None
+        for batch in batches:
+            batch_embeddings = self._embed_batch([inputs[idx] for idx in batch], normalize)
+            if embeddings is None:
+                embeddings = batch_embeddings.new_empty((len(inputs), batch_embeddings.shape[1]))
+            embeddings[torch.tensor(batch, device=embeddings.device)] = batch_embeddings
+        return embeddings
@@ -174,8 +174,6 @@ class TextChunker:
                 "chunk_role": "parent",
                 "parent_id": parent_id,
                 "children_ids": [],
-                "parent_text": parent_text,
-                "parent_chunk_text": parent_text,
             }
             for child_idx, child in enumerate(parent["children"]):
                 base_text = child.get("chunk_text", "")
@@ -188,8 +186,6 @@ class TextChunker:
                         {
                             "chunk_role": "child",
                             "parent_id": parent_id,
-                            "parent_text": parent_text,
-                            "parent_chunk_text": parent_text,
                         }
                     )
                     combined_chunks.append({"chunk_text": child_text, "metadata": metadata, "child_id": child_id})
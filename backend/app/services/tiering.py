@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import config
+from .access_tracker import AccessTracker
+from .vector_store import VectorStore
+
+logger = logging.getLogger("nexusai.tiering")
+
+
+class TieringJob:
+    def __init__(self, vector_store: Optional[VectorStore] = None, tracker: Optional[AccessTracker] = None):
+        self.vector_store = vector_store or VectorStore()
+        self.tracker = tracker or AccessTracker()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _tiers(self):
+        cold = self.vector_store._cold_store()
+        if cold is None:
+            raise ValueError("tiering requires TIERING_ENABLED=true")
+        return self.vector_store, cold
+
+    def plan(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        hot, cold = self._tiers()
+        now = time.time() if now is None else now
+        hot_files = hot._scan_file_counts()
+        cold_files = cold._scan_file_counts()
+        first_seen = self.tracker.observe_files(set(hot_files) | set(cold_files), now=now)
+        heat = self.tracker.file_heat()
+        min_age = float(config.tiering_min_age_seconds)
+
+        promote = sorted(
+            (source_file for source_file in cold_files if heat.get(source_file, 0.0) >= config.tiering_hot_min_hits),
+            key=lambda source_file: -heat.get(source_file, 0.0),
+        )
+        demote = sorted(
+            (
+                source_file
+                for source_file in hot_files
+                if heat.get(source_file, 0.0) < config.tiering_cold_max_hits
+                and now - first_seen.get(source_file, now) >= min_age
+            ),
+            key=lambda source_file: heat.get(source_file, 0.0),
+        )
+        budget = max(int(config.tiering_max_moves), 0)
+        promote = promote[:budget]
+        return {"promote": promote, "demote": demote[: budget - len(promote)]}
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        hot, cold = self._tiers()
+        started = time.perf_counter()
+        plan = self.plan()
+        moved = {"promote": [], "demote": []}
+        points_moved = 0
+        if not dry_run:
+            for action, source, target in (("promote", cold, hot), ("demote", hot, cold)):
+                for source_file in plan[action]:
+                    try:
+                        points_moved += source.move_file_to(target, source_file)
+                        moved[action].append(source_file)
+                    except Exception as exc:
+                        logger.warning("⚠️ Could not %s %s: %s", action, source_file, exc)
+            self.tracker.decay(config.tiering_decay)
+            self.tracker.save()
+        report = {
+            "promoted": moved["promote"] if not dry_run else plan["promote"],
+            "demoted": moved["demote"] if not dry_run else plan["demote"],
+            "points_moved": points_moved,
+            "dry_run": dry_run,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(
+            "🧊 Tiering run: %s promoted, %s demoted, %s points moved in %.3fs%s",
+            len(report["promoted"]),
+            len(report["demoted"]),
+            points_moved,
+            report["seconds"],
+            " (dry run)" if dry_run else "",
+        )
+        return report
+
+    def _loop(self) -> None:
+        interval = max(float(config.tiering_interval_seconds), 1.0)
+        while not self._stop.wait(interval):
+            try:
+                self.run()
+            except Exception as exc:
+                logger.warning("⚠️ Tiering run failed: %s", exc)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="nexusai-tiering", daemon=True)
+        self._thread.start()
+        logger.info("🧊 Tiering job started (every %ss)", config.tiering_interval_seconds)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.tracker.save()
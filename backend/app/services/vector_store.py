@@ -1,71 +1,468 @@
+import heapq
+import logging
+import math
 import re
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
 from ..config import config
+from .ann_index import IVFVectorIndex
+from .bm25_index import BM25Index, sparse_document_vector, sparse_query_vector
+from .document_summary import DocumentSummaryBuilder, summarize_document
+from .hit import Hit
+from .memory_index import MemoryVectorIndex
+from .mmap_index import MmapVectorIndex
+from .retrieval_filter import RetrievalFilter
+from .write_coalescer import WriteCoalescer, all_of
+
+logger = logging.getLogger("nexusai.vector_store")
+
+
+DENSE_VECTOR_NAME = ""
+SPARSE_VECTOR_NAME = "lexical"
+KEYWORD_PAYLOAD_FIELDS = ["source_file", "chunk_text", "chunk_index", "chunk_role", "parent_id", "children_ids"]
+
+
+class RetrievalUnavailableError(RuntimeError):
+    pass
 
 
 class VectorStore:
-    def __init__(self):
+    _shared_memory_indexes: Dict[str, MemoryVectorIndex] = {}
+    _shared_keyword_indexes: Dict[str, BM25Index] = {}
+    _search_executor: Optional[ThreadPoolExecutor] = None
+    _search_executor_lock = threading.Lock()
+    _write_coalescers: Dict[str, WriteCoalescer] = {}
+    _write_coalescers_lock = threading.Lock()
+    _file_locks: Dict[Tuple[str, str], threading.RLock] = {}
+    _file_locks_lock = threading.Lock()
+    _embedded_clients: Dict[str, QdrantClient] = {}
+    _embedded_clients_lock = threading.Lock()
+    _abandoned_legs = 0
+    _abandoned_legs_lock = threading.Lock()
+    _index_epoch = 0
+    _index_epoch_token = uuid.uuid4().hex[:8]
+    _index_epoch_lock = threading.Lock()
+    _document_summaries_synced: Set[str] = set()
+
+    def __init__(
+        self,
+        client: Optional[QdrantClient] = None,
+        collection_name: Optional[str] = None,
+        cold_storage: bool = False,
+    ):
+        self.collection_name = collection_name or config.collection_name
+        self.cold_storage = cold_storage
         self.supports_text_index = False
+        self.supports_sparse_vectors = False
         self.available = False
-        self._memory_points: List[Dict[str, Any]] = []
-        self.client = QdrantClient(host=config.qdrant_host, port=config.qdrant_port, check_compatibility=False)
-        try:
-            self._ensure_collection()
-            self.available = True
-        except Exception as exc:
-            print(f"⚠️ Qdrant unavailable, using in-memory vector store fallback: {exc}")
+        self.backend = (config.vector_store_backend or "qdrant").strip().lower()
+        self._memory_index = self._shared_memory_index(self.collection_name)
+        self._document_memory_index = self._shared_document_index(self.collection_name)
+        if self.backend == "local":
+            self.client = None
+            logger.info("📦 Using local memory-mapped vector store at %s", self._local_path(self.collection_name))
+        elif self.backend == "memory":
+            self.client = None
+            logger.info("📦 Using in-process vector store (not persisted)")
+        else:
+            self.client = client or self._create_client()
+            try:
+                self._ensure_collection()
+                self.available = True
+            except Exception as exc:
+                logger.warning("⚠️ Qdrant unavailable, using in-memory vector store fallback: %s", exc)
+        self._keyword_index = self._shared_keyword_index()
+
+    @classmethod
+    def _create_client(cls, location: Optional[str] = None) -> QdrantClient:
+        location = (config.qdrant_path if location is None else location or "").strip()
+        # A client-level HTTP timeout bounds every request, so a hung server cannot pin a retrieval worker.
+        timeout = cls._request_timeout(config.qdrant_timeout_seconds)
+        if not location:
+            return QdrantClient(
+                host=config.qdrant_host, port=config.qdrant_port, timeout=timeout, check_compatibility=False
+            )
+        if location.startswith(("http://", "https://")):
+            return QdrantClient(url=location, timeout=timeout, check_compatibility=False)
+        host, _, port = location.rpartition(":")
+        if host and port.isdigit():
+            return QdrantClient(host=host, port=int(port), timeout=timeout, check_compatibility=False)
+        # Embedded storage can only be opened by one client per process (and ":memory:" is per client).
+        with cls._embedded_clients_lock:
+            client = cls._embedded_clients.get(location)
+            if client is None:
+                if location == ":memory:":
+                    client = QdrantClient(location=":memory:")
+                else:
+                    Path(location).mkdir(parents=True, exist_ok=True)
+                    client = QdrantClient(path=location)
+                cls._embedded_clients[location] = client
+                logger.info("📦 Using embedded Qdrant at %s", location)
+            return client
 
     def _is_available(self) -> bool:
         return bool(getattr(self, "available", True))
 
-    def _memory_bucket(self) -> List[Dict[str, Any]]:
-        bucket = getattr(self, "_memory_points", None)
-        if bucket is None:
-            bucket = []
-            self._memory_points = bucket
-        return bucket
+    def _collection(self) -> str:
+        return getattr(self, "collection_name", None) or config.collection_name
+
+    @staticmethod
+    def _local_path(collection_name: Optional[str] = None) -> str:
+        if not collection_name or collection_name == config.collection_name:
+            return config.local_vector_store_path
+        return str(Path(config.local_vector_store_path) / "collections" / collection_name)
+
+    @classmethod
+    def _create_memory_index(cls, collection_name: Optional[str] = None) -> MemoryVectorIndex:
+        if (config.vector_store_backend or "qdrant").strip().lower() == "local":
+            return MmapVectorIndex(cls._local_path(collection_name))
+        backend = (config.memory_index_backend or "exact").strip().lower()
+        if backend == "ivf":
+            return IVFVectorIndex(
+                nlist=config.memory_index_ivf_nlist,
+                nprobe=config.memory_index_ivf_nprobe,
+                min_train_points=config.memory_index_ivf_min_points,
+            )
+        return MemoryVectorIndex()
+
+    @classmethod
+    def _shared_memory_index(cls, collection_name: Optional[str] = None) -> MemoryVectorIndex:
+        key = "{}:{}:{}".format(config.vector_store_backend, cls._local_path(collection_name), config.memory_index_backend)
+        if collection_name and collection_name != config.collection_name:
+            key = f"{key}:{collection_name}"
+        index = cls._shared_memory_indexes.get(key)
+        if index is None:
+            index = cls._create_memory_index(collection_name)
+            cls._shared_memory_indexes[key] = index
+        return index
+
+    @classmethod
+    def _create_document_index(cls, collection_name: Optional[str] = None) -> MemoryVectorIndex:
+        if (config.vector_store_backend or "qdrant").strip().lower() == "local":
+            return MmapVectorIndex(str(Path(cls._local_path(collection_name)) / "documents"))
+        return MemoryVectorIndex()
+
+    @classmethod
+    def _shared_document_index(cls, collection_name: Optional[str] = None) -> MemoryVectorIndex:
+        key = "documents:{}:{}".format(config.vector_store_backend, cls._local_path(collection_name))
+        if collection_name and collection_name != config.collection_name:
+            key = f"{key}:{collection_name}"
+        index = cls._shared_memory_indexes.get(key)
+        if index is None:
+            index = cls._create_document_index(collection_name)
+            cls._shared_memory_indexes[key] = index
+        return index
+
+    def _document_index(self) -> MemoryVectorIndex:
+        index = getattr(self, "_document_memory_index", None)
+        if index is None:
+            index = self._create_document_index(self._collection())
+            self._document_memory_index = index
+        return index
+
+    def _memory_store(self) -> MemoryVectorIndex:
+        index = getattr(self, "_memory_index", None)
+        if index is None:
+            index = self._create_memory_index(self._collection())
+            self._memory_index = index
+        return index
+
+    def _keyword_index_path(self) -> Optional[str]:
+        if self.backend == "local":
+            return str(Path(self._local_path(self._collection())) / "keyword_index.json.gz")
+        if self.available and config.keyword_index_path:
+            if self._collection() == config.collection_name:
+                return config.keyword_index_path
+            path = Path(config.keyword_index_path)
+            return str(path.with_name(f"{self._collection()}.{path.name}"))
+        return None
+
+    def _keyword_backend(self) -> str:
+        backend = (config.keyword_index_backend or "auto").strip().lower()
+        if backend == "auto":
+            # A reachable Qdrant already has the full-text index and sparse vectors for the keyword leg.
+            return "qdrant_text" if self.available else "bm25"
+        return backend
+
+    def _shared_keyword_index(self) -> Optional[BM25Index]:
+        if self._keyword_backend() != "bm25":
+            return None
+        path = self._keyword_index_path()
+        key = "{}:{}:{}".format(self.backend, path, self._collection())
+        index = self._shared_keyword_indexes.get(key)
+        if index is None:
+            index = BM25Index(path, k1=config.bm25_k1, b=config.bm25_b)
+            self._shared_keyword_indexes[key] = index
+            self._keyword_index = index
+            self._sync_keyword_index()
+        return index
+
+    def _sync_keyword_index(self) -> None:
+        index = getattr(self, "_keyword_index", None)
+        if index is None:
+            return
+        if self._is_available():
+            try:
+                expected = int(self.client.count(collection_name=self._collection(), exact=True).count)
+            except Exception:
+                return
+        else:
+            expected = len(self._memory_store())
+        tag = self._keyword_index_tag()
+        if expected != len(index) or (index.path is not None and index.tag != tag):
+            self.rebuild_keyword_index()
+
+    def _keyword_index_tag(self) -> str:
+        # The physical collection behind the alias, so a reindex alias swap invalidates the snapshot.
+        collection = self._collection()
+        if self._is_available() and hasattr(self.client, "get_aliases"):
+            try:
+                for alias in getattr(self.client.get_aliases(), "aliases", None) or []:
+                    if getattr(alias, "alias_name", None) == collection:
+                        return str(alias.collection_name)
+            except Exception as exc:
+                logger.warning("⚠️ Could not resolve collection alias %s: %s", collection, exc)
+        return collection
+
+    def _refresh_keyword_index(self) -> None:
+        index = getattr(self, "_keyword_index", None)
+        if index is None or index.path is None:
+            return
+        now = time.monotonic()
+        if now - index.refreshed_at < max(float(config.keyword_index_refresh_seconds), 0.0):
+            return
+        index.refreshed_at = now
+        index.refresh()
+        tag = self._keyword_index_tag()
+        if index.tag != tag:
+            logger.info("🔎 Keyword index was built for %s, collection is now %s; rebuilding", index.tag, tag)
+            self.rebuild_keyword_index()
+
+    def rebuild_keyword_index(self) -> int:
+        index = getattr(self, "_keyword_index", None)
+        if index is None:
+            return 0
+        index.clear()
+        index.tag = self._keyword_index_tag()
+        for page in self.iter_point_pages(fields=["source_file", "chunk_text"], batch_size=1000):
+            index.add_documents(
+                (str(row["id"]), str(row["payload"].get("chunk_text", "")), row["payload"].get("source_file"))
+                for row in page
+            )
+        index.save()
+        logger.info("🔎 Rebuilt keyword index: %s chunks", len(index))
+        return len(index)
+
+    def _index_keywords(self, points: List[models.PointStruct], save: bool = True) -> None:
+        index = getattr(self, "_keyword_index", None)
+        if index is None:
+            return
+        index.add_documents(
+            (str(point.id), str(point.payload.get("chunk_text", "")), point.payload.get("source_file"))
+            for point in points
+        )
+        if save:
+            index.save()
+
+    def _save_keyword_index(self) -> None:
+        index = getattr(self, "_keyword_index", None)
+        if index is not None:
+            index.save()
+
+    def _unindex_keywords(
+        self, point_ids: Optional[Iterable[str]] = None, filename: Optional[str] = None, save: bool = True
+    ) -> None:
+        index = getattr(self, "_keyword_index", None)
+        if index is None:
+            return
+        removed = index.remove_file(filename) if point_ids is None else index.remove_documents(point_ids)
+        if removed and save:
+            index.save()
+
+    @classmethod
+    def _retrieval_executor(cls) -> ThreadPoolExecutor:
+        with cls._search_executor_lock:
+            if cls._search_executor is None:
+                cls._search_executor = ThreadPoolExecutor(
+                    max_workers=max(int(config.hybrid_search_workers), 2),
+                    thread_name_prefix="nexusai-retrieval",
+                )
+            return cls._search_executor
+
+    def _write_coalescer(self) -> Optional[WriteCoalescer]:
+        if not config.qdrant_write_coalescing or not self._is_available():
+            return None
+        with self._write_coalescers_lock:
+            coalescer = self._write_coalescers.get(self._collection())
+            if coalescer is None:
+                client = self.client
+                collection_name = self._collection()
+                coalescer = WriteCoalescer(
+                    lambda operations: client.batch_update_points(
+                        collection_name=collection_name,
+                        update_operations=operations,
+                        wait=True,
+                    ),
+                    max_points=config.qdrant_write_coalesce_max_points,
+                    max_delay_seconds=config.qdrant_write_coalesce_max_delay_ms / 1000.0,
+                )
+                self._write_coalescers[collection_name] = coalescer
+            return coalescer
+
+    @staticmethod
+    def _request_timeout(seconds: float) -> Optional[int]:
+        # Qdrant takes whole seconds; round up so a short budget never becomes "no timeout".
+        return max(int(math.ceil(float(seconds))), 1) if seconds and float(seconds) > 0 else None
+
+    def _leg_request_timeout(self) -> Optional[int]:
+        return self._request_timeout(config.hybrid_leg_timeout_seconds)
+
+    @staticmethod
+    def _leg_finished(future: Future) -> None:
+        with VectorStore._abandoned_legs_lock:
+            VectorStore._abandoned_legs -= 1
+
+    def _gather_legs(self, legs: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        timeout = float(config.hybrid_leg_timeout_seconds) or None
+        executor = self._retrieval_executor()
+        futures = {executor.submit(leg): name for name, leg in legs.items()}
+        done, pending = wait(futures, timeout=timeout)
+        for future in pending:
+            # cancel() only stops legs that have not started; running ones are bounded by the request timeouts.
+            if not future.cancel():
+                with VectorStore._abandoned_legs_lock:
+                    VectorStore._abandoned_legs += 1
+                future.add_done_callback(VectorStore._leg_finished)
+            logger.warning(
+                "⚠️ Retrieval leg '%s' exceeded %ss; continuing without it (%s abandoned legs still running)",
+                futures[future],
+                timeout,
+                VectorStore._abandoned_legs,
+            )
+        results: Dict[str, Any] = {}
+        errors: List[Exception] = []
+        failed = [f"{futures[future]} (timed out)" for future in pending]
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exc:
+                errors.append(exc)
+                failed.append(f"{futures[future]} ({exc})")
+                logger.warning("⚠️ Retrieval leg '%s' failed; continuing without it: %s", futures[future], exc)
+        if failed and not results:
+            # An empty result here would be indistinguishable from "no documents match".
+            raise RetrievalUnavailableError(f"every retrieval leg failed: {', '.join(failed)}") from (
+                errors[0] if errors else None
+            )
+        return results
 
     def _ensure_collection(self):
         try:
-            collection_info = self.client.get_collection(config.collection_name)
+            collection_info = self.client.get_collection(self._collection())
             current_dim = collection_info.config.params.vectors.size
             if current_dim != config.vector_dimension:
-                print(
-                    f"⚠️ Vector dimension mismatch: {current_dim} vs {config.vector_dimension}. Recreating collection..."
+                logger.warning(
+                    "⚠️ Vector dimension mismatch: %s vs %s. Recreating collection...", current_dim, config.vector_dimension
                 )
-                self.client.delete_collection(config.collection_name)
+                self.client.delete_collection(self._collection())
                 self._create_collection()
                 return
         except Exception:
             self._create_collection()
             return
 
+        sparse_vectors = getattr(collection_info.config.params, "sparse_vectors", None) or {}
+        self.supports_sparse_vectors = SPARSE_VECTOR_NAME in sparse_vectors
+        if config.sparse_vectors_enabled and not self.supports_sparse_vectors:
+            logger.info("ℹ️ Collection has no sparse lexical vectors; run the reindex script to enable server-side hybrid search")
         self._ensure_payload_indexes()
 
     def _create_collection(self, collection_name: Optional[str] = None):
-        name = collection_name or config.collection_name
+        name = collection_name or self._collection()
+        # The cold tier keeps full vectors and payloads on disk; only the quantized copy stays in RAM.
+        cold = bool(getattr(self, "cold_storage", False))
+        sparse_vectors_config = None
+        if config.sparse_vectors_enabled:
+            sparse_vectors_config = {
+                SPARSE_VECTOR_NAME: models.SparseVectorParams(
+                    index=models.SparseIndexParams(on_disk=config.qdrant_on_disk_vectors or cold),
+                    modifier=models.Modifier.IDF,
+                )
+            }
         self.client.create_collection(
             collection_name=name,
             vectors_config=models.VectorParams(
                 size=config.vector_dimension,
                 distance=models.Distance.COSINE,
+                on_disk=config.qdrant_on_disk_vectors or cold,
             ),
+            sparse_vectors_config=sparse_vectors_config,
+            hnsw_config=models.HnswConfigDiff(m=config.qdrant_hnsw_m, ef_construct=config.qdrant_hnsw_ef_construct),
+            quantization_config=self._quantization_config(self._quantization_mode()),
+            on_disk_payload=config.qdrant_on_disk_payload or cold,
         )
+        self.supports_sparse_vectors = sparse_vectors_config is not None
         self._ensure_payload_indexes(collection_name=name)
 
+    def _quantization_mode(self) -> str:
+        if getattr(self, "cold_storage", False):
+            return (config.tiering_cold_quantization or "none").strip().lower()
+        return (config.qdrant_quantization or "none").strip().lower()
+
+    @staticmethod
+    def _quantization_config(mode: Optional[str] = None) -> Optional[Any]:
+        mode = (mode or config.qdrant_quantization or "none").strip().lower()
+        if mode == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=config.qdrant_quantization_quantile,
+                    always_ram=config.qdrant_quantization_always_ram,
+                )
+            )
+        if mode == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=config.qdrant_quantization_always_ram)
+            )
+        return None
+
+    @staticmethod
+    def _search_params(hnsw_ef: Optional[int] = None, quantization_mode: Optional[str] = None) -> Optional[models.SearchParams]:
+        hnsw_ef = int(hnsw_ef if hnsw_ef is not None else config.qdrant_hnsw_ef) or None
+        quantization = None
+        if (quantization_mode or config.qdrant_quantization or "none").strip().lower() in ("scalar", "binary"):
+            quantization = models.QuantizationSearchParams(
+                rescore=config.qdrant_quantization_rescore,
+                oversampling=config.qdrant_quantization_oversampling,
+            )
+        if hnsw_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
     def _ensure_payload_indexes(self, collection_name: Optional[str] = None):
-        name = collection_name or config.collection_name
-        for field_name in ("source_file", "parent_id", "version_id", "content_hash", "chunk_hash", "delta_key"):
+        name = collection_name or self._collection()
+        keyword_fields = ("source_file", "parent_id", "chunk_role", "section_type", "version_id", "content_hash", "chunk_hash", "delta_key")
+        field_schemas = [(field_name, models.PayloadSchemaType.KEYWORD) for field_name in keyword_fields]
+        field_schemas.append(("page", models.PayloadSchemaType.INTEGER))
+        for field_name, field_schema in field_schemas:
             try:
                 self.client.create_payload_index(
                     collection_name=name,
                     field_name=field_name,
-                    field_schema=models.PayloadSchemaType.KEYWORD,
+                    field_schema=field_schema,
                     wait=True,
                 )
             except Exception:
@@ -96,6 +493,22 @@ class VectorStore:
         stable_key = payload.get("delta_key") or payload.get("chunk_hash")
         return cls._build_point_id(filename, int(payload.get("chunk_index", 0) or 0), stable_key=stable_key)
 
+    def _point_vector(self, vector: List[float], chunk_text: str, sparse: Optional[bool] = None) -> Any:
+        if sparse is None:
+            sparse = bool(getattr(self, "supports_sparse_vectors", False))
+        if not sparse:
+            return vector
+        indices, values = sparse_document_vector(
+            chunk_text,
+            k1=config.bm25_k1,
+            b=config.bm25_b,
+            avg_length=config.sparse_avg_doc_length,
+        )
+        return {
+            DENSE_VECTOR_NAME: vector,
+            SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values),
+        }
+
     @staticmethod
     def _payload_key(payload: Dict[str, Any], fallback: Any = None) -> str:
         source_file = payload.get("source_file")
@@ -108,110 +521,327 @@ class VectorStore:
         return str(fallback)
 
     @staticmethod
-    def _expand_hit_to_parent(hit: Dict[str, Any]) -> Dict[str, Any]:
-        payload = dict(hit.get("payload", {}) or {})
+    def _parent_key(payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        if payload.get("chunk_role") != "child" or not payload.get("parent_id") or payload.get("source_file") is None:
+            return None
+        if payload.get("parent_text") or payload.get("parent_chunk_text"):
+            return None
+        return str(payload["source_file"]), str(payload["parent_id"])
+
+    def _scroll_parents(self, parent_keys: Set[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        return self._scroll_chunks(
+            with_payload=["source_file", "parent_id", "chunk_role", "chunk_text"],
+            scroll_filter=models.Filter(
+                must=[models.FieldCondition(key="chunk_role", match=models.MatchValue(value="parent"))],
+                should=[
+                    models.Filter(
+                        must=[
+                            models.FieldCondition(key="source_file", match=models.MatchValue(value=source_file)),
+                            models.FieldCondition(key="parent_id", match=models.MatchValue(value=parent_id)),
+                        ]
+                    )
+                    for source_file, parent_id in sorted(parent_keys)
+                ],
+            ),
+        )
+
+    def _fetch_parent_texts(self, parent_keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        parent_keys = set(parent_keys)
+        if not parent_keys:
+            return {}
+        if not self._is_available():
+            index = self._memory_store()
+            point_ids = set()
+            for source_file in {source_file for source_file, _ in parent_keys}:
+                point_ids.update(index.ids_for_file(source_file))
+            rows = list(index.iter_points(ids=point_ids))
+        else:
+            try:
+                rows = self._scroll_parents(parent_keys)
+            except Exception as exc:
+                logger.warning("⚠️ Parent chunk lookup failed, keeping child text: %s", exc)
+                return {}
+        parent_texts: Dict[Tuple[str, str], str] = {}
+        for row in rows:
+            payload = row.get("payload") or {}
+            if payload.get("chunk_role") != "parent":
+                continue
+            key = (str(payload.get("source_file")), str(payload.get("parent_id")))
+            if key in parent_keys:
+                parent_texts[key] = str(payload.get("chunk_text", ""))
+        return parent_texts
+
+    @classmethod
+    def _expand_hit_to_parent(cls, hit: Any, parent_texts: Optional[Dict[Tuple[str, str], str]] = None) -> Hit:
+        hit = Hit.from_value(hit)
+        payload = hit.payload
         parent_text = payload.get("parent_text") or payload.get("parent_chunk_text")
-        if parent_text:
-            payload["chunk_text"] = parent_text
-            payload["chunk_role"] = "parent_context"
-        return {
-            "payload": payload,
-            "score": float(hit.get("score", 0.0)),
-            "vector_score": float(hit.get("vector_score", hit.get("score", 0.0))),
-            "keyword_score": float(hit.get("keyword_score", 0.0)),
-        }
+        if not parent_text and payload.get("chunk_role") == "parent":
+            parent_text = payload.get("chunk_text")
+        if not parent_text and parent_texts:
+            parent_text = parent_texts.get(cls._parent_key(payload))
+        vector_score = hit.score if hit.vector_score is None else hit.vector_score
+        if not parent_text:
+            return hit.replace(vector_score=vector_score, keyword_score=hit.keyword_score or 0.0)
+        # Only rewritten payloads are copied; the rest keep sharing the stored payload.
+        # mappingproxy.copy() goes through the backing dict's fast copy; {**proxy} would not.
+        payload = payload.copy()
+        payload["chunk_text"] = parent_text
+        payload["chunk_role"] = "parent_context"
+        return hit.replace(payload=payload, vector_score=vector_score, keyword_score=hit.keyword_score or 0.0)
 
-    def _dedupe_expanded_hits(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        deduped: Dict[str, Dict[str, Any]] = {}
+    def _dedupe_expanded_hits(self, hits: List[Any]) -> List[Hit]:
+        deduped: Dict[str, Hit] = {}
+        parent_keys = {self._parent_key(hit.get("payload", {}) or {}) for hit in hits}
+        parent_keys.discard(None)
+        parent_texts = self._fetch_parent_texts(parent_keys)
         for hit in hits:
-            expanded = self._expand_hit_to_parent(hit)
-            payload = expanded.get("payload", {}) or {}
-            key = self._payload_key(payload, fallback=id(expanded))
+            expanded = self._expand_hit_to_parent(hit, parent_texts)
+            key = self._payload_key(expanded.payload, fallback=id(expanded))
             previous = deduped.get(key)
-            if previous is None or float(expanded.get("score", 0.0)) > float(previous.get("score", 0.0)):
+            if previous is None or expanded.score > previous.score:
                 deduped[key] = expanded
         ranked = list(deduped.values())
-        ranked.sort(key=lambda item: float(item.get("score", 0.0)), reverse=True)
+        ranked.sort(key=lambda item: item.score, reverse=True)
         return ranked
 
-    def _expand_hits_to_parents(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _expand_hits_to_parents(self, hits: List[Dict[str, Any]]) -> List[Hit]:
         return self._dedupe_expanded_hits(hits)
 
-    def upsert_chunks(self, filename: str, chunks: List[Any], embeddings: List[List[float]]):
+    def _build_point(self, filename: str, index: int, chunk: Any, vector: List[float]) -> models.PointStruct:
+        payload = self._build_payload(filename, index, chunk)
+        if isinstance(vector, np.ndarray):
+            # Matrix rows become Python floats here, one batch at a time, instead of up front.
+            vector = vector.tolist()
+        return models.PointStruct(
+            id=self._point_id_for_payload(filename, payload),
+            vector=self._point_vector(vector, payload["chunk_text"]) if self._is_available() else vector,
+            payload=payload,
+        )
+
+    @staticmethod
+    def _build_payload(filename: str, index: int, chunk: Any) -> Dict[str, Any]:
+        if isinstance(chunk, dict):
+            chunk_text = str(chunk.get("chunk_text", ""))
+            metadata = chunk.get("metadata", {}) or {}
+        else:
+            chunk_text = str(chunk)
+            metadata = {}
+
+        payload = {
+            "source_file": filename,
+            "chunk_text": chunk_text,
+            "chunk_index": index,
+        }
+        if isinstance(chunk, dict) and chunk.get("child_id"):
+            payload["child_id"] = chunk.get("child_id")
+        for key, value in metadata.items():
+            if value is not None:
+                payload[key] = value
+        return payload
+
+    @staticmethod
+    def _point_batches(points: Iterable[models.PointStruct]) -> Iterator[List[models.PointStruct]]:
+        max_points = max(int(config.qdrant_upsert_batch_size), 1)
+        max_bytes = max(int(config.qdrant_upsert_batch_bytes), 1)
+        batch: List[models.PointStruct] = []
+        batch_bytes = 0
+        for point in points:
+            dense = point.vector.get(DENSE_VECTOR_NAME) if isinstance(point.vector, dict) else point.vector
+            point_bytes = 4 * len(dense) + len(str(point.payload))
+            if batch and (len(batch) >= max_points or batch_bytes + point_bytes > max_bytes):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(point)
+            batch_bytes += point_bytes
+        if batch:
+            yield batch
+
+    def _send_batch(
+        self,
+        points: List[models.PointStruct],
+        wait: bool,
+        delete_ids: Optional[List[str]] = None,
+    ) -> float:
+        started = time.perf_counter()
+        if delete_ids:
+            operations: List[Any] = [models.DeleteOperation(delete=models.PointIdsList(points=delete_ids))]
+            if points:
+                operations.append(models.UpsertOperation(upsert=models.PointsList(points=points)))
+            self.client.batch_update_points(
+                collection_name=self._collection(),
+                update_operations=operations,
+                wait=wait,
+            )
+        else:
+            self.client.upsert(collection_name=self._collection(), points=points, wait=wait)
+        elapsed = time.perf_counter() - started
+        # Only acknowledged writes reach the keyword index, so a failed batch leaves it matching Qdrant.
+        self._keyword_batch_written(points, delete_ids)
+        return elapsed
+
+    def _keyword_batch_written(self, points: List[Any], delete_ids: Optional[List[str]] = None) -> None:
+        if delete_ids:
+            self._unindex_keywords(delete_ids, save=False)
+        if points:
+            self._index_keywords(points, save=False)
+
+    def _write_points(
+        self,
+        points: Iterable[models.PointStruct],
+        delete_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        # Every batch but the last is sent with wait=False; the last one waits, and is only
+        # sent once the others are acknowledged, so it doubles as the consistency barrier.
+        parallelism = max(int(config.qdrant_upsert_parallelism), 1)
+        started = time.perf_counter()
+        batch_seconds: List[float] = []
+        point_count = 0
+        held: Optional[List[models.PointStruct]] = None
+        pending_deletes = list(delete_ids or []) or None
+        in_flight: "deque[Future]" = deque()
+        executor = ThreadPoolExecutor(max_workers=parallelism) if parallelism > 1 else None
+        try:
+            for batch in self._point_batches(points):
+                point_count += len(batch)
+                if held is not None:
+                    if executor is None:
+                        batch_seconds.append(self._send_batch(held, False, pending_deletes))
+                    else:
+                        in_flight.append(executor.submit(self._send_batch, held, False, pending_deletes))
+                        if len(in_flight) >= parallelism:
+                            batch_seconds.append(in_flight.popleft().result())
+                    pending_deletes = None
+                held = batch
+            while in_flight:
+                batch_seconds.append(in_flight.popleft().result())
+            if held is not None or pending_deletes:
+                batch_seconds.append(self._send_batch(held or [], True, pending_deletes))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        stats = self._write_stats(point_count, len(delete_ids or []), started, batch_seconds)
+        logger.info(
+            "📥 Wrote %s points (%s deleted) in %s batches, %.3fs (%.0f points/s)",
+            point_count,
+            stats["deleted"],
+            stats["batches"],
+            stats["seconds"],
+            stats["points_per_second"],
+        )
+        return stats
+
+    @staticmethod
+    def _write_stats(point_count: int, deleted: int, started: float, batch_seconds: List[float]) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started
+        return {
+            "points": point_count,
+            "deleted": deleted,
+            "batches": len(batch_seconds),
+            "seconds": round(elapsed, 4),
+            "batch_seconds": [round(seconds, 4) for seconds in batch_seconds],
+            "points_per_second": round(point_count / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def upsert_chunks(
+        self,
+        filename: str,
+        chunks: List[Any],
+        embeddings: List[List[float]],
+        *,
+        delete_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
         if len(chunks) != len(embeddings):
             raise ValueError(
                 f"chunks/embeddings length mismatch: {len(chunks)} chunks vs {len(embeddings)} embeddings"
             )
 
-        points = []
-        for i, (chunk, vector) in enumerate(zip(chunks, embeddings)):
-            if isinstance(chunk, dict):
-                chunk_text = str(chunk.get("chunk_text", ""))
-                metadata = chunk.get("metadata", {}) or {}
-            else:
-                chunk_text = str(chunk)
-                metadata = {}
+        if not chunks and not delete_ids:
+            return self._write_stats(0, 0, time.perf_counter(), [])
+        if isinstance(embeddings, np.ndarray) and not self._is_available():
+            return self._upsert_matrix(filename, chunks, embeddings, delete_ids=delete_ids)
+        points = (
+            self._build_point(filename, index, chunk, vector)
+            for index, (chunk, vector) in enumerate(zip(chunks, embeddings))
+        )
+        return self._upsert_points(points, delete_ids=delete_ids)
 
-            payload = {
-                "source_file": filename,
-                "chunk_text": chunk_text,
-                "chunk_index": i,
-            }
-            if isinstance(chunk, dict) and chunk.get("child_id"):
-                payload["child_id"] = chunk.get("child_id")
-            for key, value in metadata.items():
-                if value is not None:
-                    payload[key] = value
+    def _upsert_matrix(
+        self, filename: str, chunks: List[Any], embeddings: np.ndarray, delete_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        # Local fallback for a float32 matrix: rows go straight into the index without PointStructs.
+        started = time.perf_counter()
+        deleted = self._delete_memory_ids(delete_ids)
+        payloads = [self._build_payload(filename, index, chunk) for index, chunk in enumerate(chunks)]
+        ids = [self._point_id_for_payload(filename, payload) for payload in payloads]
+        if ids:
+            self._memory_store().upsert(ids, embeddings, payloads)
+            self._index_keywords([SimpleNamespace(id=point_id, payload=payload) for point_id, payload in zip(ids, payloads)])
+        self.bump_index_epoch()
+        return self._write_stats(len(ids), deleted, started, [time.perf_counter() - started])
 
-            points.append(
-                models.PointStruct(
-                    id=self._point_id_for_payload(filename, payload),
-                    vector=vector,
-                    payload=payload,
-                )
-            )
-
-        if not points:
-            return
+    def _delete_memory_ids(self, delete_ids: Optional[List[str]]) -> int:
+        if not delete_ids:
+            return 0
+        deleted = self._memory_store().delete(delete_ids)
+        self._unindex_keywords(delete_ids)
+        return deleted
 
-        if not getattr(self, "available", True):
-            self._memory_points = [
-                point for point in getattr(self, "_memory_points", []) if point["payload"].get("source_file") != filename
-            ]
-            self._memory_points.extend(
-                [{"id": point.id, "payload": point.payload, "vector": point.vector} for point in points]
-            )
-            return
+    def _upsert_points(
+        self, points: Iterable[models.PointStruct], delete_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        if not self._is_available():
+            started = time.perf_counter()
+            points = list(points)
+            deleted = self._delete_memory_ids(delete_ids)
+            if points:
+                self._memory_store().upsert(
+                    [point.id for point in points],
+                    [point.vector for point in points],
+                    [point.payload for point in points],
+                )
+                self._index_keywords(points)
+            if points or deleted:
+                self.bump_index_epoch()
+            return self._write_stats(len(points), deleted, started, [time.perf_counter() - started])
 
-        self.client.upsert(collection_name=config.collection_name, points=points, wait=True)
+        try:
+            stats = self._write_points(points, delete_ids=delete_ids)
+        finally:
+            self.bump_index_epoch()
+            self._save_keyword_index()
+        self.last_write_stats = stats
+        return stats
 
     def replace_file_chunks(self, filename: str, chunks: List[Any], embeddings: List[List[float]]):
         self.delete_by_file(filename)
-        self.upsert_chunks(filename, chunks, embeddings)
+        stats = self.upsert_chunks(filename, chunks, embeddings)
+        self._write_document_summary(filename, chunks, embeddings)
+        return stats
 
     def upsert_chunk_points(self, filename: str, chunks: List[Any], embeddings: List[List[float]]):
-        self.upsert_chunks(filename, chunks, embeddings)
+        return self.upsert_chunks(filename, chunks, embeddings)
 
     def delete_chunk_keys(self, filename: str, chunk_keys: List[str]):
         chunk_keys = [str(chunk_key) for chunk_key in chunk_keys if chunk_key]
         if not chunk_keys:
             return
-        if not getattr(self, "available", True):
-            self._memory_points = [
-                point
-                for point in getattr(self, "_memory_points", [])
-                if not (
-                    point["payload"].get("source_file") == filename
-                    and str(point["payload"].get("delta_key") or point["payload"].get("chunk_hash")) in chunk_keys
-                )
-            ]
-            return
         point_ids = [self._build_point_id(filename, stable_key=chunk_key) for chunk_key in chunk_keys]
-        self.client.delete(
-            collection_name=config.collection_name,
-            points_selector=models.PointIdsList(points=point_ids),
-            wait=True,
-        )
+        if not self._is_available():
+            doomed_keys = set(chunk_keys)
+            self._memory_store().delete_where(
+                lambda payload: str(payload.get("delta_key") or payload.get("chunk_hash")) in doomed_keys,
+                source_file=filename,
+            )
+        else:
+            self.client.delete(
+                collection_name=self._collection(),
+                points_selector=models.PointIdsList(points=point_ids),
+                wait=True,
+            )
+        self.bump_index_epoch()
+        self._unindex_keywords(point_ids)
 
     def sync_file_chunks(
         self,
@@ -220,60 +850,477 @@ class VectorStore:
         embeddings: List[List[float]],
         *,
         deleted_chunk_keys: Optional[List[str]] = None,
-    ):
-        if deleted_chunk_keys:
-            self.delete_chunk_keys(filename, deleted_chunk_keys)
-        if chunks:
-            self.upsert_chunk_points(filename, chunks, embeddings)
-
-    def search(self, query_vector: List[float], limit: int = 5, expand_to_parent: bool = False) -> List[Dict[str, Any]]:
-        if not getattr(self, "available", True):
-            hits = [{"payload": point["payload"], "score": 0.5} for point in getattr(self, "_memory_points", [])[:limit]]
+    ) -> Dict[str, Any]:
+        deleted_chunk_keys = [str(chunk_key) for chunk_key in deleted_chunk_keys or [] if chunk_key]
+        with self._file_lock(filename):
+            # A delta only carries changed chunks, so a cold file has to be back in the hot tier first.
+            self._promote_if_cold(filename)
+            if not self._is_available():
+                if deleted_chunk_keys:
+                    self.delete_chunk_keys(filename, deleted_chunk_keys)
+                stats = self.upsert_chunk_points(filename, chunks, embeddings)
+            elif self._write_coalescer() is not None:
+                stats = self.submit_file_chunks(filename, chunks, embeddings, deleted_chunk_keys=deleted_chunk_keys).result()
+            else:
+                delete_ids = [self._build_point_id(filename, stable_key=chunk_key) for chunk_key in deleted_chunk_keys]
+                stats = self.upsert_chunks(filename, chunks, embeddings, delete_ids=delete_ids)
+            # Sync always receives the file's complete chunk list, so its summary can be rebuilt from it.
+            self._write_document_summary(filename, chunks, embeddings)
+            return stats
+
+    def submit_file_chunks(
+        self,
+        filename: str,
+        chunks: List[Any],
+        embeddings: List[List[float]],
+        *,
+        deleted_chunk_keys: Optional[List[str]] = None,
+    ) -> Future:
+        coalescer = self._write_coalescer()
+        if coalescer is None:
+            future: Future = Future()
+            try:
+                future.set_result(
+                    self.sync_file_chunks(filename, chunks, embeddings, deleted_chunk_keys=deleted_chunk_keys)
+                )
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        if len(chunks) != len(embeddings):
+            raise ValueError(
+                f"chunks/embeddings length mismatch: {len(chunks)} chunks vs {len(embeddings)} embeddings"
+            )
+
+        started = time.perf_counter()
+        delete_ids = [
+            self._build_point_id(filename, stable_key=str(chunk_key)) for chunk_key in deleted_chunk_keys or [] if chunk_key
+        ]
+        pending_deletes = delete_ids
+        futures: List[Future] = []
+        point_count = 0
+        points = (
+            self._build_point(filename, index, chunk, vector)
+            for index, (chunk, vector) in enumerate(zip(chunks, embeddings))
+        )
+        for batch in self._point_batches(points):
+            operations: List[Any] = []
+            if pending_deletes:
+                operations.append(models.DeleteOperation(delete=models.PointIdsList(points=pending_deletes)))
+            operations.append(models.UpsertOperation(upsert=models.PointsList(points=batch)))
+            futures.append(coalescer.submit(operations, weight=len(batch) + len(pending_deletes)))
+            futures[-1].add_done_callback(self._keyword_commit_callback(batch, pending_deletes))
+            pending_deletes = []
+            point_count += len(batch)
+        if pending_deletes:
+            futures.append(
+                coalescer.submit(
+                    [models.DeleteOperation(delete=models.PointIdsList(points=pending_deletes))],
+                    weight=len(pending_deletes),
+                )
+            )
+            futures[-1].add_done_callback(self._keyword_commit_callback([], pending_deletes))
+
+        def _result() -> Dict[str, Any]:
+            self.bump_index_epoch()
+            self._save_keyword_index()
+            stats = self._write_stats(
+                point_count,
+                len(delete_ids),
+                started,
+                [float(future.result()["seconds"]) for future in futures],
+            )
+            stats["group_sizes"] = [int(future.result()["group_size"]) for future in futures]
+            self.last_write_stats = stats
+            return stats
+
+        def _failed(future: Future) -> None:
+            # Part of a failed group may still have been applied, so drop cached listings anyway.
+            if future.exception() is not None:
+                self.bump_index_epoch()
+                self._save_keyword_index()
+
+        combined = all_of(futures, _result)
+        combined.add_done_callback(_failed)
+        return combined
+
+    def _keyword_commit_callback(self, points: List[Any], delete_ids: List[str]) -> Callable[[Future], None]:
+        # Registered before all_of, so the index is current by the time the combined future resolves.
+        def _committed(future: Future) -> None:
+            if future.exception() is None:
+                self._keyword_batch_written(points, delete_ids)
+
+        return _committed
+
+    def _document_collection_name(self) -> str:
+        return f"{self._collection()}_documents"
+
+    def _document_sync_key(self) -> str:
+        if not self._is_available():
+            return "memory:{}".format(id(self._document_index()))
+        return "qdrant:{}:{}".format(id(self.client), self._document_collection_name())
+
+    def _ensure_document_collection(self) -> None:
+        if getattr(self, "_document_collection_ready", False):
+            return
+        name = self._document_collection_name()
+        try:
+            info = self.client.get_collection(name)
+            if info.config.params.vectors.size != config.vector_dimension:
+                self.client.delete_collection(name)
+                raise ValueError("document summary dimension changed")
+            sparse_vectors = getattr(info.config.params, "sparse_vectors", None) or {}
+        except Exception:
+            sparse_vectors = None
+            if config.sparse_vectors_enabled:
+                sparse_vectors = {SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)}
+            self.client.create_collection(
+                collection_name=name,
+                vectors_config=models.VectorParams(size=config.vector_dimension, distance=models.Distance.COSINE),
+                sparse_vectors_config=sparse_vectors,
+            )
+            VectorStore._document_summaries_synced.discard(self._document_sync_key())
+        self._document_collection_sparse = SPARSE_VECTOR_NAME in (sparse_vectors or {})
+        self._document_collection_ready = True
+
+    def _document_point_id(self, filename: str) -> str:
+        return self._build_point_id(filename, stable_key="__document__")
+
+    def _upsert_document_summaries(self, summaries: List[Tuple[List[float], Dict[str, Any]]]) -> None:
+        if not summaries:
+            return
+        ids = [self._document_point_id(payload["source_file"]) for _, payload in summaries]
+        if not self._is_available():
+            self._document_index().upsert(ids, [vector for vector, _ in summaries], [payload for _, payload in summaries])
+            return
+        self._ensure_document_collection()
+        points = []
+        for point_id, (vector, payload) in zip(ids, summaries):
+            if self._document_collection_sparse:
+                indices, values = sparse_document_vector(
+                    payload["summary_text"], k1=config.bm25_k1, b=config.bm25_b, avg_length=config.sparse_avg_doc_length
+                )
+                vector = {DENSE_VECTOR_NAME: vector, SPARSE_VECTOR_NAME: models.SparseVector(indices=indices, values=values)}
+            points.append(models.PointStruct(id=point_id, vector=vector, payload=payload))
+        self.client.upsert(collection_name=self._document_collection_name(), points=points, wait=True)
+
+    def _write_document_summary(self, filename: str, chunks: List[Any], embeddings: List[List[float]]) -> None:
+        if not config.document_routing_enabled:
+            return
+        try:
+            summary = summarize_document(filename, chunks, embeddings)
+            if summary is None:
+                self._delete_document_summary(filename)
+            else:
+                self._upsert_document_summaries([summary])
+        except Exception as exc:
+            logger.warning("⚠️ Document summary for %s not written: %s", filename, exc)
+
+    def _delete_document_summary(self, filename: str) -> None:
+        if not config.document_routing_enabled:
+            return
+        point_id = self._document_point_id(filename)
+        try:
+            if not self._is_available():
+                self._document_index().delete([point_id])
+                return
+            self._ensure_document_collection()
+            self.client.delete(
+                collection_name=self._document_collection_name(),
+                points_selector=models.PointIdsList(points=[point_id]),
+                wait=True,
+            )
+        except Exception as exc:
+            logger.warning("⚠️ Document summary for %s not deleted: %s", filename, exc)
+
+    def _document_summary_files(self) -> Set[str]:
+        if not self._is_available():
+            return {
+                str(point["payload"].get("source_file"))
+                for point in self._document_index().iter_points()
+                if point["payload"].get("source_file")
+            }
+        self._ensure_document_collection()
+        files: Set[str] = set()
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self._document_collection_name(),
+                with_payload=["source_file"],
+                with_vectors=False,
+                limit=1000,
+                offset=offset,
+            )
+            files.update(str(record.payload.get("source_file")) for record in records if record.payload)
+            if offset is None:
+                return files
+
+    def rebuild_document_summaries(self) -> int:
+        builders: Dict[str, DocumentSummaryBuilder] = {}
+        pages = self.iter_point_pages(fields=["source_file", "heading_path"], batch_size=1000, with_vectors=True)
+        for page in pages:
+            grouped: Dict[str, Tuple[List[Any], List[Dict[str, Any]]]] = {}
+            for row in page:
+                source_file = row["payload"].get("source_file")
+                if not source_file or row.get("vector") is None:
+                    continue
+                vectors, payloads = grouped.setdefault(source_file, ([], []))
+                vectors.append(row["vector"])
+                payloads.append(row["payload"])
+            for source_file, (vectors, payloads) in grouped.items():
+                builders.setdefault(source_file, DocumentSummaryBuilder(source_file)).add(vectors, payloads)
+        summaries = [summary for summary in (builder.build() for builder in builders.values()) if summary]
+
+        if not self._is_available():
+            index = self._document_index()
+            index.delete([point["id"] for point in index.iter_points()])
+        else:
+            try:
+                self.client.delete_collection(self._document_collection_name())
+            except Exception:
+                pass
+            self._document_collection_ready = False
+        for start in range(0, len(summaries), 256):
+            self._upsert_document_summaries(summaries[start : start + 256])
+        VectorStore._document_summaries_synced.add(self._document_sync_key())
+        logger.info("🧭 Rebuilt document summaries: %s files", len(summaries))
+        return len(summaries)
+
+    def _sync_document_summaries(self) -> None:
+        key = self._document_sync_key()
+        if key in VectorStore._document_summaries_synced:
+            return
+        if self._document_summary_files() != set(self.get_file_counts()):
+            self.rebuild_document_summaries()
+        VectorStore._document_summaries_synced.add(key)
+
+    def route_documents(
+        self,
+        query_text: str,
+        query_vector: List[float],
+        top_n: int,
+        source_files: Optional[List[str]] = None,
+    ) -> List[str]:
+        self._sync_document_summaries()
+        scope = RetrievalFilter(source_files=list(source_files)) if source_files else None
+        if not self._is_available():
+            hits = self._document_index().search(query_vector, limit=top_n, **self._memory_mask(scope))
+        elif getattr(self, "_document_collection_sparse", False) and query_text:
+            hits = self._server_side_hybrid_search(
+                query_text,
+                query_vector,
+                top_n,
+                max(top_n * 2, 20),
+                filters=scope,
+                collection_name=self._document_collection_name(),
+            )
+        else:
+            results = self.client.query_points(
+                collection_name=self._document_collection_name(),
+                query=query_vector,
+                query_filter=scope.to_qdrant() if scope else None,
+                limit=top_n,
+                with_payload=["source_file"],
+                timeout=self._leg_request_timeout(),
+            )
+            hits = [{"payload": point.payload or {}} for point in results.points]
+        return [str(hit["payload"]["source_file"]) for hit in hits if hit["payload"].get("source_file")]
+
+    def _routed_filters(
+        self,
+        query_text: str,
+        query_vector: List[float],
+        filters: Optional[RetrievalFilter],
+        document_routing: Optional[bool],
+    ) -> Optional[RetrievalFilter]:
+        enabled = config.document_routing_enabled if document_routing is None else document_routing
+        top_n = int(config.document_routing_top_n)
+        if not enabled or top_n <= 0:
+            return filters
+        if filters is not None and filters.source_files and len(filters.source_files) <= top_n:
+            return filters
+        if len(self.get_file_counts()) < int(config.document_routing_min_documents):
+            return filters
+        try:
+            documents = self.route_documents(
+                query_text, query_vector, top_n, source_files=filters.source_files if filters else None
+            )
+        except Exception as exc:
+            logger.warning("⚠️ Document routing failed, searching all chunks: %s", exc)
+            return filters
+        if not documents:
+            return filters
+        return replace(filters, source_files=documents) if filters else RetrievalFilter(source_files=documents)
+
+    def search(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        expand_to_parent: bool = False,
+        hnsw_ef: Optional[int] = None,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Dict[str, Any]]:
+        filters = RetrievalFilter.from_value(filters)
+        if not self._is_available():
+            hits = [
+                Hit(hit["payload"], hit["score"], id=hit["id"])
+                for hit in self._memory_store().search(query_vector, limit=limit, **self._memory_mask(filters))
+            ]
             return self._dedupe_expanded_hits(hits) if expand_to_parent else hits
         results = self.client.query_points(
-            collection_name=config.collection_name,
+            collection_name=self._collection(),
             query=query_vector,
+            query_filter=filters.to_qdrant() if filters else None,
             limit=limit,
             with_payload=True,
+            search_params=self._search_params(hnsw_ef, self._quantization_mode()),
+            timeout=self._leg_request_timeout(),
         )
-        hits = [{"payload": hit.payload, "score": hit.score} for hit in results.points]
+        hits = [Hit(hit.payload, hit.score, id=getattr(hit, "id", None)) for hit in results.points]
         if expand_to_parent:
             hits = self._dedupe_expanded_hits(hits)
         return hits
 
-    def _scroll_chunks(
+    def _memory_mask(self, filters: Optional[RetrievalFilter]) -> Dict[str, Any]:
+        if filters is None:
+            return {}
+        mask: Dict[str, Any] = {"source_files": filters.source_files or None}
+        if not filters.only_source_files():
+            condition = filters.to_qdrant()
+            mask["where"] = lambda payload: self._payload_matches(payload, condition)
+        return mask
+
+    @staticmethod
+    def _source_file_filter(filename: str) -> models.Filter:
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="source_file",
+                    match=models.MatchValue(value=filename),
+                )
+            ]
+        )
+
+    @classmethod
+    def _payload_matches(cls, payload: Dict[str, Any], condition: Any) -> bool:
+        if isinstance(condition, models.Filter):
+            must = condition.must or []
+            should = condition.should or []
+            must_not = condition.must_not or []
+            must = must if isinstance(must, list) else [must]
+            should = should if isinstance(should, list) else [should]
+            must_not = must_not if isinstance(must_not, list) else [must_not]
+            return (
+                all(cls._payload_matches(payload, item) for item in must)
+                and (not should or any(cls._payload_matches(payload, item) for item in should))
+                and not any(cls._payload_matches(payload, item) for item in must_not)
+            )
+        if isinstance(condition, models.FieldCondition):
+            value = payload.get(condition.key)
+            values = value if isinstance(value, list) else [value]
+            if condition.range is not None:
+                bounds = condition.range
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    return False
+                return (
+                    (bounds.gte is None or value >= bounds.gte)
+                    and (bounds.gt is None or value > bounds.gt)
+                    and (bounds.lte is None or value <= bounds.lte)
+                    and (bounds.lt is None or value < bounds.lt)
+                )
+            match = condition.match
+            if isinstance(match, models.MatchValue):
+                return match.value in values
+            if isinstance(match, models.MatchAny):
+                return any(item in match.any for item in values)
+            if isinstance(match, models.MatchText):
+                return str(match.text).lower() in str(value or "").lower()
+        raise ValueError(f"unsupported filter condition for the in-memory store: {condition!r}")
+
+    def iter_point_pages(
         self,
-        limit_per_page: int = 256,
-        with_payload: Optional[List[str]] = None,
+        filter: Optional[models.Filter] = None,
+        fields: Optional[List[str]] = None,
+        batch_size: int = 256,
         with_vectors: bool = False,
-    ) -> List[Dict[str, Any]]:
-        if not getattr(self, "available", True):
-            rows = [{"id": point["id"], "payload": point["payload"]} for point in getattr(self, "_memory_points", [])]
-            if with_vectors:
-                for row, point in zip(rows, getattr(self, "_memory_points", [])):
-                    row["vector"] = point.get("vector")
-            return rows
-        points: List[Dict[str, Any]] = []
+    ) -> Iterator[List[Dict[str, Any]]]:
+        batch_size = max(int(batch_size), 1)
+        if not self._is_available():
+            page: List[Dict[str, Any]] = []
+            for point in self._memory_store().iter_points(with_vectors=with_vectors, batch_size=batch_size):
+                payload = point.get("payload") or {}
+                if filter is not None and not self._payload_matches(payload, filter):
+                    continue
+                if fields is not None:
+                    point["payload"] = {key: payload[key] for key in fields if key in payload}
+                page.append(point)
+                if len(page) >= batch_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+            return
+
         offset = None
         while True:
-            scroll_result = self.client.scroll(
-                collection_name=config.collection_name,
-                with_payload=with_payload or True,
+            page_points, offset = self.client.scroll(
+                collection_name=self._collection(),
+                scroll_filter=filter,
+                with_payload=True if fields is None else (list(fields) or False),
                 with_vectors=with_vectors,
-                limit=limit_per_page,
+                limit=batch_size,
                 offset=offset,
             )
-            page_points, offset = scroll_result
+            page = []
             for point in page_points:
-                row = {"id": point.id, "payload": point.payload}
+                row = {"id": point.id, "payload": point.payload or {}}
                 if with_vectors:
-                    row["vector"] = point.vector
-                points.append(row)
+                    vector = point.vector
+                    row["vector"] = vector.get(DENSE_VECTOR_NAME) if isinstance(vector, dict) else vector
+                page.append(row)
+            if page:
+                yield page
             if offset is None:
                 break
-        return points
+
+    def iter_points(
+        self,
+        filter: Optional[models.Filter] = None,
+        fields: Optional[List[str]] = None,
+        batch_size: int = 256,
+        with_vectors: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        for page in self.iter_point_pages(filter=filter, fields=fields, batch_size=batch_size, with_vectors=with_vectors):
+            yield from page
+
+    def _scroll_chunks(
+        self,
+        limit_per_page: int = 256,
+        with_payload: Optional[List[str]] = None,
+        with_vectors: bool = False,
+        scroll_filter: Optional[models.Filter] = None,
+    ) -> List[Dict[str, Any]]:
+        return list(
+            self.iter_points(
+                filter=scroll_filter,
+                fields=with_payload,
+                batch_size=limit_per_page,
+                with_vectors=with_vectors,
+            )
+        )
 
     def get_file_chunks(self, filename: str, include_vectors: bool = False) -> List[Dict[str, Any]]:
+        rows = self._get_tier_file_chunks(filename, include_vectors)
+        cold = self._cold_store()
+        if not rows and cold is not None:
+            rows = cold.get_file_chunks(filename, include_vectors)
+        return rows
+
+    def _get_tier_file_chunks(self, filename: str, include_vectors: bool = False) -> List[Dict[str, Any]]:
+        if not self._is_available():
+            index = self._memory_store()
+            rows = list(index.iter_points(with_vectors=include_vectors, ids=index.ids_for_file(filename)))
+            rows.sort(key=lambda item: int((item.get("payload") or {}).get("chunk_index", 0)))
+            return rows
         rows = self._scroll_chunks(
             with_payload=[
                 "source_file",
@@ -290,10 +1337,10 @@ class VectorStore:
                 "delta_key",
             ],
             with_vectors=include_vectors,
+            scroll_filter=self._source_file_filter(filename),
         )
-        results = [row for row in rows if str((row.get("payload") or {}).get("source_file", "")) == filename]
-        results.sort(key=lambda item: int((item.get("payload") or {}).get("chunk_index", 0)))
-        return results
+        rows.sort(key=lambda item: int((item.get("payload") or {}).get("chunk_index", 0)))
+        return rows
 
     @staticmethod
     def _tokenize_query(query_text: str) -> List[str]:
@@ -304,41 +1351,124 @@ class VectorStore:
         tokens = [token.strip() for token in coarse if len(token.strip()) >= 2]
         return tokens or [lowered]
 
-    def keyword_search(self, query_text: str, limit: int = 8) -> List[Dict[str, Any]]:
+    def keyword_search(
+        self, query_text: str, limit: int = 8, filters: Optional[RetrievalFilter] = None
+    ) -> List[Dict[str, Any]]:
+        filters = RetrievalFilter.from_value(filters)
         tokens = self._tokenize_query(query_text)
         if not tokens:
             return []
+        if getattr(self, "_keyword_index", None) is not None:
+            return self._keyword_search_with_bm25(query_text, limit, filters=filters)
         if self.supports_text_index:
-            return self._keyword_search_with_index(tokens, limit)
-        return self._keyword_search_by_scrolling(tokens, limit)
+            return self._keyword_search_with_index(tokens, limit, filters=filters)
+        return self._keyword_search_by_scrolling(tokens, limit, filters=filters)
 
-    def _keyword_search_with_index(self, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
-        unique_tokens = list(dict.fromkeys(tokens))[:8]
-        per_token_limit = max(limit * 4, 20)
-        ranked: Dict[str, Dict[str, Any]] = {}
+    def _payloads_for_ids(
+        self, point_ids: List[str], filters: Optional[RetrievalFilter] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        if not point_ids:
+            return {}
+        condition = filters.to_qdrant() if filters else None
+        if not self._is_available():
+            return {
+                str(point["id"]): point.get("payload") or {}
+                for point in self._memory_store().iter_points(ids=point_ids)
+                if condition is None or self._payload_matches(point.get("payload") or {}, condition)
+            }
+        try:
+            if condition is None:
+                records = self.client.retrieve(
+                    collection_name=self._collection(),
+                    ids=point_ids,
+                    with_payload=KEYWORD_PAYLOAD_FIELDS,
+                    with_vectors=False,
+                    timeout=self._leg_request_timeout(),
+                )
+            else:
+                records, _ = self.client.scroll(
+                    collection_name=self._collection(),
+                    scroll_filter=models.Filter(must=[models.HasIdCondition(has_id=point_ids), *condition.must]),
+                    with_payload=KEYWORD_PAYLOAD_FIELDS,
+                    with_vectors=False,
+                    limit=len(point_ids),
+                    timeout=self._leg_request_timeout(),
+                )
+        except Exception as exc:
+            logger.warning("⚠️ Keyword hit payload lookup failed: %s", exc)
+            return {}
+        return {str(record.id): record.payload or {} for record in records}
+
+    def _keyword_search_with_bm25(
+        self, query_text: str, limit: int, filters: Optional[RetrievalFilter] = None
+    ) -> List[Dict[str, Any]]:
+        self._refresh_keyword_index()
+        source_files = (filters.source_files or None) if filters else None
+        payload_filters = filters if filters is not None and not filters.only_source_files() else None
+        # The local index only knows each document's file. Other conditions are checked page by page down the
+        # full ranking until `limit` hits pass, so a selective filter cannot empty the keyword leg.
+        ranked = self._keyword_index.search(
+            query_text, limit=None if payload_filters is not None else limit, source_files=source_files
+        )
+        if not ranked:
+            return []
+        top_score = ranked[0][1] or 1.0
+        results: List[Dict[str, Any]] = []
+        start, page_size = 0, limit if payload_filters is None else max(limit * 4, 50)
+        while start < len(ranked) and len(results) < limit:
+            page = ranked[start : start + page_size]
+            payloads = self._payloads_for_ids([point_id for point_id, _ in page], filters=payload_filters)
+            for point_id, bm25_score in page:
+                payload = payloads.get(point_id)
+                if payload is not None:
+                    results.append(Hit(payload, bm25_score / top_score, id=point_id))
+            start += len(page)
+            page_size *= 2
+        return results[:limit]
+
+    def _uses_token_scrolls(self) -> bool:
+        return getattr(self, "_keyword_index", None) is None and bool(self.supports_text_index)
+
+    def _scroll_token(
+        self, token: str, per_token_limit: int, filters: Optional[RetrievalFilter] = None
+    ) -> List[Any]:
+        condition = filters.to_qdrant() if filters else None
+        page_points, _ = self.client.scroll(
+            collection_name=self._collection(),
+            scroll_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="chunk_text",
+                        match=models.MatchText(text=token),
+                    ),
+                    *(condition.must if condition else []),
+                ]
+            ),
+            with_payload=KEYWORD_PAYLOAD_FIELDS,
+            limit=per_token_limit,
+            timeout=self._leg_request_timeout(),
+        )
+        return page_points
+
+    @staticmethod
+    def _token_legs(tokens: List[str], limit: int) -> Tuple[List[str], int]:
+        return list(dict.fromkeys(tokens))[:8], max(limit * 4, 20)
+
+    def _keyword_search_with_index(
+        self, tokens: List[str], limit: int, filters: Optional[RetrievalFilter] = None
+    ) -> List[Dict[str, Any]]:
+        unique_tokens, per_token_limit = self._token_legs(tokens, limit)
+        token_points = self._gather_legs(
+            {token: partial(self._scroll_token, token, per_token_limit, filters) for token in unique_tokens}
+        )
+        return self._rank_token_matches(unique_tokens, token_points, limit)
 
+    def _rank_token_matches(
+        self, unique_tokens: List[str], token_points: Dict[str, List[Any]], limit: int
+    ) -> List[Dict[str, Any]]:
+        ranked: Dict[str, Dict[str, Any]] = {}
         for token in unique_tokens:
-            page_points, _ = self.client.scroll(
-                collection_name=config.collection_name,
-                scroll_filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="chunk_text",
-                            match=models.MatchText(text=token),
-                        )
-                    ]
-                ),
-                with_payload=[
-                    "source_file",
-                    "chunk_text",
-                    "chunk_index",
-                    "parent_id",
-                    "parent_text",
-                    "children_ids",
-                ],
-                limit=per_token_limit,
-            )
-            for point in page_points:
+            for point in token_points.get(token, ()):
                 payload = point.payload or {}
                 key = self._payload_key(payload, fallback=point.id)
                 entry = ranked.setdefault(
@@ -347,24 +1477,19 @@ class VectorStore:
                 )
                 entry["matched_tokens"].add(token)
 
-        results: List[Dict[str, Any]] = []
         token_count = max(len(unique_tokens), 1)
-        for entry in ranked.values():
-            results.append(
-                {
-                    "id": entry["id"],
-                    "payload": entry["payload"],
-                    "score": len(entry["matched_tokens"]) / token_count,
-                }
-            )
-        results.sort(key=lambda item: item["score"], reverse=True)
+        results = [
+            Hit(entry["payload"], len(entry["matched_tokens"]) / token_count, id=entry["id"]) for entry in ranked.values()
+        ]
+        results.sort(key=lambda item: item.score, reverse=True)
         return results[:limit]
 
-    def _keyword_search_by_scrolling(self, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
-        ranked: List[Dict[str, Any]] = []
-        for point in self._scroll_chunks(
-            with_payload=["source_file", "chunk_text", "chunk_index", "parent_id", "parent_text", "children_ids"]
-        ):
+    def _keyword_search_by_scrolling(
+        self, tokens: List[str], limit: int, filters: Optional[RetrievalFilter] = None
+    ) -> List[Dict[str, Any]]:
+        heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        points = self.iter_points(filter=filters.to_qdrant() if filters else None, fields=KEYWORD_PAYLOAD_FIELDS)
+        for position, point in enumerate(points):
             payload = point.get("payload", {}) or {}
             chunk_text = str(payload.get("chunk_text", "")).lower()
             if not chunk_text:
@@ -373,8 +1498,88 @@ class VectorStore:
             if matched <= 0:
                 continue
             keyword_score = matched / max(len(tokens), 1)
-            ranked.append({"id": point.get("id"), "payload": payload, "score": keyword_score})
-        ranked.sort(key=lambda item: item["score"], reverse=True)
+            entry = (keyword_score, -position, Hit(payload, keyword_score, id=point.get("id")))
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        return [entry[2] for entry in sorted(heap, key=lambda item: item[:2], reverse=True)]
+
+    def _uses_server_side_hybrid(self) -> bool:
+        return (
+            self._is_available()
+            and bool(getattr(self, "supports_sparse_vectors", False))
+            and (config.hybrid_search_backend or "qdrant").strip().lower() == "qdrant"
+        )
+
+    def _server_side_hybrid_search(
+        self,
+        query_text: str,
+        query_vector: List[float],
+        limit: int,
+        prefetch_limit: int,
+        hnsw_ef: Optional[int] = None,
+        filters: Optional[RetrievalFilter] = None,
+        collection_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        condition = filters.to_qdrant() if filters else None
+        prefetch = [
+            models.Prefetch(
+                query=query_vector,
+                filter=condition,
+                limit=prefetch_limit,
+                params=self._search_params(hnsw_ef, self._quantization_mode()),
+            )
+        ]
+        indices, values = sparse_query_vector(query_text)
+        if indices:
+            prefetch.append(
+                models.Prefetch(
+                    query=models.SparseVector(indices=indices, values=values),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=condition,
+                    limit=prefetch_limit,
+                )
+            )
+        fusion = models.Fusion.RRF if (config.hybrid_fusion or "dbsf").strip().lower() == "rrf" else models.Fusion.DBSF
+        results = self.client.query_points(
+            collection_name=collection_name or self._collection(),
+            prefetch=prefetch,
+            query=models.FusionQuery(fusion=fusion),
+            limit=limit,
+            with_payload=True,
+            timeout=self._leg_request_timeout(),
+        )
+        points = list(results.points)
+        if not points:
+            return []
+        # DBSF sums one [0, 1]-normalized score per leg; RRF scores are rank-based, so scale by the best hit.
+        scale = float(len(prefetch)) if fusion == models.Fusion.DBSF else float(points[0].score or 1.0)
+        return [
+            Hit(point.payload, min(1.0, max(0.0, float(point.score) / scale)), id=getattr(point, "id", None))
+            for point in points
+        ]
+
+    @classmethod
+    def _blend_legs(cls, vector_hits: List[Any], keyword_hits: List[Any], alpha: float, limit: int) -> List[Hit]:
+        # Leg results are fresh per call, so they are re-scored in place rather than copied.
+        merged: Dict[str, Hit] = {}
+        for hit in map(Hit.from_value, vector_hits):
+            hit.vector_score = (hit.score + 1.0) / 2.0
+            hit.keyword_score = 0.0
+            merged[cls._payload_key(hit.payload)] = hit
+
+        for hit in map(Hit.from_value, keyword_hits):
+            key = cls._payload_key(hit.payload, fallback=hit.id)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = hit.replace(vector_score=0.0, keyword_score=0.0)
+            entry.keyword_score = max(entry.keyword_score, hit.score)
+
+        ranked = list(merged.values())
+        for entry in ranked:
+            entry.score = alpha * entry.vector_score + (1.0 - alpha) * entry.keyword_score
+        ranked.sort(key=lambda item: item.score, reverse=True)
         return ranked[:limit]
 
     def hybrid_search(
@@ -384,109 +1589,223 @@ class VectorStore:
         limit: int = 8,
         alpha: float = 0.7,
         expand_to_parent: bool = False,
+        hnsw_ef: Optional[int] = None,
+        filters: Optional[RetrievalFilter] = None,
+        document_routing: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        search = partial(
+            self._hybrid_search_tier,
+            query_text,
+            query_vector,
+            limit=limit,
+            alpha=alpha,
+            expand_to_parent=expand_to_parent,
+            hnsw_ef=hnsw_ef,
+            filters=filters,
+            document_routing=document_routing,
+        )
+        hits = search()
+        cold = self._cold_store()
+        if cold is None:
+            return hits
+        best = max((float(hit.get("score", 0.0)) for hit in hits), default=0.0)
+        if len(hits) >= limit and best >= float(config.tiering_cold_min_score):
+            return hits
+        cold_hits = [hit.replace(tier="cold") for hit in cold._hybrid_search_tier(*search.args, **search.keywords)]
+        merged = hits + cold_hits
+        merged.sort(key=lambda item: item.score, reverse=True)
+        return merged[:limit]
+
+    def _hybrid_search_tier(
+        self,
+        query_text: str,
+        query_vector: List[float],
+        limit: int = 8,
+        alpha: float = 0.7,
+        expand_to_parent: bool = False,
+        hnsw_ef: Optional[int] = None,
+        filters: Optional[RetrievalFilter] = None,
+        document_routing: Optional[bool] = None,
     ) -> List[Dict[str, Any]]:
         alpha = min(1.0, max(0.0, alpha))
         expanded_limit = max(limit * 3, 20)
+        filters = self._routed_filters(query_text, query_vector, RetrievalFilter.from_value(filters), document_routing)
 
-        vector_hits = self.search(query_vector, limit=expanded_limit, expand_to_parent=False)
-        keyword_hits = self.keyword_search(query_text, limit=expanded_limit)
+        if self._uses_server_side_hybrid():
+            ranked = self._server_side_hybrid_search(
+                query_text, query_vector, limit, expanded_limit, hnsw_ef=hnsw_ef, filters=filters
+            )
+            if expand_to_parent:
+                ranked = self._dedupe_expanded_hits(ranked)
+            return ranked
 
-        merged: Dict[str, Dict[str, Any]] = {}
+        legs: Dict[str, Callable[[], Any]] = {
+            "dense": partial(
+                self.search, query_vector, limit=expanded_limit, expand_to_parent=False, hnsw_ef=hnsw_ef, filters=filters
+            )
+        }
+        tokens = self._tokenize_query(query_text)
+        unique_tokens: List[str] = []
+        if tokens and self._uses_token_scrolls():
+            unique_tokens, per_token_limit = self._token_legs(tokens, expanded_limit)
+            for token in unique_tokens:
+                legs[f"keyword:{token}"] = partial(self._scroll_token, token, per_token_limit, filters)
+        elif tokens:
+            legs["keyword"] = partial(self.keyword_search, query_text, limit=expanded_limit, filters=filters)
+        leg_results = self._gather_legs(legs)
 
-        for hit in vector_hits:
-            payload = hit.get("payload", {}) or {}
-            key = self._payload_key(payload)
-            vector_score_raw = float(hit.get("score", 0.0))
-            vector_score_norm = (vector_score_raw + 1.0) / 2.0
-            merged[key] = {
-                "payload": payload,
-                "vector_score": vector_score_norm,
-                "keyword_score": 0.0,
+        vector_hits = leg_results.get("dense", [])
+        if unique_tokens:
+            token_points = {
+                token: leg_results[f"keyword:{token}"] for token in unique_tokens if f"keyword:{token}" in leg_results
             }
+            keyword_hits = self._rank_token_matches(unique_tokens, token_points, expanded_limit)
+        else:
+            keyword_hits = leg_results.get("keyword", [])
 
-        for hit in keyword_hits:
-            payload = hit.get("payload", {}) or {}
-            key = self._payload_key(payload, fallback=hit.get("id"))
-            entry = merged.setdefault(
-                key,
-                {"payload": payload, "vector_score": 0.0, "keyword_score": 0.0},
-            )
-            entry["keyword_score"] = max(entry["keyword_score"], float(hit.get("score", 0.0)))
-
-        ranked: List[Dict[str, Any]] = []
-        for entry in merged.values():
-            blended = alpha * entry["vector_score"] + (1.0 - alpha) * entry["keyword_score"]
-            ranked.append(
-                {
-                    "payload": entry["payload"],
-                    "score": blended,
-                    "vector_score": entry["vector_score"],
-                    "keyword_score": entry["keyword_score"],
-                }
-            )
-        ranked.sort(key=lambda item: item["score"], reverse=True)
-        ranked = ranked[:limit]
+        ranked = self._blend_legs(vector_hits, keyword_hits, alpha, limit)
         if expand_to_parent:
             ranked = self._dedupe_expanded_hits(ranked)
         return ranked
 
     def delete_by_file(self, filename: str):
-        if not getattr(self, "available", True):
-            self._memory_points = [
-                point for point in getattr(self, "_memory_points", []) if point["payload"].get("source_file") != filename
-            ]
-            return
-        self.client.delete(
-            collection_name=config.collection_name,
-            points_selector=models.FilterSelector(
-                filter=models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="source_file",
-                            match=models.MatchValue(value=filename),
-                        )
-                    ]
+        with self._file_lock(filename):
+            self._delete_tier_file(filename)
+            cold = self._cold_store()
+            if cold is not None:
+                cold._delete_tier_file(filename)
+
+    def _file_lock(self, filename: str) -> threading.RLock:
+        # Hot and cold tiers share one lock per file, so a tier move never interleaves with a sync or delete.
+        collection = self._collection()
+        if getattr(self, "cold_storage", False) and collection.endswith("_cold"):
+            collection = collection[: -len("_cold")]
+        with VectorStore._file_locks_lock:
+            return VectorStore._file_locks.setdefault((collection, filename), threading.RLock())
+
+    def _cold_store(self) -> Optional["VectorStore"]:
+        if not config.tiering_enabled or getattr(self, "cold_storage", False):
+            return None
+        cold = getattr(self, "_cold_tier", None)
+        if cold is None:
+            client = getattr(self, "client", None) if getattr(self, "backend", "qdrant") == "qdrant" else None
+            cold = VectorStore(client=client, collection_name=f"{self._collection()}_cold", cold_storage=True)
+            self._cold_tier = cold
+        return cold
+
+    def move_file_to(self, target: "VectorStore", filename: str) -> int:
+        with self._file_lock(filename):
+            if not self._is_available():
+                index = self._memory_store()
+                rows = list(index.iter_points(with_vectors=True, ids=index.ids_for_file(filename)))
+            else:
+                rows = list(self.iter_points(filter=self._source_file_filter(filename), batch_size=1000, with_vectors=True))
+            if not rows:
+                return 0
+            vectors = [row["vector"] for row in rows]
+            points = [
+                models.PointStruct(
+                    id=row["id"],
+                    vector=(
+                        target._point_vector(row["vector"], str(row["payload"].get("chunk_text", "")))
+                        if target._is_available()
+                        else row["vector"]
+                    ),
+                    payload=row["payload"],
                 )
-            ),
-            wait=True,
-        )
+                for row in rows
+            ]
+            # Write before deleting so a failed move leaves the file searchable in its old tier.
+            target._upsert_points(points)
+            target._write_document_summary(filename, [{"metadata": row["payload"]} for row in rows], vectors)
+            self._delete_tier_file(filename)
+            return len(points)
 
-    def get_all_files(self) -> List[str]:
-        if not getattr(self, "available", True):
-            return sorted(
-                {
-                    str(point["payload"].get("source_file"))
-                    for point in getattr(self, "_memory_points", [])
-                    if point["payload"].get("source_file")
-                }
+    def _promote_if_cold(self, filename: str) -> int:
+        cold = self._cold_store()
+        if cold is None:
+            return 0
+        moved = cold.move_file_to(self, filename)
+        if moved:
+            logger.info("🔥 Promoted %s (%s chunks) back to the hot tier before writing", filename, moved)
+        return moved
+
+    def _delete_tier_file(self, filename: str) -> None:
+        if not self._is_available():
+            self._memory_store().delete_file(filename)
+        else:
+            self.client.delete(
+                collection_name=self._collection(),
+                points_selector=models.FilterSelector(filter=self._source_file_filter(filename)),
+                wait=True,
             )
+        self.bump_index_epoch()
+        self._unindex_keywords(filename=filename)
+        self._delete_document_summary(filename)
+
+    @classmethod
+    def index_epoch(cls) -> int:
+        return VectorStore._index_epoch
+
+    def index_etag(self) -> str:
+        # The epoch only sees this process's writes. scripts/reindex.py swaps the alias and rewrites every
+        # file from another process, so the tag also covers the physical collection and its point count.
+        return f"{VectorStore._index_epoch_token}-{VectorStore._index_epoch}-{self._storage_signature()}"
+
+    def _storage_signature(self) -> str:
+        if not self._is_available():
+            return str(len(self._memory_store()))
+        try:
+            count = int(self.client.count(collection_name=self._collection(), exact=True).count)
+        except Exception as exc:
+            logger.warning("⚠️ Could not count collection %s: %s", self._collection(), exc)
+            count = -1
+        return f"{self._keyword_index_tag()}-{count}"
+
+    @classmethod
+    def bump_index_epoch(cls) -> int:
+        with VectorStore._index_epoch_lock:
+            VectorStore._index_epoch += 1
+            return VectorStore._index_epoch
+
+    def _scan_file_counts(self) -> Dict[str, int]:
+        if not self._is_available():
+            return {source_file: count for source_file, count in self._memory_store().file_counts().items() if source_file}
         try:
             response = self.client.facet(
-                collection_name=config.collection_name,
+                collection_name=self._collection(),
                 key="source_file",
                 limit=10_000,
                 exact=True,
             )
-            return sorted(
-                str(hit.value)
+            return {
+                str(hit.value): int(getattr(hit, "count", 0) or 0)
                 for hit in response.hits
                 if hit.value and int(getattr(hit, "count", 0) or 0) > 0
-            )
+            }
         except Exception:
             pass
 
-        files = set()
-        offset = None
-        while True:
-            scroll_result = self.client.scroll(
-                collection_name=config.collection_name,
-                with_payload=["source_file"],
-                limit=100,
-                offset=offset,
-            )
-            for point in scroll_result[0]:
-                files.add(point.payload["source_file"])
-            offset = scroll_result[1]
-            if offset is None:
-                break
-        return sorted(files)
+        counts: Dict[str, int] = {}
+        for point in self.iter_points(fields=["source_file"], batch_size=1000):
+            source_file = point["payload"].get("source_file")
+            if source_file:
+                counts[source_file] = counts.get(source_file, 0) + 1
+        return counts
+
+    def get_file_counts(self, etag: Optional[str] = None) -> Dict[str, int]:
+        # Take the tag before scanning so a write that lands mid-scan invalidates this snapshot.
+        etag = etag or self.index_etag()
+        cached = getattr(self, "_file_counts_cache", None)
+        if cached is not None and cached[0] == etag:
+            return dict(cached[1])
+        counts = self._scan_file_counts()
+        cold = self._cold_store()
+        if cold is not None:
+            for source_file, count in cold._scan_file_counts().items():
+                counts[source_file] = counts.get(source_file, 0) + count
+        self._file_counts_cache = (etag, counts)
+        return dict(counts)
+
+    def get_all_files(self) -> List[str]:
+        return sorted(self.get_file_counts())
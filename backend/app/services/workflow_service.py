@@ -287,7 +287,7 @@ class WorkflowService:
 
         try:
             self._ensure_retrieval_clients()
-            query_vector = self.embedding_service.get_embeddings([query_text])[0]  # type: ignore
+            query_vector = self.embedding_service.embed_query(query_text)  # type: ignore
             hits = self.vector_store.hybrid_search(  # type: ignore
                 query_text=query_text,
                 query_vector=query_vector,
@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from .gather_loop import GatherLoop, GatheredItem
+
+logger = logging.getLogger("nexusai.write_coalescer")
+
+
+def all_of(futures: List[Future], result: Callable[[], Any]) -> Future:
+    combined: Future = Future()
+    if not futures:
+        combined.set_result(result())
+        return combined
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def _done(future: Future) -> None:
+        exc = future.exception()
+        with lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+            if combined.done():
+                return
+            if exc is not None:
+                combined.set_exception(exc)
+            elif finished:
+                combined.set_result(result())
+
+    for future in futures:
+        future.add_done_callback(_done)
+    return combined
+
+
+class WriteCoalescer(GatherLoop):
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], None],
+        *,
+        max_points: int = 1024,
+        max_delay_seconds: float = 0.02,
+        name: str = "nexusai-write-coalescer",
+    ):
+        self._flush = flush
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, float] = {"commits": 0, "requests": 0, "points": 0, "seconds": 0.0}
+        super().__init__(max_weight=max_points, max_delay_seconds=max_delay_seconds, name=name)
+
+    def submit(self, operations: List[Any], weight: int = 1) -> Future:
+        return self._enqueue(operations, weight)
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["seconds"] = round(stats["seconds"], 4)
+        stats["requests_per_commit"] = round(stats["requests"] / stats["commits"], 2) if stats["commits"] else 0.0
+        return stats
+
+    def _process_group(self, group: List[GatheredItem], weight: int) -> None:
+        operations = [operation for group_operations, _, _ in group for operation in group_operations]
+        started = time.perf_counter()
+        try:
+            self._flush(operations)
+        except Exception as exc:
+            logger.warning("⚠️ Group commit of %s writes failed: %s", len(group), exc)
+            for _, _, future in group:
+                future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._stats["commits"] += 1
+            self._stats["requests"] += len(group)
+            self._stats["points"] += weight
+            self._stats["seconds"] += elapsed
+        for _, _, future in group:
+            future.set_result({"group_size": len(group), "group_weight": weight, "seconds": elapsed})
@@ -1,16 +1,46 @@
+import copy
+import json
+import pickle
 import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 BACKEND_ROOT = Path(__file__).resolve().parent
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+import dashscope
+import numpy as np
+from qdrant_client.qdrant_client import QdrantClient as RealQdrantClient
+
+from app.scripts.ann_recall import recall_report, synthetic_vectors
+from app.scripts.cpu_inference_drift import cosine_drift, ranking_agreement
+from app.services import cpu_inference
+from app.services.access_tracker import AccessTracker
+from app.services.ann_index import IVFVectorIndex
+from app.services.bm25_index import BM25Index, tokenize
+from app.services.collection_registry import CollectionRegistry, parse_collection_registry
 from app.services.document_parser import DocumentParser
+from app.services.document_version_service import DocumentVersionService
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+from app.services.embedding_service import EmbeddingService
+from app.services.gather_loop import GatherLoop
+from app.services.hit import Hit
+from app.services.length_batching import plan_length_batches
+from app.services.mmap_index import MmapVectorIndex
+from app.services.retrieval_filter import RetrievalFilter
 from app.services.text_chunker import TextChunker
-from app.services.vector_store import VectorStore
+from app.services.tiering import TieringJob
+from app.services.vector_store import RetrievalUnavailableError, VectorStore
+from app.services.write_coalescer import WriteCoalescer
 
 
 class DocumentParserTests(unittest.TestCase):
@@ -36,6 +66,12 @@ class VectorStoreTests(unittest.TestCase):
         store.supports_text_index = True
         return store
 
+    def make_memory_store(self):
+        store = self.make_store()
+        store.available = False
+        store.supports_text_index = False
+        return store
+
     def test_point_id_is_deterministic(self):
         point_id = VectorStore._build_point_id("demo.txt", 3)
         self.assertEqual(point_id, VectorStore._build_point_id("demo.txt", 3))
@@ -54,6 +90,25 @@ class VectorStoreTests(unittest.TestCase):
         self.assertEqual(kwargs["points"][0].id, VectorStore._build_point_id("demo.txt", 0))
         self.assertEqual(kwargs["points"][0].payload["source_file"], "demo.txt")
 
+    def test_sync_file_chunks_batches_upserts_behind_a_final_barrier(self):
+        store = self.make_store()
+        store.available = True
+        chunks = [{"chunk_text": f"chunk {idx}", "metadata": {"delta_key": f"k{idx}"}} for idx in range(5)]
+
+        with patch("app.services.vector_store.config.qdrant_upsert_batch_size", 2):
+            stats = store.sync_file_chunks("demo.txt", chunks, [[0.1, 0.2]] * 5, deleted_chunk_keys=["gone"])
+
+        combined = store.client.batch_update_points.call_args.kwargs
+        self.assertFalse(combined["wait"])
+        self.assertEqual(
+            combined["update_operations"][0].delete.points, [VectorStore._build_point_id("demo.txt", stable_key="gone")]
+        )
+        self.assertEqual(len(combined["update_operations"][1].upsert.points), 2)
+        self.assertEqual([call.kwargs["wait"] for call in store.client.upsert.call_args_list], [False, True])
+        self.assertEqual(store.client.upsert.call_args.kwargs["points"][0].payload["chunk_text"], "chunk 4")
+        self.assertEqual((stats["points"], stats["deleted"], stats["batches"]), (5, 1, 3))
+        store.client.delete.assert_not_called()
+
     def test_replace_file_chunks_deletes_before_upsert(self):
         store = self.make_store()
         store.delete_by_file = MagicMock()
@@ -80,9 +135,306 @@ class VectorStoreTests(unittest.TestCase):
         self.assertEqual(len(hits), 1)
         self.assertEqual(hits[0]["score"], 1.0)
         self.assertEqual(store.client.scroll.call_count, 2)
-        first_filter = store.client.scroll.call_args_list[0].kwargs["scroll_filter"]
-        self.assertEqual(first_filter.must[0].key, "chunk_text")
-        self.assertEqual(first_filter.must[0].match.text, "alpha")
+        filters = [call.kwargs["scroll_filter"].must[0] for call in store.client.scroll.call_args_list]
+        self.assertEqual({condition.key for condition in filters}, {"chunk_text"})
+        self.assertEqual(sorted(condition.match.text for condition in filters), ["alpha", "beta"])
+
+    def test_hybrid_search_degrades_to_dense_leg_when_keyword_leg_times_out(self):
+        store = self.make_store()
+        store.available = True
+        store.client.query_points.return_value = SimpleNamespace(
+            points=[SimpleNamespace(payload={"source_file": "demo.txt", "chunk_index": 0, "chunk_text": "dense"}, score=0.9)]
+        )
+        store.client.scroll.side_effect = lambda **kwargs: time.sleep(1.0) or ([], None)
+
+        started = time.perf_counter()
+        with patch("app.services.vector_store.config.hybrid_leg_timeout_seconds", 0.2):
+            hits = store.hybrid_search("alpha beta", [0.1, 0.2], limit=3)
+
+        self.assertLess(time.perf_counter() - started, 0.9)
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in hits], ["dense"])
+        self.assertEqual(hits[0]["keyword_score"], 0.0)
+
+    def test_hybrid_search_raises_when_every_leg_times_out(self):
+        store = self.make_store()
+        store.available = True
+        store.client.query_points.side_effect = lambda **kwargs: time.sleep(0.5) or SimpleNamespace(points=[])
+        store.client.scroll.side_effect = lambda **kwargs: time.sleep(0.5) or ([], None)
+
+        with patch("app.services.vector_store.config.hybrid_leg_timeout_seconds", 0.1), self.assertLogs(
+            "nexusai.vector_store", level="WARNING"
+        ) as logs, self.assertRaises(RetrievalUnavailableError):
+            store.hybrid_search("alpha", [0.1, 0.2], limit=3)
+
+        self.assertTrue(any("exceeded" in line and "'dense'" in line for line in logs.output))
+        self.assertEqual(store.client.query_points.call_args.kwargs["timeout"], 1)
+        deadline = time.monotonic() + 3.0
+        while VectorStore._abandoned_legs and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(VectorStore._abandoned_legs, 0)
+
+    def test_memory_fallback_ranks_by_cosine_similarity(self):
+        store = self.make_memory_store()
+        store.upsert_chunks(
+            "demo.txt",
+            [{"chunk_text": "east"}, {"chunk_text": "north"}, {"chunk_text": "north-east"}],
+            [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+        )
+
+        hits = store.search([0.0, 2.0], limit=2)
+
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in hits], ["north", "north-east"])
+        self.assertAlmostEqual(hits[0]["score"], 1.0, places=5)
+        store.client.query_points.assert_not_called()
+
+    def test_keyword_backend_defaults_to_qdrant_text_and_rebuilds_on_alias_swap(self):
+        store = self.make_store()
+        store.available = True
+        with patch("app.services.vector_store.config.keyword_index_backend", "auto"):
+            self.assertEqual(store._keyword_backend(), "qdrant_text")
+            store.available = False
+            self.assertEqual(store._keyword_backend(), "bm25")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store.available = True
+            store._keyword_index = BM25Index(str(Path(tmpdir) / "keywords.json.gz"), tag="docs_v1")
+            store.client.get_aliases.return_value = SimpleNamespace(
+                aliases=[SimpleNamespace(alias_name=store._collection(), collection_name="docs_v2")]
+            )
+            store.rebuild_keyword_index = MagicMock()
+            with patch("app.services.vector_store.config.keyword_index_refresh_seconds", 0.0):
+                store._refresh_keyword_index()
+            store.rebuild_keyword_index.assert_called_once()
+
+    def test_float32_matrix_upserts_into_memory_store_and_version_snapshot(self):
+        store = self.make_memory_store()
+        chunks = [{"chunk_text": "east"}, {"chunk_text": "north"}]
+        matrix = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        store.upsert_chunks("demo.txt", chunks, matrix)
+
+        hits = store.search([0.1, 1.0], limit=1)
+        self.assertEqual(hits[0]["payload"]["chunk_text"], "north")
+
+        versions = DocumentVersionService(redis_client=MagicMock())
+        versions.get_versions = MagicMock(return_value=[])
+        versions._set_versions = MagicMock()
+        record = versions.record_version("demo.txt", "hash", chunks, embeddings=matrix)
+        self.assertEqual(record["embeddings"]["shape"], [2, 2])
+        json.dumps(record["embeddings"])
+        versions.get_version = MagicMock(return_value=record)
+        restored = versions.rollback("demo.txt", record["version_id"])["embeddings"]
+        np.testing.assert_array_equal(restored, matrix)
+
+    def test_metadata_filters_mask_memory_rows_and_push_down_to_qdrant(self):
+        store = self.make_memory_store()
+        chunks = [{"chunk_text": f"page {page}", "metadata": {"page": page, "section_type": "table"}} for page in range(4)]
+        store.upsert_chunks("a.txt", chunks, [[1.0, 0.1 * page] for page in range(4)])
+        store.upsert_chunks("b.txt", chunks, [[1.0, 0.1 * page] for page in range(4)])
+        filters = {"source_files": ["b.txt"], "page_from": 1, "page_to": 2}
+
+        hits = store.search([1.0, 0.0], limit=5, filters=filters)
+
+        self.assertEqual([(hit["payload"]["source_file"], hit["payload"]["page"]) for hit in hits], [("b.txt", 1), ("b.txt", 2)])
+
+        qdrant_store = self.make_store()
+        qdrant_store.available = True
+        qdrant_store.client.query_points.return_value = SimpleNamespace(points=[])
+        qdrant_store.search([1.0, 0.0], limit=5, filters=filters)
+        must = qdrant_store.client.query_points.call_args.kwargs["query_filter"].must
+        self.assertEqual([condition.key for condition in must], ["source_file", "page"])
+        self.assertEqual((must[1].range.gte, must[1].range.lte), (1, 2))
+
+    def test_document_routing_restricts_chunk_search_to_top_documents(self):
+        store = self.make_memory_store()
+        with patch("app.services.vector_store.config.document_routing_enabled", True), patch(
+            "app.services.vector_store.config.document_routing_top_n", 1
+        ), patch("app.services.vector_store.config.document_routing_min_documents", 2):
+            store.sync_file_chunks("east.txt", [{"chunk_text": "e1"}, {"chunk_text": "e2"}], [[1.0, 0.0], [0.9, 0.1]])
+            store.sync_file_chunks("north.txt", [{"chunk_text": "n1"}, {"chunk_text": "n2"}], [[0.0, 1.0], [0.6, 0.8]])
+
+            self.assertEqual(store.route_documents("", [1.0, 0.2], top_n=1), ["east.txt"])
+            routed = store.hybrid_search("", [1.0, 0.2], limit=3)
+            flat = store.hybrid_search("", [1.0, 0.2], limit=3, document_routing=False)
+
+            store.delete_by_file("east.txt")
+            self.assertEqual(store.route_documents("", [1.0, 0.2], top_n=2), ["north.txt"])
+
+        self.assertEqual({hit["payload"]["source_file"] for hit in routed}, {"east.txt"})
+        self.assertEqual({hit["payload"]["source_file"] for hit in flat}, {"east.txt", "north.txt"})
+
+    def test_memory_fallback_upsert_is_idempotent_and_delete_keeps_rows_consistent(self):
+        store = self.make_memory_store()
+        chunks = [
+            {"chunk_text": "alpha", "metadata": {"delta_key": "a:0"}},
+            {"chunk_text": "beta", "metadata": {"delta_key": "b:0"}},
+        ]
+        store.upsert_chunks("demo.txt", chunks, [[1.0, 0.0], [0.0, 1.0]])
+        store.upsert_chunks("demo.txt", chunks, [[1.0, 0.0], [0.0, 1.0]])
+        store.upsert_chunks("other.txt", [{"chunk_text": "gamma"}], [[1.0, 1.0]])
+        self.assertEqual(len(store._memory_store()), 3)
+
+        store.delete_chunk_keys("demo.txt", ["a:0"])
+        hits = store.search([0.0, 1.0], limit=5)
+
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in hits], ["beta", "gamma"])
+        self.assertEqual(store.get_all_files(), ["demo.txt", "other.txt"])
+
+    def test_get_file_chunks_pushes_source_file_filter_to_qdrant(self):
+        store = self.make_store()
+        store.available = True
+        record = SimpleNamespace(id="p-1", payload={"source_file": "demo.txt", "chunk_index": 0}, vector=[0.1, 0.2])
+        store.client.scroll.return_value = ([record], None)
+
+        rows = store.get_file_chunks("demo.txt", include_vectors=True)
+
+        self.assertEqual(rows[0]["vector"], [0.1, 0.2])
+        scroll_filter = store.client.scroll.call_args.kwargs["scroll_filter"]
+        self.assertEqual(scroll_filter.must[0].key, "source_file")
+        self.assertEqual(scroll_filter.must[0].match.value, "demo.txt")
+
+    def test_iter_point_pages_streams_scroll_pages_lazily(self):
+        store = self.make_store()
+        store.available = True
+        first = SimpleNamespace(id="p-1", payload={"source_file": "a.txt"}, vector={"": [0.1, 0.2], "lexical": None})
+        second = SimpleNamespace(id="p-2", payload={"source_file": "b.txt"}, vector={"": [0.3, 0.4], "lexical": None})
+        store.client.scroll.side_effect = [([first], "p-2"), ([second], None)]
+
+        pages = store.iter_point_pages(fields=["source_file"], batch_size=1, with_vectors=True)
+        self.assertEqual(next(pages)[0]["vector"], [0.1, 0.2])
+        self.assertEqual(store.client.scroll.call_count, 1)
+        self.assertEqual([row["id"] for row in next(pages)], ["p-2"])
+        self.assertEqual(store.client.scroll.call_args.kwargs["offset"], "p-2")
+
+    def test_memory_fallback_iter_points_applies_filter_and_fields(self):
+        store = self.make_memory_store()
+        store.upsert_chunks("a.txt", [{"chunk_text": "one"}, {"chunk_text": "two"}], [[1.0, 0.0], [0.0, 1.0]])
+        store.upsert_chunks("b.txt", [{"chunk_text": "three"}], [[0.5, 0.5]])
+
+        rows = list(store.iter_points(filter=VectorStore._source_file_filter("a.txt"), fields=["chunk_text"]))
+
+        self.assertEqual([row["payload"] for row in rows], [{"chunk_text": "one"}, {"chunk_text": "two"}])
+
+    def test_memory_fallback_get_file_chunks_uses_per_file_index(self):
+        store = self.make_memory_store()
+        store.upsert_chunks("b.txt", [{"chunk_text": "other"}], [[0.0, 1.0]])
+        store.upsert_chunks("a.txt", [{"chunk_text": "one"}, {"chunk_text": "two"}], [[1.0, 0.0], [0.6, 0.8]])
+
+        rows = store.get_file_chunks("a.txt", include_vectors=True)
+
+        self.assertEqual([row["payload"]["chunk_text"] for row in rows], ["one", "two"])
+        self.assertAlmostEqual(rows[1]["vector"][1], 0.8, places=5)
+        store.delete_by_file("a.txt")
+        self.assertEqual(store.get_file_chunks("a.txt"), [])
+        self.assertEqual(store.get_all_files(), ["b.txt"])
+
+    def test_memory_upsert_applies_delete_ids(self):
+        store = self.make_memory_store()
+        store._keyword_index = BM25Index()
+        store.upsert_chunks(
+            "demo.txt",
+            [
+                {"chunk_text": "refund one", "metadata": {"delta_key": "a"}},
+                {"chunk_text": "refund two", "metadata": {"delta_key": "b"}},
+            ],
+            [[1.0, 0.0], [0.0, 1.0]],
+        )
+        doomed = [VectorStore._build_point_id("demo.txt", stable_key="a")]
+
+        stats = store.upsert_chunks("demo.txt", [], [], delete_ids=doomed)
+        matrix_stats = store.upsert_chunks(
+            "demo.txt",
+            [{"chunk_text": "refund three", "metadata": {"delta_key": "c"}}],
+            np.asarray([[0.5, 0.5]], dtype=np.float32),
+            delete_ids=[VectorStore._build_point_id("demo.txt", stable_key="b")],
+        )
+
+        self.assertEqual((stats["points"], stats["deleted"]), (0, 1))
+        self.assertEqual((matrix_stats["points"], matrix_stats["deleted"]), (1, 1))
+        self.assertEqual([row["payload"]["chunk_text"] for row in store.get_file_chunks("demo.txt")], ["refund three"])
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in store.keyword_search("refund", limit=5)], ["refund three"])
+
+    def test_keyword_search_ranks_with_incremental_bm25_index(self):
+        store = self.make_memory_store()
+        store._keyword_index = BM25Index()
+        store.upsert_chunks(
+            "demo.txt",
+            [
+                {"chunk_text": "refund policy for annual plans", "metadata": {"delta_key": "a"}},
+                {"chunk_text": "refund refund refund window", "metadata": {"delta_key": "b"}},
+                {"chunk_text": "shipping times", "metadata": {"delta_key": "c"}},
+            ],
+            [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
+        )
+
+        hits = store.keyword_search("refund window", limit=5)
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in hits][0], "refund refund refund window")
+        self.assertEqual(hits[0]["score"], 1.0)
+        self.assertLess(hits[1]["score"], 1.0)
+
+        store.delete_chunk_keys("demo.txt", ["b"])
+        self.assertEqual(
+            [hit["payload"]["chunk_text"] for hit in store.keyword_search("refund window", limit=5)],
+            ["refund policy for annual plans"],
+        )
+        store.delete_by_file("demo.txt")
+        self.assertEqual(store.keyword_search("refund", limit=5), [])
+
+    def test_bm25_keyword_search_pages_past_a_selective_filter(self):
+        store = self.make_memory_store()
+        store._keyword_index = BM25Index()
+        # The only table chunks rank last for "refund", well below the first page of candidates.
+        chunks = [
+            {"chunk_text": "refund " * 5 + f"note {idx}", "metadata": {"delta_key": f"n{idx}", "section_type": "text"}}
+            for idx in range(120)
+        ] + [
+            {"chunk_text": f"refund table {idx} " + "filler " * 40, "metadata": {"delta_key": f"t{idx}", "section_type": "table"}}
+            for idx in range(3)
+        ]
+        store.upsert_chunks("demo.txt", chunks, [[1.0, 0.0]] * len(chunks))
+
+        with patch.object(store, "_payloads_for_ids", wraps=store._payloads_for_ids) as lookups:
+            hits = store.keyword_search("refund", limit=3, filters=RetrievalFilter(section_types=["table"]))
+
+        self.assertEqual(sorted(hit["payload"]["chunk_text"].split()[2] for hit in hits), ["0", "1", "2"])
+        self.assertEqual([len(call.args[0]) for call in lookups.call_args_list], [50, 73])
+
+    def test_sparse_collection_fuses_hybrid_search_server_side(self):
+        store = self.make_store()
+        store.available = True
+        store.supports_sparse_vectors = True
+        store.upsert_chunks("demo.txt", [{"chunk_text": "refund window"}], [[0.1, 0.2]])
+        vector = store.client.upsert.call_args.kwargs["points"][0].vector
+        self.assertEqual(vector[""], [0.1, 0.2])
+        self.assertEqual(len(vector["lexical"].indices), 2)
+
+        store.client.query_points.return_value = SimpleNamespace(
+            points=[SimpleNamespace(payload={"source_file": "demo.txt", "chunk_text": "refund window"}, score=1.6)]
+        )
+        hits = store.hybrid_search("refund", [0.1, 0.2], limit=3)
+
+        self.assertAlmostEqual(hits[0]["score"], 0.8)
+        kwargs = store.client.query_points.call_args.kwargs
+        self.assertEqual([prefetch.using for prefetch in kwargs["prefetch"]], [None, "lexical"])
+        self.assertEqual(kwargs["query"].fusion, "dbsf")
+        store.client.scroll.assert_not_called()
+
+    def test_collection_tuning_and_per_request_hnsw_ef_come_from_config(self):
+        store = self.make_store()
+        store.available = True
+        with patch("app.services.vector_store.config.qdrant_quantization", "scalar"), patch(
+            "app.services.vector_store.config.qdrant_on_disk_payload", True
+        ), patch("app.services.vector_store.config.qdrant_hnsw_m", 32):
+            store._create_collection(collection_name="tuned")
+            store.client.query_points.return_value = SimpleNamespace(points=[])
+            store.search([0.1, 0.2], limit=3, hnsw_ef=256)
+
+        kwargs = store.client.create_collection.call_args.kwargs
+        self.assertEqual(kwargs["quantization_config"].scalar.type, "int8")
+        self.assertTrue(kwargs["on_disk_payload"])
+        self.assertEqual(kwargs["hnsw_config"].m, 32)
+        search_params = store.client.query_points.call_args.kwargs["search_params"]
+        self.assertEqual(search_params.hnsw_ef, 256)
+        self.assertTrue(search_params.quantization.rescore)
 
     def test_get_all_files_prefers_facet_index(self):
         store = self.make_store()
@@ -101,5 +453,564 @@ class VectorStoreTests(unittest.TestCase):
         store.client.scroll.assert_not_called()
 
 
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_lru_and_disk_levels_skip_recomputation(self):
+        calls = []
+
+        def compute(indexes):
+            calls.append(list(indexes))
+            return [[float(index), 0.1] for index in indexes]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = DiskEmbeddingStore(str(Path(tmp) / "cache.sqlite3"))
+            cache = EmbeddingCache(capacity=2, store=store)
+            keys = [EmbeddingCache.key("mock", 2, digest) for digest in ("a", "b", "a")]
+
+            first = cache.get_or_compute(keys, compute)
+            self.assertEqual(calls, [[0, 1]])
+            self.assertEqual(first[0], first[2])
+            self.assertEqual(first[1], [1.0, np.float32(0.1).item()])
+            self.assertEqual(cache.get_or_compute(keys, compute), first)
+
+            restarted = EmbeddingCache(capacity=2, store=store)
+            self.assertEqual(restarted.get_or_compute(keys[:2], compute), first[:2])
+            self.assertEqual(len(calls), 1)
+            stats = restarted.stats()
+            self.assertEqual((stats["store_hits"], stats["misses"], stats["hit_rate"]), (2, 0, 1.0))
+            store.close()
+
+    def test_service_keys_by_model_and_dimension(self):
+        service = EmbeddingService.__new__(EmbeddingService)
+        service.backend = "mock"
+        service.cache = EmbeddingCache(capacity=8, backend="none")
+        with patch.object(service, "_embed_items", wraps=service._embed_items) as embed:
+            texts = service.get_embeddings(["refund policy"])
+            items = service.get_multimodal_embeddings([{"text": "refund policy"}])
+            self.assertEqual(texts, items)
+            self.assertEqual(embed.call_count, 1)
+            with patch("app.services.embedding_service.config.vector_dimension", 8):
+                self.assertEqual(len(service.get_embeddings(["refund policy"])[0]), 8)
+            self.assertEqual(embed.call_count, 2)
+
+    def test_array_api_matches_list_api_as_float32(self):
+        service = EmbeddingService.__new__(EmbeddingService)
+        service.backend = "mock"
+        service.cache = EmbeddingCache(capacity=8, backend="none")
+        texts = ["refund policy", "shipping times", "refund policy"]
+
+        matrix = service.get_embeddings_array(texts)
+        self.assertEqual((matrix.dtype, matrix.shape), (np.float32, (3, len(service.get_embeddings(texts[:1])[0]))))
+        np.testing.assert_array_equal(matrix, np.asarray(service.get_embeddings(texts), dtype=np.float32))
+        service.cache = None
+        np.testing.assert_array_equal(service.get_embeddings_array(texts), matrix)
+
+
+class EmbeddingBatcherTests(unittest.TestCase):
+    def test_concurrent_queries_share_one_model_call(self):
+        calls = []
+
+        def embed(texts):
+            calls.append(list(texts))
+            time.sleep(0.02)
+            return [[float(len(text))] for text in texts]
+
+        batcher = EmbeddingBatcher(embed, max_batch=16, max_wait_seconds=0.05)
+        self.addCleanup(batcher.close)
+        queries = ["a" * size for size in range(1, 9)]
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            results = list(pool.map(lambda query: batcher.embed([query]), queries))
+
+        self.assertEqual(results, [[[float(size)]] for size in range(1, 9)])
+        self.assertLess(len(calls), len(queries))
+        stats = batcher.stats()
+        self.assertEqual((stats["requests"], stats["texts"], stats["batches"]), (8, 8, len(calls)))
+        self.assertGreaterEqual(stats["max_queue_depth"], 1)
+
+        broken = EmbeddingBatcher(lambda texts: [], max_wait_seconds=0.0)
+        self.addCleanup(broken.close)
+        with self.assertRaises(RuntimeError):
+            broken.embed(["x"])
+
+
+class FakeDashScopeHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            throttle = cls.requests == 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.02)
+        if throttle:
+            status, data = 429, {"code": "Throttling.RateQuota", "message": "Requests rate limit exceeded"}
+        else:
+            contents = body["input"]["contents"]
+            embeddings = [{"index": idx, "embedding": [float(item["text"][1:]), 0.0]} for idx, item in enumerate(contents)]
+            status, data = 200, {"output": {"embeddings": embeddings}}
+        with cls.lock:
+            cls.in_flight -= 1
+        raw = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+class DashScopeClientTests(unittest.TestCase):
+    def test_batches_run_concurrently_retry_throttling_and_keep_order(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FakeDashScopeHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        settings = {
+            "dashscope_api_key": "test-key",
+            "dashscope_base_url": "http://127.0.0.1:%s/api/v1" % server.server_address[1],
+            "dashscope_embedding_batch_size": 4,
+            "dashscope_embedding_concurrency": 3,
+            "dashscope_embedding_rate_limit": 0.0,
+            "dashscope_embedding_backoff_seconds": 0.01,
+        }
+        with patch.multiple("app.services.embedding_service.config", **settings), patch.object(
+            dashscope, "base_http_api_url", dashscope.base_http_api_url
+        ), patch.object(dashscope, "api_key", dashscope.api_key), patch.dict("os.environ", {"DASHSCOPE_API_KEY": ""}):
+            service = EmbeddingService.__new__(EmbeddingService)
+            service._init_dashscope()
+            self.addCleanup(service._dashscope_client.close)
+            vectors = service._dashscope_embed([{"text": "t%s" % idx} for idx in range(22)])
+
+        self.assertEqual([vector[0] for vector in vectors], [float(idx) for idx in range(22)])
+        self.assertEqual(FakeDashScopeHandler.requests, 7)
+        self.assertLessEqual(FakeDashScopeHandler.max_in_flight, 3)
+        self.assertGreater(FakeDashScopeHandler.max_in_flight, 1)
+        self.assertEqual(service._dashscope_client.stats()["throttled"], 1)
+
+
+class LengthBatchingTests(unittest.TestCase):
+    def test_length_batches_respect_size_and_padded_token_budgets(self):
+        lengths = [10, 300, 12, 290, 11, 5000]
+        batches = plan_length_batches(lengths, max_batch_size=2, max_batch_tokens=600)
+
+        self.assertEqual(batches, [[5], [1, 3], [2, 4], [0]])
+        self.assertEqual(sorted(index for batch in batches for index in batch), list(range(len(lengths))))
+        self.assertEqual(plan_length_batches(lengths), [[5, 1, 3, 2, 4, 0]])
+
+
+class CpuInferenceTests(unittest.TestCase):
+    def test_modes_normalise_and_float32_is_a_no_op(self):
+        self.assertEqual([cpu_inference.cpu_mode(mode) for mode in ("BF16", "bfloat16", "qint8", "fp32")], ["bf16", "bf16", "int8", "float32"])
+        with patch("app.services.cpu_inference.config.cpu_inference_mode", "fp8"):
+            self.assertEqual(cpu_inference.cpu_mode(), "float32")
+        model = object()
+        self.assertIs(cpu_inference.prepare_model(model, "float32"), model)
+        self.assertEqual(cpu_inference.warm_up("broken", lambda: 1 / 0), 0.0)
+
+    def test_drift_report_against_float32_reference(self):
+        rng = np.random.default_rng(0)
+        reference = rng.standard_normal((6, 16)).astype(np.float32)
+        noisy = reference + 0.01 * rng.standard_normal(reference.shape).astype(np.float32)
+
+        self.assertEqual(cosine_drift(reference, reference)["max_drift"], 0.0)
+        drift = cosine_drift(reference, noisy)
+        self.assertGreater(drift["min_cosine"], 0.99)
+        self.assertLess(drift["max_drift"], 0.01)
+
+        scores = rng.standard_normal((4, 5))
+        agreement = ranking_agreement(scores, scores + 1e-6)
+        self.assertEqual((agreement["top1_agreement"], agreement["top3_overlap"]), (1.0, 1.0))
+
+
+class HitTests(unittest.TestCase):
+    def test_hits_share_a_read_only_payload_across_stages(self):
+        payload = {"source_file": "a.txt", "chunk_index": 0, "chunk_text": "alpha", "parent_text": "alpha beta"}
+        hit = Hit(payload, score=0.4, id="p1")
+        rescored = hit.replace(score=0.9, collection="hr")
+
+        self.assertIs(rescored.payload, hit.payload)
+        with self.assertRaises(TypeError):
+            hit.payload["chunk_text"] = "mutated"
+        self.assertEqual((rescored["score"], rescored.get("tier", "hot")), (0.9, "hot"))
+        self.assertNotIn("vector_score", hit)
+        self.assertEqual({**rescored}["collection"], "hr")
+
+        expanded = VectorStore._expand_hit_to_parent(hit)
+        self.assertEqual(expanded.payload["chunk_text"], "alpha beta")
+        self.assertEqual(payload["chunk_text"], "alpha")
+        for clone in (pickle.loads(pickle.dumps(rescored)), copy.deepcopy(rescored)):
+            self.assertEqual(clone.to_dict(), rescored.to_dict())
+
+
+class CollectionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            patch("app.services.vector_store.config.vector_store_backend", "memory"),
+            patch("app.services.vector_store.config.vector_dimension", 2),
+            patch("app.services.vector_store.config.keyword_index_backend", "qdrant_text"),
+            patch.dict(VectorStore._shared_memory_indexes),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_registry_parses_entries_and_keeps_default(self):
+        specs = parse_collection_registry("hr=hr_docs, legal=legal_docs@qdrant-2:6333,archive")
+
+        self.assertEqual(list(specs), ["default", "hr", "legal", "archive"])
+        self.assertEqual((specs["legal"].collection_name, specs["legal"].location), ("legal_docs", "qdrant-2:6333"))
+        self.assertEqual(specs["archive"].collection_name, "archive")
+        with self.assertRaises(ValueError):
+            CollectionRegistry(specs).resolve(["missing"])
+
+    def test_federated_search_fans_out_and_merges_per_collection(self):
+        registry = CollectionRegistry(parse_collection_registry("hr=hr_docs,legal=legal_docs"))
+        registry.get("hr").upsert_chunks("handbook.txt", [{"chunk_text": "leave"}], [[1.0, 0.0]])
+        registry.get("legal").upsert_chunks("handbook.txt", [{"chunk_text": "contracts"}], [[0.9, 0.1]])
+
+        hits = registry.hybrid_search(["hr", "legal"], "", [1.0, 0.0], limit=5)
+        self.assertEqual([hit["collection"] for hit in hits], ["hr", "legal"])
+        self.assertEqual([hit["payload"]["chunk_text"] for hit in hits], ["leave", "contracts"])
+        self.assertEqual(len(registry.get("default")._memory_store()), 0)
+
+        with patch.object(registry.get("legal"), "hybrid_search", side_effect=RuntimeError("shard down")):
+            partial_hits = registry.hybrid_search(["*"], "", [1.0, 0.0], limit=5)
+        self.assertEqual([hit["collection"] for hit in partial_hits], ["hr"])
+
+
+class TieringTests(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            patch("app.services.vector_store.config.vector_store_backend", "memory"),
+            patch("app.services.vector_store.config.vector_dimension", 2),
+            patch("app.services.vector_store.config.keyword_index_backend", "qdrant_text"),
+            patch("app.services.vector_store.config.tiering_enabled", True),
+            patch("app.services.vector_store.config.tiering_min_age_seconds", 0),
+            patch.dict(VectorStore._shared_memory_indexes, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.tracker = AccessTracker(path="")
+        self.tracker.clear()
+        self.addCleanup(self.tracker.clear)
+
+    def test_job_demotes_unread_files_and_search_falls_back_to_cold_tier(self):
+        store = VectorStore()
+        store.sync_file_chunks("hot.txt", [{"chunk_text": "faq"}], [[1.0, 0.0]])
+        store.sync_file_chunks("cold.txt", [{"chunk_text": "archive"}], [[0.0, 1.0]])
+        self.tracker.record(store.hybrid_search("", [1.0, 0.0], limit=1))
+
+        report = TieringJob(store, self.tracker).run()
+        cold = store._cold_store()
+
+        self.assertEqual((report["demoted"], report["promoted"]), (["cold.txt"], []))
+        self.assertEqual(sorted(cold._scan_file_counts()), ["cold.txt"])
+        self.assertEqual(store.get_all_files(), ["cold.txt", "hot.txt"])
+        with patch.object(cold, "_hybrid_search_tier", wraps=cold._hybrid_search_tier) as cold_search:
+            strong = store.hybrid_search("", [1.0, 0.0], limit=1)
+            weak = store.hybrid_search("", [0.0, 1.0], limit=2)
+        self.assertEqual(cold_search.call_count, 1)
+        self.assertEqual([hit["payload"]["source_file"] for hit in strong], ["hot.txt"])
+        self.assertEqual([(hit["payload"]["source_file"], hit.get("tier")) for hit in weak][0], ("cold.txt", "cold"))
+
+        store.sync_file_chunks("cold.txt", [{"chunk_text": "archive v2"}], [[0.0, 1.0]])
+        self.assertEqual(cold._scan_file_counts(), {})
+        self.assertEqual(store.get_file_chunks("cold.txt")[0]["payload"]["chunk_text"], "archive v2")
+
+    def test_demote_and_reupload_of_the_same_file_do_not_interleave(self):
+        store = VectorStore()
+        store.sync_file_chunks("a.txt", [{"chunk_text": "v1"}], [[1.0, 0.0]])
+        cold = store._cold_store()
+        rows_read, release = threading.Event(), threading.Event()
+        upsert_cold = cold._upsert_points
+
+        def paused_upsert(points):
+            rows_read.set()
+            release.wait(5)
+            return upsert_cold(points)
+
+        with patch.object(cold, "_upsert_points", side_effect=paused_upsert):
+            demote = threading.Thread(target=store.move_file_to, args=(cold, "a.txt"))
+            demote.start()
+            self.assertTrue(rows_read.wait(5))
+            upload = threading.Thread(
+                target=store.sync_file_chunks, args=("a.txt", [{"chunk_text": "v2"}], [[0.0, 1.0]])
+            )
+            upload.start()
+            upload.join(0.2)
+            blocked = upload.is_alive()
+            release.set()
+            demote.join(5)
+            upload.join(5)
+
+        self.assertTrue(blocked)
+        self.assertEqual(cold._scan_file_counts(), {})
+        self.assertEqual([row["payload"]["chunk_text"] for row in store.get_file_chunks("a.txt")], ["v2"])
+
+
+class BM25IndexTests(unittest.TestCase):
+    def test_tokenize_splits_cjk_into_bigrams(self):
+        self.assertEqual(tokenize("退款政策 API-v2 a"), ["退款", "款政", "政策", "api-v2"])
+
+    def test_index_persists_and_reloads(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = str(Path(tmpdir) / "keywords.json.gz")
+            index = BM25Index(path)
+            index.add_documents([("1", "退款政策说明", "a.txt"), ("2", "发货时间", "b.txt")])
+            index.save()
+
+            reopened = BM25Index(path)
+            self.assertEqual([doc_id for doc_id, _ in reopened.search("退款", limit=5)], ["1"])
+            self.assertEqual(reopened.remove_file("b.txt"), 1)
+            self.assertEqual(len(reopened), 1)
+
+    def test_writes_append_to_the_op_log_without_rewriting_the_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "keywords.json.gz"
+            index = BM25Index(str(path))
+            index.add_documents([("1", "refund policy", "a.txt")])
+            index.save()
+            snapshot = path.read_bytes()
+
+            for step in range(20):
+                index.add_documents([(f"d{step}", f"shipping note {step}", "b.txt")])
+                index.save()
+            index.remove_documents(["1"])
+            index.save()
+
+            self.assertEqual(path.read_bytes(), snapshot)
+            self.assertEqual(len(index.log_path.read_text().splitlines()), 21)
+            reopened = BM25Index(str(path))
+            self.assertEqual(len(reopened), 20)
+            self.assertEqual(reopened.search("refund"), [])
+
+            reopened.checkpoint()
+            self.assertEqual(index.log_path.read_bytes(), b"")
+            self.assertEqual(len(BM25Index(str(path))), 20)
+
+    def test_replaced_snapshot_is_picked_up_instead_of_overwritten(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = str(Path(tmpdir) / "keywords.json.gz")
+            api = BM25Index(path, tag="docs_v1")
+            api.add_documents([("old", "refund policy", "a.txt")])
+            api.save()
+
+            # The reindex script rebuilds for the new collection behind the alias.
+            script = BM25Index(path)
+            script.clear()
+            script.tag = "docs_v2"
+            script.add_documents([("new", "refund policy v2", "a.txt")])
+            script.save()
+
+            api.add_documents([("late", "late upload", "c.txt")])
+            api.save()
+
+            self.assertEqual(api.tag, "docs_v2")
+            self.assertEqual(sorted(doc_id for doc_id, _ in api.search("refund upload")), ["late", "new"])
+            reopened = BM25Index(path)
+            self.assertEqual((reopened.tag, len(reopened)), ("docs_v2", 2))
+
+
+class WriteCoalescerTests(unittest.TestCase):
+    def test_concurrent_submissions_share_one_commit_and_failures_reach_every_caller(self):
+        flushed = []
+        coalescer = WriteCoalescer(flushed.append, max_points=100, max_delay_seconds=0.2)
+        futures = [coalescer.submit([f"op-{idx}"], weight=2) for idx in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+        coalescer.close()
+
+        self.assertEqual(flushed, [["op-0", "op-1", "op-2"]])
+        self.assertEqual({result["group_size"] for result in results}, {3})
+        self.assertEqual(coalescer.stats()["requests_per_commit"], 3.0)
+
+        failing = WriteCoalescer(MagicMock(side_effect=RuntimeError("qdrant down")), max_delay_seconds=0.0)
+        with self.assertRaisesRegex(RuntimeError, "qdrant down"):
+            failing.submit(["op"]).result(timeout=5)
+        failing.close()
+
+    def test_gather_loop_fails_the_group_when_its_hook_raises(self):
+        class Flaky(GatherLoop):
+            def _process_group(self, group, weight):
+                if any(item == "boom" for item, _, _ in group):
+                    raise ValueError("bad hook")
+                for item, _, future in group:
+                    future.set_result(item)
+
+        loop = Flaky(max_weight=1, max_delay_seconds=0.0, name="flaky-gather-loop")
+        self.addCleanup(loop.close)
+        with self.assertRaisesRegex(ValueError, "bad hook"):
+            loop._enqueue("boom", 1).result(timeout=5)
+        self.assertEqual(loop._enqueue("ok", 1).result(timeout=5), "ok")
+
+    def test_vector_store_sync_routes_through_group_commit(self):
+        store = VectorStore.__new__(VectorStore)
+        store.client = MagicMock()
+        store.available = True
+        with patch("app.services.vector_store.config.qdrant_write_coalescing", True), patch(
+            "app.services.vector_store.config.collection_name", "coalesced-test"
+        ):
+            stats = store.sync_file_chunks("demo.txt", [{"chunk_text": "a"}], [[0.1, 0.2]], deleted_chunk_keys=["old"])
+            VectorStore._write_coalescers.pop("coalesced-test").close()
+
+        operations = store.client.batch_update_points.call_args.kwargs["update_operations"]
+        self.assertTrue(store.client.batch_update_points.call_args.kwargs["wait"])
+        self.assertEqual([type(operation).__name__ for operation in operations], ["DeleteOperation", "UpsertOperation"])
+        self.assertEqual((stats["points"], stats["deleted"]), (1, 1))
+        store.client.upsert.assert_not_called()
+
+    def test_failed_writes_leave_the_keyword_index_untouched(self):
+        store = VectorStore.__new__(VectorStore)
+        store.client = MagicMock()
+        store.available = True
+        store._keyword_index = BM25Index()
+        old_id = VectorStore._build_point_id("demo.txt", stable_key="old")
+        store._keyword_index.add_documents([(old_id, "refund policy", "demo.txt")])
+        store.client.batch_update_points.side_effect = RuntimeError("qdrant down")
+
+        with self.assertRaises(RuntimeError):
+            store.upsert_chunks("demo.txt", [{"chunk_text": "shipping times"}], [[0.1, 0.2]], delete_ids=[old_id])
+        with patch("app.services.vector_store.config.qdrant_write_coalescing", True), patch(
+            "app.services.vector_store.config.collection_name", "coalesced-failure-test"
+        ):
+            with self.assertRaises(RuntimeError):
+                store.sync_file_chunks(
+                    "demo.txt", [{"chunk_text": "shipping times"}], [[0.1, 0.2]], deleted_chunk_keys=["old"]
+                )
+            VectorStore._write_coalescers.pop("coalesced-failure-test").close()
+
+        self.assertEqual([doc_id for doc_id, _ in store._keyword_index.search("refund")], [old_id])
+        self.assertEqual(store._keyword_index.search("shipping"), [])
+
+
+class AnnIndexTests(unittest.TestCase):
+    def test_ivf_index_supports_incremental_insert_and_delete(self):
+        vectors = synthetic_vectors(400, 16, clusters=8)
+        index = IVFVectorIndex(nlist=8, nprobe=2, min_train_points=100)
+        index.upsert([str(i) for i in range(300)], vectors[:300], [{"row": i} for i in range(300)])
+        index.wait_for_training(5.0)
+        self.assertTrue(index.is_trained)
+
+        index.upsert([str(i) for i in range(300, 400)], vectors[300:], [{"row": i} for i in range(300, 400)])
+        self.assertEqual(index.search(vectors[350], limit=1)[0]["id"], "350")
+
+        index.delete(["350", "10", "200"])
+        self.assertNotIn("350", [hit["id"] for hit in index.search(vectors[350], limit=5)])
+        self.assertEqual(index.search(vectors[399], limit=1)[0]["id"], "399")
+        # Inverted lists still partition exactly the live rows after swap-removes.
+        listed = np.concatenate([rows[:size] for rows, size in zip(index._lists, index._list_sizes)])
+        np.testing.assert_array_equal(np.sort(listed), np.arange(len(index)))
+        for list_id, (rows, size) in enumerate(zip(index._lists, index._list_sizes)):
+            for slot, row in enumerate(rows[:size]):
+                self.assertEqual((index._assignments[row], index._slots[row]), (list_id, slot))
+
+    def test_search_never_trains_on_the_query_path(self):
+        vectors = synthetic_vectors(300, 16, clusters=8)
+        index = IVFVectorIndex(nlist=8, nprobe=2, min_train_points=100, auto_train=False)
+        index.upsert([str(i) for i in range(300)], vectors, [{"row": i} for i in range(300)])
+
+        with patch.object(index, "train", side_effect=AssertionError("trained during search")):
+            self.assertEqual(index.search(vectors[7], limit=1)[0]["id"], "7")
+        self.assertFalse(index.is_trained)
+
+        index.train()
+        rows = index._candidate_rows(index._as_matrix([vectors[7]])[0], 1)
+        self.assertLess(rows.size, len(index))
+        self.assertIn(index._positions["7"], rows.tolist())
+
+    def test_recall_report_compares_against_exact_search(self):
+        vectors = synthetic_vectors(2000, 16, clusters=16)
+        report = recall_report(vectors, vectors[:20], k=5, nprobes=[1, 16], nlist=16)
+        recalls = {row["nprobe"]: row["recall_at_k"] for row in report["results"]}
+        self.assertEqual(recalls[16], 1.0)
+        self.assertLessEqual(recalls[1], recalls[16])
+
+
+class MmapIndexTests(unittest.TestCase):
+    def test_local_index_survives_reopen_and_persists_deletes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = MmapVectorIndex(tmpdir, initial_capacity=2)
+            index.upsert(["a", "b", "c"], [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], [{"n": "a"}, {"n": "b"}, {"n": "c"}])
+            index.delete(["a"])
+            index.upsert(["b"], [[0.0, 1.0]], [{"n": "b2"}])
+            index.close()
+
+            reopened = MmapVectorIndex(tmpdir, payload_cache_size=0)
+            hits = reopened.search([0.0, 1.0], limit=5)
+            reopened.close()
+
+        self.assertEqual([hit["id"] for hit in hits], ["b", "c"])
+        self.assertEqual(hits[0]["payload"], {"n": "b2"})
+
+    def test_writes_append_to_the_log_and_replay_after_the_last_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = MmapVectorIndex(tmpdir, initial_capacity=2)
+            index.upsert(["a"], [[1.0, 0.0]], [{"n": "a"}])
+            index_path = Path(tmpdir) / "index.npz"
+            checkpointed = index_path.read_bytes()
+
+            for step in range(50):
+                index.upsert([f"p{step}"], [[0.5, 0.1 * step]], [{"n": step}])
+            index.delete(["a", "p3"])
+            index.upsert(["p7"], [[0.0, 1.0]], [{"n": "p7b"}])
+            self.assertEqual(index_path.read_bytes(), checkpointed)
+
+            # Reopen without close(): everything after the checkpoint comes back from the log.
+            reopened = MmapVectorIndex(tmpdir, payload_cache_size=0)
+            self.assertEqual(sorted(reopened._ids), sorted(index._ids))
+            self.assertNotIn("a", reopened._positions)
+            hit = reopened.search([0.0, 1.0], limit=1)[0]
+            self.assertEqual((hit["id"], hit["payload"]), ("p7", {"n": "p7b"}))
+            self.assertEqual(reopened.get_vector("p10"), index.get_vector("p10"))
+            index.close()
+            reopened.close()
+
+            final = MmapVectorIndex(tmpdir)
+            self.assertEqual(len(final), 49)
+            self.assertEqual(final._checkpoint_offset, (Path(tmpdir) / "payloads-0.jsonl").stat().st_size)
+            final.close()
+
+    def test_vector_store_local_backend_skips_qdrant_client(self):
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "app.services.vector_store.config.vector_store_backend", "local"
+        ), patch("app.services.vector_store.config.local_vector_store_path", tmpdir), patch(
+            "app.services.vector_store.QdrantClient", side_effect=AssertionError("qdrant should not be used")
+        ):
+            store = VectorStore()
+            store.upsert_chunks("demo.txt", [{"chunk_text": "hello"}], [[0.1, 0.2]])
+            self.assertIs(VectorStore()._memory_store(), store._memory_store())
+            self.assertEqual(store.get_all_files(), ["demo.txt"])
+            store._memory_store().close()
+            VectorStore._shared_memory_indexes.clear()
+
+
+class EmbeddedQdrantTests(unittest.TestCase):
+    def test_qdrant_path_opens_one_shared_embedded_client(self):
+        with patch("app.services.vector_store.QdrantClient", RealQdrantClient), patch(
+            "app.services.vector_store.config.qdrant_path", ":memory:"
+        ), patch(
+            "app.services.vector_store.config.collection_name", "embedded_test"
+        ), patch("app.services.vector_store.config.vector_dimension", 2), patch(
+            "app.services.vector_store.config.keyword_index_backend", "qdrant_text"
+        ):
+            try:
+                store = VectorStore()
+                self.assertTrue(store.available)
+                self.assertIs(VectorStore().client, store.client)
+                store.upsert_chunks("demo.txt", [{"chunk_text": "alpha beta"}, {"chunk_text": "gamma"}], [[1.0, 0.0], [0.0, 1.0]])
+                hits = store.search([0.0, 1.0], limit=1)
+                self.assertEqual(hits[0]["payload"]["chunk_text"], "gamma")
+                self.assertEqual(store.get_all_files(), ["demo.txt"])
+            finally:
+                for client in VectorStore._embedded_clients.values():
+                    client.close()
+                VectorStore._embedded_clients.clear()
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
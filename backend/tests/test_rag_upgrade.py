@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import sys
@@ -7,7 +8,7 @@ from contextlib import redirect_stdout
 from io import StringIO
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 os.environ.setdefault("NEXUSAI_EMBEDDING_BACKEND", "mock")
 os.environ.setdefault("NEXUSAI_LLM_BACKEND", "mock")
@@ -53,6 +54,7 @@ BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
+import httpx
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
@@ -61,6 +63,7 @@ from app.evaluation import run as evaluation_run
 from app.observability.tracer import NoopTracer
 from app.routers import admin as admin_router
 from app.routers import chat as chat_router
+from app.routers import files as files_router
 from app.routers import upload as upload_router
 from app.scripts import reindex as reindex_script
 from app.services.ab_test import ABTestManager
@@ -132,6 +135,26 @@ class ChunkingAndVectorStoreTests(unittest.TestCase):
         roles = sorted(chunk["metadata"]["chunk_role"] for chunk in chunks)
         self.assertIn("parent", roles)
         self.assertIn("child", roles)
+        self.assertFalse(any("parent_text" in chunk["metadata"] for chunk in chunks))
+
+    def test_expand_hits_to_parents_batch_fetches_parent_points(self):
+        store = VectorStore.__new__(VectorStore)
+        store.available = False
+        store.upsert_chunks(
+            "doc.txt",
+            [
+                {"chunk_text": "child one", "metadata": {"chunk_role": "child", "parent_id": "p-1"}},
+                {"chunk_text": "child two", "metadata": {"chunk_role": "child", "parent_id": "p-1"}},
+                {"chunk_text": "child one\n\nchild two", "metadata": {"chunk_role": "parent", "parent_id": "p-1"}},
+            ],
+            [[1.0, 0.0], [0.9, 0.1], [0.5, 0.5]],
+        )
+
+        hits = store.search([1.0, 0.0], limit=2, expand_to_parent=True)
+
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0]["payload"]["chunk_text"], "child one\n\nchild two")
+        self.assertEqual(hits[0]["payload"]["chunk_role"], "parent_context")
 
     def test_expand_hits_to_parents_uses_parent_text(self):
         store = VectorStore.__new__(VectorStore)
@@ -402,6 +425,36 @@ class ChatApiTests(unittest.TestCase):
         self.assertEqual(feedback_resp.status_code, 200)
         self.assertEqual(feedback_resp.json()["status"], "success")
 
+    def test_chat_passes_metadata_filters_to_retrieval(self):
+        client = self.build_client()
+
+        def mock_response(*args, **kwargs):
+            return iter([_MockChunk("scoped")]), [], {"trace_id": "trace-filter", "confidence_score": 0.5}
+
+        with patch.object(chat_router.self_rag, "generate_response", side_effect=mock_response) as generate_mock:
+            response = client.post(
+                "/api/chat",
+                json={"message": "hello", "filters": {"source_files": ["doc.txt"], "page_from": 2, "page_to": 4}},
+            )
+            invalid = client.post("/api/chat", json={"message": "hello", "filters": {"page_from": 5, "page_to": 1}})
+        self.assertEqual(response.status_code, 200)
+        filters = generate_mock.call_args.kwargs["filters"]
+        self.assertEqual((filters.source_files, filters.page_from, filters.page_to), (["doc.txt"], 2, 4))
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_chat_resolves_requested_collections(self):
+        client = self.build_client()
+
+        def mock_response(*args, **kwargs):
+            return iter([_MockChunk("federated")]), [], {"trace_id": "trace-collections", "confidence_score": 0.5}
+
+        with patch.object(chat_router.self_rag, "generate_response", side_effect=mock_response) as generate_mock:
+            response = client.post("/api/chat", json={"message": "hello", "collections": ["default", "default"]})
+            unknown = client.post("/api/chat", json={"message": "hello", "collections": ["missing"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(generate_mock.call_args.kwargs["collections"], ["default"])
+        self.assertEqual(unknown.status_code, 400)
+
     def test_chat_assigns_ab_variant_metadata(self):
         client = self.build_client()
 
@@ -502,6 +555,56 @@ class AdminApiTests(unittest.TestCase):
         self.assertEqual(response.json()["current_version_id"], "current-v1")
 
 
+class FilesApiTests(unittest.TestCase):
+    def build_client(self):
+        app = FastAPI()
+        app.include_router(files_router.router, prefix="/api")
+        return TestClient(app)
+
+    def test_file_listing_is_cached_until_the_index_epoch_changes(self):
+        client = self.build_client()
+        with patch.object(files_router.vector_store, "_scan_file_counts", return_value={"b.txt": 2, "a.txt": 3}) as scan:
+            first = client.get("/api/files")
+            etag = first.headers["etag"]
+            cached = client.get("/api/files")
+            revalidated = client.get("/api/files", headers={"If-None-Match": etag})
+            VectorStore.bump_index_epoch()
+            refreshed = client.get("/api/files", headers={"If-None-Match": etag})
+        self.assertEqual(
+            first.json(),
+            [
+                {"filename": "a.txt", "status": "Ready", "chunks_count": 3},
+                {"filename": "b.txt", "status": "Ready", "chunks_count": 2},
+            ],
+        )
+        self.assertEqual(cached.json(), first.json())
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertNotEqual(refreshed.headers["etag"], etag)
+        self.assertEqual(scan.call_count, 2)
+
+    def test_file_listing_notices_an_alias_swap_from_another_process(self):
+        client = self.build_client()
+        store = files_router.vector_store
+        qdrant = MagicMock()
+        alias = SimpleNamespace(alias_name=store._collection(), collection_name="docs_v1")
+        qdrant.get_aliases.return_value = SimpleNamespace(aliases=[alias])
+        qdrant.count.return_value = SimpleNamespace(count=5)
+        with patch.object(store, "client", qdrant, create=True), patch.object(store, "available", True, create=True), patch.object(
+            store, "_cold_store", return_value=None
+        ), patch.object(store, "_scan_file_counts", side_effect=[{"a.txt": 5}, {"a.txt": 2, "b.txt": 3}]) as scan:
+            first = client.get("/api/files")
+            etag = first.headers["etag"]
+            unchanged = client.get("/api/files", headers={"If-None-Match": etag})
+            # scripts/reindex.py rebuilt the index into docs_v2 and moved the alias; this process wrote nothing.
+            alias.collection_name = "docs_v2"
+            swapped = client.get("/api/files", headers={"If-None-Match": etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(swapped.status_code, 200)
+        self.assertEqual([row["chunks_count"] for row in swapped.json()], [2, 3])
+        self.assertEqual(scan.call_count, 2)
+
+
 class UploadApiTests(unittest.TestCase):
     def build_client(self):
         app = FastAPI()
@@ -569,6 +672,54 @@ class UploadApiTests(unittest.TestCase):
         self.assertEqual(len(sync_args[2]), 2)
         self.assertEqual(sync_kwargs["deleted_chunk_keys"], [])
 
+    def test_concurrent_uploads_share_one_group_commit(self):
+        app = FastAPI()
+        app.include_router(upload_router.router, prefix="/api")
+        store = VectorStore.__new__(VectorStore)
+        store.client = MagicMock()
+        store.available = True
+        store.collection_name = "upload-coalesce-test"
+
+        async def upload_both():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(
+                    *[
+                        client.post("/api/upload", files={"file": (name, name.encode(), "text/plain")})
+                        for name in ("a.txt", "b.txt")
+                    ]
+                )
+
+        with patch.object(upload_router, "vector_store", store), patch.object(
+            store, "get_file_chunks", return_value=[]
+        ), patch.object(
+            upload_router.parser,
+            "parse_structured",
+            side_effect=lambda content, filename: ParsedDocument(full_text=content.decode(), sections=[], backend_used="builtin"),
+        ), patch.object(
+            upload_router.chunker,
+            "chunk_document",
+            side_effect=lambda sections, full_text: [{"chunk_text": full_text, "metadata": {}}],
+        ), patch.object(upload_router.vision_service, "describe_images", return_value=[]), patch.object(
+            upload_router.version_service, "is_unchanged", return_value=False
+        ), patch.object(
+            upload_router.version_service, "record_version", return_value={"version_id": "v"}
+        ), patch.object(
+            upload_router.embedding_service, "get_embeddings", side_effect=lambda texts: [[0.1, 0.2] for _ in texts]
+        ), patch.object(upload_router.graph_store, "replace_document"), patch(
+            "app.services.vector_store.config.qdrant_write_coalescing", True
+        ), patch(
+            "app.services.vector_store.config.qdrant_write_coalesce_max_delay_ms", 500
+        ):
+            responses = asyncio.run(upload_both())
+            coalescer = VectorStore._write_coalescers.pop("upload-coalesce-test")
+            stats = coalescer.stats()
+            coalescer.close()
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(store.client.batch_update_points.call_count, 1)
+        self.assertEqual((stats["commits"], stats["requests"]), (1, 2))
+
     def test_upload_chunk_reorder_does_not_trigger_reembedding(self):
         client = self.build_client()
         chunk_a_hash = DocumentVersionService.compute_content_hash(b"Chunk A")